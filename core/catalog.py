@@ -0,0 +1,171 @@
+# core/catalog.py
+"""In-process, versioned snapshot of the course catalog.
+
+Courses, sections, teachers, campuses and section schedules are loaded with a
+handful of bulk queries into a small object graph that detail pages and AJAX
+lookups read without touching the ORM. Each process keeps one snapshot and
+rebuilds it when the catalog version (bumped by `core.signals` and
+`planner.signals`) moves on.
+"""
+import threading
+from collections import defaultdict
+
+from .models import Campus, Course, Prof, Section, Teach
+from .versioning import get_version, CATALOG
+
+
+class CatalogCampus:
+    __slots__ = ('id', 'name')
+
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+    @property
+    def pk(self):
+        return self.id
+
+    def __str__(self):
+        return self.name
+
+
+class CatalogProf:
+    __slots__ = ('id', 'prof_name', 'email', 'imgurl', 'description', 'teaching_sections')
+
+    def __init__(self, id, prof_name, email, imgurl, description):
+        self.id = id
+        self.prof_name = prof_name
+        self.email = email
+        self.imgurl = imgurl
+        self.description = description
+        self.teaching_sections = []
+
+    @property
+    def pk(self):
+        return self.id
+
+    def __str__(self):
+        return self.prof_name
+
+
+class CatalogCourse:
+    __slots__ = ('id', 'course_code', 'course_name', 'description', 'credit', 'sections', 'all_professors')
+
+    def __init__(self, id, course_code, course_name, description, credit):
+        self.id = id
+        self.course_code = course_code
+        self.course_name = course_name
+        self.description = description
+        self.credit = credit
+        self.sections = []
+        self.all_professors = []
+
+    @property
+    def pk(self):
+        return self.id
+
+    def __str__(self):
+        return f"{self.course_code} - {self.course_name}"
+
+
+class CatalogSection:
+    __slots__ = ('id', 'section_number', 'course', 'datetime', 'room', 'campus', 'teachers', 'schedules')
+
+    def __init__(self, id, section_number, course, datetime, room, campus):
+        self.id = id
+        self.section_number = section_number
+        self.course = course
+        self.datetime = datetime
+        self.room = room
+        self.campus = campus
+        self.teachers = []
+        self.schedules = []  # [(day_of_week, start_time, end_time)], sorted
+
+    @property
+    def pk(self):
+        return self.id
+
+    def __str__(self):
+        return f"{self.course.course_code} Section {self.section_number}"
+
+
+class Catalog:
+    """Read-only object graph of the catalog, indexed for the lookups views need."""
+
+    def __init__(self, version, courses, profs, sections, campuses):
+        self.version = version
+        self.courses = courses      # id -> CatalogCourse
+        self.profs = profs          # id -> CatalogProf
+        self.sections = sections    # id -> CatalogSection
+        self.campuses = campuses    # id -> CatalogCampus
+        self._by_code = {c.course_code.casefold(): c for c in courses.values()}
+
+    def course_by_code(self, code):
+        """Case-insensitive course lookup; None when missing."""
+        return self._by_code.get(code.casefold())
+
+    def sections_for_course(self, course_id):
+        course = self.courses.get(course_id)
+        return course.sections if course else []
+
+    def teachers_for_section(self, section_id):
+        section = self.sections.get(section_id)
+        return section.teachers if section else []
+
+
+def build_catalog(version=None):
+    """Load the whole catalog in bulk queries (one per table) and link it into a graph."""
+    from planner.models import SectionSchedule
+
+    campuses = {pk: CatalogCampus(pk, name) for pk, name in Campus.objects.values_list('id', 'name')}
+    profs = {
+        row[0]: CatalogProf(*row)
+        for row in Prof.objects.values_list('id', 'prof_name', 'email', 'imgurl', 'description')
+    }
+    courses = {
+        row[0]: CatalogCourse(*row)
+        for row in Course.objects.values_list('id', 'course_code', 'course_name', 'description', 'credit')
+    }
+    sections = {}
+    rows = Section.objects.order_by('section_number', 'id').values_list(
+        'id', 'section_number', 'course_id', 'datetime', 'room', 'campus_id'
+    )
+    for pk, number, course_id, datetime, room, campus_id in rows:
+        course = courses[course_id]
+        section = CatalogSection(pk, number, course, datetime, room, campuses.get(campus_id))
+        sections[pk] = section
+        course.sections.append(section)
+
+    course_profs = defaultdict(dict)
+    for section_id, prof_id in Teach.objects.order_by('prof__prof_name', 'prof_id').values_list('section_id', 'prof_id'):
+        section, prof = sections[section_id], profs[prof_id]
+        section.teachers.append(prof)
+        prof.teaching_sections.append(section)
+        course_profs[section.course.id][prof_id] = prof
+    for course_id, by_id in course_profs.items():
+        courses[course_id].all_professors = list(by_id.values())
+
+    schedule_rows = SectionSchedule.objects.order_by('section_id', 'day_of_week', 'start_time').values_list(
+        'section_id', 'day_of_week', 'start_time', 'end_time'
+    )
+    for section_id, day, start, end in schedule_rows:
+        sections[section_id].schedules.append((day, start, end))
+
+    return Catalog(version, courses, profs, sections, campuses)
+
+
+_lock = threading.Lock()
+_catalog = None
+
+
+def get_catalog():
+    """Return this process's catalog snapshot, rebuilding it if the catalog version changed."""
+    global _catalog
+    version = get_version(CATALOG)
+    catalog = _catalog
+    if catalog is not None and catalog.version == version:
+        return catalog
+    with _lock:
+        if _catalog is None or _catalog.version != version:
+            _catalog = build_catalog(version)
+        return _catalog
@@ -0,0 +1,174 @@
+# core/catalog_sync.py
+"""Whole-catalog snapshots and deltas for clients that keep a local copy.
+
+Every catalog write appends a `CatalogChange` row (see `core.signals` and
+`planner.signals`); the highest change id is the catalog version. A client
+downloads one snapshot tagged with that version, then asks for the rows that
+changed since it. Rows are compact arrays whose column order is given by
+FIELDS. A section row carries its teacher ids and its schedule as
+[day_of_week, start_minute, end_minute] triples, so Teach and SectionSchedule
+writes are logged against their section.
+"""
+import gzip
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import CatalogChange, Campus, Course, Prof, Section, Teach
+
+COURSE, PROF, CAMPUS, SECTION = 'course', 'prof', 'campus', 'section'
+
+# payload key -> column order of its rows
+FIELDS = {
+    'courses': ['id', 'code', 'name', 'credit'],
+    'profs': ['id', 'name'],
+    'campuses': ['id', 'name'],
+    'sections': ['id', 'course_id', 'number', 'campus_id', 'room', 'datetime', 'prof_ids', 'schedules'],
+}
+TABLE_KEYS = {COURSE: 'courses', PROF: 'profs', CAMPUS: 'campuses', SECTION: 'sections'}
+
+# A delta touching more rows than this is answered with a resync instead
+DELTA_MAX_ROWS = 5000
+SNAPSHOT_TIMEOUT = 60 * 60 * 24
+
+
+def record_change(table, object_id, deleted=False):
+    CatalogChange.objects.create(table=table, object_id=object_id, deleted=deleted)
+
+
+def record_changes(table, object_ids, deleted=False):
+    """Log several rows at once, for bulk writes that bypass model signals."""
+    CatalogChange.objects.bulk_create(
+        [CatalogChange(table=table, object_id=pk, deleted=deleted) for pk in set(object_ids)]
+    )
+
+
+def current_version():
+    return CatalogChange.objects.aggregate(v=Max('id'))['v'] or 0
+
+
+def _minutes(t):
+    return t.hour * 60 + t.minute
+
+
+def _filter(queryset, ids, field='id'):
+    return queryset if ids is None else queryset.filter(**{f'{field}__in': ids})
+
+
+def course_rows(ids=None):
+    qs = _filter(Course.objects.order_by('id'), ids)
+    return [list(row) for row in qs.values_list('id', 'course_code', 'course_name', 'credit')]
+
+
+def prof_rows(ids=None):
+    qs = _filter(Prof.objects.order_by('id'), ids)
+    return [list(row) for row in qs.values_list('id', 'prof_name')]
+
+
+def campus_rows(ids=None):
+    qs = _filter(Campus.objects.order_by('id'), ids)
+    return [list(row) for row in qs.values_list('id', 'name')]
+
+
+def section_rows(ids=None):
+    from planner.models import SectionSchedule
+
+    teachers = defaultdict(list)
+    teach = _filter(Teach.objects.order_by('section_id', 'prof_id'), ids, 'section_id')
+    for section_id, prof_id in teach.values_list('section_id', 'prof_id'):
+        teachers[section_id].append(prof_id)
+    schedules = defaultdict(list)
+    schedule_qs = _filter(SectionSchedule.objects.order_by('section_id', 'day_of_week', 'start_time'), ids, 'section_id')
+    for section_id, day, start, end in schedule_qs.values_list('section_id', 'day_of_week', 'start_time', 'end_time'):
+        schedules[section_id].append([day, _minutes(start), _minutes(end)])
+
+    qs = _filter(Section.objects.order_by('id'), ids)
+    return [
+        [pk, course_id, number, campus_id, room, datetime, teachers[pk], schedules[pk]]
+        for pk, course_id, number, campus_id, room, datetime in qs.values_list(
+            'id', 'course_id', 'section_number', 'campus_id', 'room', 'datetime'
+        )
+    ]
+
+
+ROW_BUILDERS = {COURSE: course_rows, PROF: prof_rows, CAMPUS: campus_rows, SECTION: section_rows}
+
+
+def build_snapshot():
+    """The whole catalog as {'version', 'fields', 'courses', 'profs', 'campuses', 'sections'}.
+
+    The version is read before the rows, so a write racing the snapshot is
+    at worst delivered again by the next delta.
+    """
+    version = current_version()
+    payload = {'version': version, 'fields': FIELDS}
+    for table, key in TABLE_KEYS.items():
+        payload[key] = ROW_BUILDERS[table]()
+    return payload
+
+
+def _encode(payload):
+    return DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':')).encode(payload).encode('utf-8')
+
+
+def get_snapshot_bytes(version):
+    """(json_bytes, gzip_bytes) of the snapshot at `version`, cached until the catalog moves on.
+
+    The cached copy may be newer than `version` if a write landed meanwhile,
+    which is fine: its embedded version is what the client syncs from.
+    """
+    key = f'catalog_snapshot:{version}'
+    cached = cache.get(key)
+    if cached is None:
+        body = _encode(build_snapshot())
+        cached = (body, gzip.compress(body))
+        cache.set(key, cached, SNAPSHOT_TIMEOUT)
+    return cached
+
+
+def changes_since(since):
+    """Rows changed after version `since`, or None when the client must reload the snapshot.
+
+    That happens when the log no longer reaches back to `since` (pruned),
+    `since` is ahead of the server (database reset), or the delta would be
+    bigger than DELTA_MAX_ROWS. Upserted rows are read in their current
+    state; a logged row that no longer exists is reported as deleted.
+    """
+    version = current_version()
+    if since > version:
+        return None
+    first = CatalogChange.objects.order_by('id').values_list('id', flat=True).first()
+    if first is not None and since < first - 1:
+        return None
+
+    changed = defaultdict(set)
+    for table, object_id in CatalogChange.objects.filter(id__gt=since, id__lte=version).values_list('table', 'object_id'):
+        changed[table].add(object_id)
+    if sum(len(ids) for ids in changed.values()) > DELTA_MAX_ROWS:
+        return None
+
+    payload = {'version': version, 'since': since, 'fields': FIELDS, 'deleted': {}}
+    for table, key in TABLE_KEYS.items():
+        ids = changed.get(table)
+        rows = ROW_BUILDERS[table](ids) if ids else []
+        payload[key] = rows
+        payload['deleted'][key] = sorted(ids - {row[0] for row in rows}) if ids else []
+    return payload
+
+
+def prune_changes(retention_days=None, now=None):
+    """Drop log rows older than CATALOG_CHANGELOG_RETENTION_DAYS, always keeping the newest.
+
+    Clients whose version predates the remaining log are told to resync.
+    """
+    if retention_days is None:
+        retention_days = getattr(settings, 'CATALOG_CHANGELOG_RETENTION_DAYS', 30)
+    cutoff = (now or timezone.now()) - timedelta(days=retention_days)
+    latest = current_version()
+    deleted, _ = CatalogChange.objects.filter(created_at__lt=cutoff, id__lt=latest).delete()
+    return deleted
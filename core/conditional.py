@@ -0,0 +1,57 @@
+# core/conditional.py
+"""Conditional GET (ETag / If-None-Match) for pages built from versioned data.
+
+An ETag is a hash of the version counters a response was rendered from (see
+`core.versioning`), the viewer's own version and the full request path. All
+of these live in the cache, so when the client's validator matches, Django's
+`condition` decorator answers 304 before the view runs a single query.
+"""
+import hashlib
+from functools import wraps
+
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+from .versioning import get_version, VIEWER
+
+
+def viewer_tag(request):
+    """Identifies what the current viewer sees beyond the shared data (bookmarks, own votes)."""
+    if not request.user.is_authenticated:
+        return 'anon'
+    return f'u{request.user.pk}.{get_version(VIEWER, request.user.pk)}'
+
+
+def versioned_etag(request, versions):
+    parts = [str(v) for v in versions] + [viewer_tag(request), request.get_full_path()]
+    return hashlib.md5(':'.join(parts).encode('utf-8')).hexdigest()
+
+
+def conditional_on_versions(versions_func, on_not_modified=None):
+    """Serve the view with an ETag built from `versions_func(request, *args, **kwargs)`.
+
+    `versions_func` must only read version counters (no queries); returning
+    None skips conditional handling, e.g. for an object that does not exist.
+    Responses must be revalidated on every use and are private to the viewer.
+    A 304 skips the view body, so side effects that must happen on every hit
+    (view / search stats) go in `on_not_modified(request, *args, **kwargs)`.
+    """
+    def etag_func(request, *args, **kwargs):
+        versions = versions_func(request, *args, **kwargs)
+        if versions is None:
+            return None
+        return versioned_etag(request, versions)
+
+    def decorator(view):
+        conditional_view = condition(etag_func=etag_func)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if response.status_code == 304 and on_not_modified is not None:
+                on_not_modified(request, *args, **kwargs)
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,105 @@
+# core/enrollment.py
+"""Per-user enrollment profile, cached until the user's enrollments change.
+
+The review form and its AJAX helpers need to know which courses, sections and
+professors a user has taken. Instead of running distinct joins on every form
+build, the profile is loaded with two queries and cached; `core.signals`
+bumps the per-user version whenever that user's Enrollment rows change (and
+catalog edits bump the catalog version, which is also part of the key).
+"""
+from collections import defaultdict
+
+from django.core.cache import cache
+
+from .models import Enrollment, Teach
+from .versioning import get_version, CATALOG
+
+ENROLLMENT = 'enrollment'
+PROFILE_TIMEOUT = 60 * 60 * 24
+
+
+class EnrollmentProfile:
+    """In-memory view of one user's enrolled sections and the professors around them."""
+
+    def __init__(self, sections, section_profs, course_profs, prof_names):
+        self.sections = sections            # section_id -> (course_id, section_number)
+        self.section_profs = section_profs  # section_id -> frozenset(prof_id) teaching that section
+        self.course_profs = course_profs    # course_id -> frozenset(prof_id) teaching any section of it
+        self.prof_names = prof_names        # prof_id -> prof_name
+
+    @property
+    def section_ids(self):
+        return set(self.sections)
+
+    @property
+    def course_ids(self):
+        return {course_id for course_id, _ in self.sections.values()}
+
+    @property
+    def prof_ids(self):
+        """Professors who taught one of the user's own sections."""
+        return set().union(*self.section_profs.values()) if self.section_profs else set()
+
+    def sections_for_course(self, course_id):
+        """[(section_id, section_number)] of the user's sections in `course_id`, by section number."""
+        return sorted(
+            ((sid, number) for sid, (cid, number) in self.sections.items() if cid == course_id),
+            key=lambda item: item[1],
+        )
+
+    def profs_for_section(self, section_id):
+        """[(prof_id, prof_name)] teaching `section_id`, by name."""
+        return sorted(
+            ((pid, self.prof_names[pid]) for pid in self.section_profs.get(section_id, ())),
+            key=lambda item: item[1],
+        )
+
+    def prof_teaches_course(self, prof_id, course_id):
+        return prof_id in self.course_profs.get(course_id, ())
+
+    def prof_teaches_section(self, prof_id, section_id):
+        return prof_id in self.section_profs.get(section_id, ())
+
+    def course_taken_with_prof(self, prof_id):
+        """Course id of the user's first section (by id) taught by `prof_id`, or None."""
+        for section_id in sorted(self.sections):
+            if prof_id in self.section_profs.get(section_id, ()):
+                return self.sections[section_id][0]
+        return None
+
+
+def load_enrollment_profile(user_id):
+    sections = {
+        section_id: (course_id, number)
+        for section_id, course_id, number in Enrollment.objects.filter(user_id=user_id)
+        .values_list('section_id', 'section__course_id', 'section__section_number')
+    }
+    section_profs = defaultdict(set)
+    course_profs = defaultdict(set)
+    prof_names = {}
+    course_ids = {course_id for course_id, _ in sections.values()}
+    if course_ids:
+        teaching = Teach.objects.filter(section__course_id__in=course_ids).values_list(
+            'section_id', 'section__course_id', 'prof_id', 'prof__prof_name'
+        )
+        for section_id, course_id, prof_id, prof_name in teaching:
+            course_profs[course_id].add(prof_id)
+            if section_id in sections:
+                section_profs[section_id].add(prof_id)
+            prof_names[prof_id] = prof_name
+    return EnrollmentProfile(
+        sections,
+        {sid: frozenset(pids) for sid, pids in section_profs.items()},
+        {cid: frozenset(pids) for cid, pids in course_profs.items()},
+        prof_names,
+    )
+
+
+def get_enrollment_profile(user):
+    """Return the cached EnrollmentProfile for `user` (loaded on first use)."""
+    key = f'enrollment_profile:{user.pk}:{get_version(ENROLLMENT, user.pk)}:{get_version(CATALOG)}'
+    profile = cache.get(key)
+    if profile is None:
+        profile = load_enrollment_profile(user.pk)
+        cache.set(key, profile, PROFILE_TIMEOUT)
+    return profile
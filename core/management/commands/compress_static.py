@@ -0,0 +1,45 @@
+import gzip
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.static_serving import COMPRESSIBLE_EXTENSIONS
+
+
+class Command(BaseCommand):
+    help = 'Write a .gz next to every compressible file in STATIC_ROOT (run after collectstatic).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-size', type=int, default=256, help='Skip files smaller than this many bytes.')
+        parser.add_argument('--force', action='store_true', help='Recompress files whose .gz is already up to date.')
+
+    def handle(self, *args, **options):
+        root = settings.STATIC_ROOT
+        if not root or not os.path.isdir(root):
+            raise CommandError('STATIC_ROOT does not exist; run collectstatic first.')
+
+        written = skipped = 0
+        for dirpath, _dirnames, filenames in os.walk(root):
+            for filename in filenames:
+                if not filename.endswith(COMPRESSIBLE_EXTENSIONS):
+                    continue
+                source = os.path.join(dirpath, filename)
+                target = source + '.gz'
+                if os.path.getsize(source) < options['min_size']:
+                    continue
+                if (not options['force'] and os.path.exists(target)
+                        and os.path.getmtime(target) >= os.path.getmtime(source)):
+                    skipped += 1
+                    continue
+                with open(source, 'rb') as f:
+                    data = f.read()
+                # mtime=0 keeps the output identical across runs for identical input
+                compressed = gzip.compress(data, compresslevel=9, mtime=0)
+                if len(compressed) >= len(data):
+                    continue
+                with open(target, 'wb') as f:
+                    f.write(compressed)
+                written += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Compressed {written} files ({skipped} already up to date).'))
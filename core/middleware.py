@@ -3,20 +3,25 @@ from django.utils.deprecation import MiddlewareMixin
 from django.db import IntegrityError
 
 from stats.models import DailyActiveUser
+from jobs.registry import enqueue
 
 
 class DailyActiveUserMiddleware(MiddlewareMixin):
     """Middleware to log a user's presence per day.
 
     For authenticated users, it will ensure a DailyActiveUser record exists
-    for today's date. This is a lightweight way to approximate DAU.
+    for today's date. This is a lightweight way to approximate DAU. The first
+    visit of the day also queues a job adding the user to today's HyperLogLog
+    sketch, which WAU/MAU estimates are merged from.
     """
     def process_request(self, request):
         user = getattr(request, 'user', None)
         if user and user.is_authenticated:
             today = date.today()
             try:
-                DailyActiveUser.objects.get_or_create(user=user, date=today)
+                _, created = DailyActiveUser.objects.get_or_create(user=user, date=today)
+                if created:
+                    enqueue('stats.record_active_user', user_id=user.pk, day=today.isoformat())
             except IntegrityError:
                 # race condition guard for concurrent requests
                 pass
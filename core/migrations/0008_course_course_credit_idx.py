@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_catalogchange'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(fields=['credit', 'id'], name='course_credit_idx'),
+        ),
+    ]
@@ -9,6 +9,11 @@ class Course(models.Model):
     description = models.TextField(blank=True)
     credit = models.IntegerField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['credit', 'id'], name='course_credit_idx'),
+        ]
+
     @property
     def all_professors(self):
         """
@@ -107,4 +112,26 @@ class Teach(models.Model):
         verbose_name_plural = "Teaching Assignments"
 
     def __str__(self):
-        return f"{self.prof.prof_name} teaches {self.section}"
\ No newline at end of file
+        return f"{self.prof.prof_name} teaches {self.section}"
+
+class CatalogChange(models.Model):
+    """Append-only log of catalog writes; the id is the catalog version clients sync against.
+
+    A section's teachers and schedules travel with the section row, so Teach and
+    SectionSchedule writes are logged as changes to their section (see core/catalog_sync.py).
+    """
+    TABLE_CHOICES = [
+        ('course', 'Course'),
+        ('prof', 'Professor'),
+        ('campus', 'Campus'),
+        ('section', 'Section'),
+    ]
+
+    table = models.CharField(max_length=10, choices=TABLE_CHOICES)
+    object_id = models.IntegerField()
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        action = 'delete' if self.deleted else 'upsert'
+        return f"#{self.pk} {action} {self.table} {self.object_id}"
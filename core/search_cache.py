@@ -0,0 +1,84 @@
+# core/search_cache.py
+"""Result cache for the search page.
+
+Entries hold only the ordered primary keys of each result type, so per-viewer
+annotations (bookmarks, votes) are still applied when the rows are loaded.
+Keys embed the catalog and review versions, so writes invalidate entries
+without any TTL bookkeeping.
+"""
+import hashlib
+import re
+import unicodedata
+
+from django.core.cache import cache
+from django.db.models import F, Q, TextField, Value
+from django.db.models.functions import Cast, Replace
+
+from .versioning import get_version, CATALOG, REVIEWS
+
+# Zero-width characters that commonly sneak into Thai text typed on mobile keyboards
+_ZERO_WIDTH = dict.fromkeys(map(ord, '\u200b\u200c\u200d\u2060\ufeff'))
+_WHITESPACE = re.compile(r'\s+')
+
+# Entries are invalidated by version bumps; the timeout only bounds memory usage
+SEARCH_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def search_term(query):
+    """The string search filters on: NFC, no zero-width chars, single spaces, SARA AM folded.
+
+    Thai SARA AM may be typed as NIKHAHIT + SARA AA; both forms map to U+0E33.
+    Stored text is folded the same way by `normalized_field`; case is left to icontains.
+    """
+    query = unicodedata.normalize('NFC', query or '')
+    query = query.translate(_ZERO_WIDTH)
+    query = query.replace('\u0e4d\u0e32', '\u0e33')
+    return _WHITESPACE.sub(' ', query).strip()
+
+
+def normalize_query(query):
+    """Canonical form of a search string for cache keys: `search_term`, casefolded."""
+    return search_term(query).casefold()
+
+
+def normalized_field(field):
+    """Database expression folding `field` like `search_term` folds the query (zero-width chars, SARA AM)."""
+    expression = Replace(Cast(F(field), TextField()), Value('\u0e4d\u0e32'), Value('\u0e33'), output_field=TextField())
+    for char in _ZERO_WIDTH:
+        expression = Replace(expression, Value(chr(char)), Value(''), output_field=TextField())
+    return expression
+
+
+def filter_matching(queryset, fields, term):
+    """Rows where any of `fields` contains `term`, both sides normalized.
+
+    The match runs as a `pk IN (...)` subquery: annotating fields across a
+    multi-valued relation (a section's teachers) on `queryset` itself would
+    join it and return a row once per related match.
+    """
+    names = {f'_search_{i}': normalized_field(field) for i, field in enumerate(fields)}
+    condition = Q()
+    for name in names:
+        condition |= Q(**{f'{name}__icontains': term})
+    matches = queryset.model._default_manager.annotate(**names).filter(condition).values('pk')
+    return queryset.filter(pk__in=matches)
+
+
+def search_cache_key(query, sort_by, order):
+    raw = '\x1f'.join([normalize_query(query), sort_by, order])
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f'search:{get_version(CATALOG)}:{get_version(REVIEWS)}:{digest}'
+
+
+def get_cached_results(query, sort_by, order):
+    """Return the cached dict of id lists ('professors', 'courses', 'sections', 'reviews') or None."""
+    return cache.get(search_cache_key(query, sort_by, order))
+
+
+def set_cached_results(query, sort_by, order, professor_ids, course_ids, section_ids, review_ids):
+    cache.set(search_cache_key(query, sort_by, order), {
+        'professors': list(professor_ids),
+        'courses': list(course_ids),
+        'sections': list(section_ids),
+        'reviews': list(review_ids),
+    }, SEARCH_CACHE_TIMEOUT)
@@ -0,0 +1,101 @@
+# core/signals.py
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+
+from .models import Course, Prof, Campus, Section, Teach, SectionTime, Enrollment
+from .versioning import bump_version, CATALOG
+from .enrollment import ENROLLMENT
+from . import catalog_sync
+
+CATALOG_MODELS = (Course, Prof, Campus, Section, Teach, SectionTime)
+
+
+def bump_catalog_version(sender, **kwargs):
+    """Any write to a catalog table invalidates catalog-derived caches."""
+    bump_version(CATALOG)
+
+
+def bump_catalog_version_on_teachers_change(sender, action, **kwargs):
+    # section.teachers.add()/remove() bypass Teach.save(), so listen for them here
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_version(CATALOG)
+
+
+# Connect per model: a sender-less receiver would disable fast deletes on every table
+for model in CATALOG_MODELS:
+    post_save.connect(bump_catalog_version, sender=model, dispatch_uid=f'catalog_version_save_{model.__name__}')
+    post_delete.connect(bump_catalog_version, sender=model, dispatch_uid=f'catalog_version_delete_{model.__name__}')
+m2m_changed.connect(bump_catalog_version_on_teachers_change, sender=Section.teachers.through)
+
+
+# model -> (change log table, function giving the logged row id)
+CHANGE_LOG_ROWS = {
+    Course: (catalog_sync.COURSE, lambda instance: instance.pk),
+    Prof: (catalog_sync.PROF, lambda instance: instance.pk),
+    Campus: (catalog_sync.CAMPUS, lambda instance: instance.pk),
+    Section: (catalog_sync.SECTION, lambda instance: instance.pk),
+    # a section's teachers are part of its row
+    Teach: (catalog_sync.SECTION, lambda instance: instance.section_id),
+}
+
+
+def log_catalog_save(sender, instance, **kwargs):
+    table, row_id = CHANGE_LOG_ROWS[sender]
+    catalog_sync.record_change(table, row_id(instance))
+
+
+def log_catalog_delete(sender, instance, **kwargs):
+    table, row_id = CHANGE_LOG_ROWS[sender]
+    # deleting a Teach only changes its section
+    catalog_sync.record_change(table, row_id(instance), deleted=sender is not Teach)
+
+
+def log_teachers_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        section_ids = list(Teach.objects.filter(prof=instance).values_list('section_id', flat=True))
+    elif action == 'pre_clear':
+        section_ids = [instance.pk]
+    elif action in ('post_add', 'post_remove'):
+        section_ids = (pk_set or ()) if reverse else [instance.pk]
+    else:
+        return
+    catalog_sync.record_changes(catalog_sync.SECTION, section_ids)
+
+
+def log_campus_sections(sender, instance, **kwargs):
+    # Section.campus is SET_NULL: the delete updates those rows without sending signals
+    catalog_sync.record_changes(
+        catalog_sync.SECTION, list(Section.objects.filter(campus=instance).values_list('pk', flat=True))
+    )
+
+
+for model in CHANGE_LOG_ROWS:
+    post_save.connect(log_catalog_save, sender=model, dispatch_uid=f'catalog_change_save_{model.__name__}')
+    post_delete.connect(log_catalog_delete, sender=model, dispatch_uid=f'catalog_change_delete_{model.__name__}')
+m2m_changed.connect(log_teachers_change, sender=Section.teachers.through, dispatch_uid='catalog_change_teachers')
+pre_delete.connect(log_campus_sections, sender=Campus, dispatch_uid='catalog_change_campus_sections')
+
+
+def bump_enrollment_version(sender, instance, **kwargs):
+    """A user's enrollment profile is stale once any of their Enrollment rows change."""
+    bump_version(ENROLLMENT, instance.user_id)
+
+
+def bump_enrollment_version_on_students_change(sender, instance, action, reverse, pk_set, **kwargs):
+    # section.students.add() / user.enrolled_sections.add() bypass Enrollment.save()
+    if reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            bump_version(ENROLLMENT, instance.pk)
+        return
+    if action == 'pre_clear':
+        user_ids = Enrollment.objects.filter(section=instance).values_list('user_id', flat=True)
+    elif action in ('post_add', 'post_remove'):
+        user_ids = pk_set or ()
+    else:
+        return
+    for user_id in user_ids:
+        bump_version(ENROLLMENT, user_id)
+
+
+post_save.connect(bump_enrollment_version, sender=Enrollment, dispatch_uid='enrollment_version_save')
+post_delete.connect(bump_enrollment_version, sender=Enrollment, dispatch_uid='enrollment_version_delete')
+m2m_changed.connect(bump_enrollment_version_on_students_change, sender=Section.students.through)
@@ -0,0 +1,58 @@
+# core/static_serving.py
+"""Serve collected static files, preferring precompressed variants.
+
+For a request of `static/<path>` the view looks for `<path>.gz` next to the
+file in STATIC_ROOT (written by `manage.py compress_static`) and sends it
+with `Content-Encoding: gzip` when the client accepts gzip. Content-hashed
+names from the manifest get a far-future, immutable Cache-Control; anything
+else is cached briefly and revalidated with Last-Modified.
+"""
+import mimetypes
+import os
+import posixpath
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .streaming import accepts_gzip
+
+# Text formats worth compressing; images and fonts are already compressed
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.map', '.json', '.svg', '.txt', '.html', '.xml', '.ico')
+
+
+def serve_static(request, path):
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, path)
+    except Exception:
+        raise Http404('Invalid path')
+    if not os.path.isfile(fullpath):
+        raise Http404(f'"{path}" does not exist')
+
+    compressed = fullpath + '.gz'
+    use_gzip = path.endswith(COMPRESSIBLE_EXTENSIONS) and accepts_gzip(request) and os.path.isfile(compressed)
+    served = compressed if use_gzip else fullpath
+    stat = os.stat(served)
+
+    hashed = getattr(staticfiles_storage, 'is_hashed', lambda name: False)(path)
+    if not hashed and not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    content_type, _ = mimetypes.guess_type(fullpath)
+    response = FileResponse(open(served, 'rb'), content_type=content_type or 'application/octet-stream')
+    response['Content-Length'] = stat.st_size
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    if use_gzip:
+        response['Content-Encoding'] = 'gzip'
+    if path.endswith(COMPRESSIBLE_EXTENSIONS):
+        patch_vary_headers(response, ('Accept-Encoding',))
+    if hashed:
+        patch_cache_control(response, public=True, max_age=settings.STATIC_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=settings.STATIC_SHORT_MAX_AGE)
+    return response
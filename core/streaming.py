@@ -0,0 +1,84 @@
+# core/streaming.py
+"""Streaming JSON responses for catalog-sized result lists.
+
+`JsonResponse` serializes the whole payload into one string before sending
+it. `StreamingJsonResponse` instead writes `{"ok": true, "results": [` and
+then serializes rows as they come out of an iterator (e.g.
+`queryset.iterator()`), flushing every CHUNK_ROWS rows, so worker memory
+stays flat whatever the result size. When the client accepts gzip the
+chunks are compressed on the fly.
+"""
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+
+CHUNK_ROWS = 500
+
+
+def _qvalue(params):
+    for param in params:
+        name, _, value = param.partition('=')
+        if name.strip().lower() == 'q':
+            try:
+                return float(value)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def accepts_gzip(request):
+    """Whether the request's Accept-Encoding allows gzip, honouring q-values ("gzip;q=0" refuses it)."""
+    qvalues = {}
+    for item in request.headers.get('Accept-Encoding', '').split(','):
+        coding, *params = item.split(';')
+        coding = coding.strip().lower()
+        if coding:
+            qvalues[coding] = _qvalue(params)
+    for coding in ('gzip', 'x-gzip'):
+        if coding in qvalues:
+            return qvalues[coding] > 0
+    return qvalues.get('*', 0) > 0
+
+
+def _json_chunks(rows, key, extra, chunk_rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    head = encoder.encode(dict(extra, **{key: []}))
+    # everything up to the opening bracket of the rows list (the list is the last key)
+    yield head[:-2]
+    buffer = []
+    first = True
+    for row in rows:
+        buffer.append(('' if first else ',') + encoder.encode(row))
+        first = False
+        if len(buffer) >= chunk_rows:
+            yield ''.join(buffer)
+            buffer = []
+    buffer.append(']}')
+    yield ''.join(buffer)
+
+
+def _gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class StreamingJsonResponse(StreamingHttpResponse):
+    """Stream `{**extra, key: [row, ...]}` with rows serialized lazily from `rows`."""
+
+    def __init__(self, rows, request=None, key='results', extra=None, chunk_rows=CHUNK_ROWS, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        chunks = _json_chunks(rows, key, extra or {}, chunk_rows)
+        gzip_ok = request is not None and accepts_gzip(request)
+        if gzip_ok:
+            super().__init__(_gzip_chunks(chunks), **kwargs)
+            self['Content-Encoding'] = 'gzip'
+        else:
+            super().__init__((chunk.encode('utf-8') for chunk in chunks), **kwargs)
+        patch_vary_headers(self, ('Accept-Encoding',))
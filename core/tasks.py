@@ -0,0 +1,8 @@
+"""Background job handlers for the core app (executed by `manage.py runworker`)."""
+from jobs.registry import task
+from . import catalog_sync
+
+
+@task('core.prune_catalog_changes')
+def prune_catalog_changes():
+    catalog_sync.prune_changes()
@@ -1,11 +1,33 @@
-from django.test import TestCase, Client
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+from django.test import TestCase, Client, RequestFactory
 from django.urls import reverse
 from django.contrib.auth import get_user_model
-from review.models import Review
+from review.models import Review, Bookmark
 from core.models import Course, Prof, Section
 from django.utils import timezone
 from stats.models import DailyActiveUser, CourseSearchStat, CourseViewStat, CourseReviewStat
 from datetime import date
+from jobs.models import Job
+from jobs.worker import run_pending
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from core.search_cache import normalize_query, get_cached_results
+from core.enrollment import get_enrollment_profile
+from core.catalog import get_catalog
+from core.versioning import bump_version, get_version, CATALOG
+from core.streaming import StreamingJsonResponse, accepts_gzip
+from core.catalog_sync import changes_since, prune_changes
+from core.models import CatalogChange, Campus
+from planner.models import SectionSchedule
+from datetime import time, timedelta
+from core.models import Enrollment
+from review.forms import ReviewForm
 
 
 class LatestReviewsAPITest(TestCase):
@@ -46,6 +68,8 @@ class LatestReviewsAPITest(TestCase):
 		url = reverse('core:search')
 		resp = self.client.get(url, {'q': 'TEST101'})
 		self.assertEqual(resp.status_code, 200)
+		# stats are written by the background job worker
+		run_pending()
 		stat_exists = CourseSearchStat.objects.filter(course__course_code__iexact='TEST101', date=date.today()).exists()
 		self.assertTrue(stat_exists)
 
@@ -54,6 +78,7 @@ class LatestReviewsAPITest(TestCase):
 		url = reverse('core:course_detail', args=["TEST101"])
 		resp = self.client.get(url)
 		self.assertEqual(resp.status_code, 200)
+		run_pending()
 		self.assertTrue(CourseViewStat.objects.filter(course__course_code='TEST101', date=date.today()).exists())
 
 	def test_write_review_increments_course_review_stat(self):
@@ -77,8 +102,312 @@ class LatestReviewsAPITest(TestCase):
 		from review.models import Review
 		self.assertTrue(Review.objects.filter(course=course, head='Great course', user=self.user).exists())
 		# Then ensure stats incremented
+		run_pending()
 		self.assertTrue(CourseReviewStat.objects.filter(course=course, date=date.today()).exists())
 
 
 
 # Create your tests here.
+
+
+class VersioningTest(TestCase):
+	def setUp(self):
+		cache.clear()
+
+	def test_tests_run_on_a_private_memory_cache(self):
+		self.assertEqual(settings.CACHES['default']['BACKEND'], 'django.core.cache.backends.locmem.LocMemCache')
+
+	def test_bump_inside_a_transaction_is_repeated_after_commit(self):
+		before = get_version(CATALOG)
+		with self.captureOnCommitCallbacks(execute=True) as callbacks:
+			bumped = bump_version(CATALOG)
+			self.assertEqual(get_version(CATALOG), bumped)
+		self.assertEqual(len(callbacks), 1)
+		self.assertNotIn(get_version(CATALOG), (before, bumped))
+
+
+class SearchCacheTest(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.client = Client()
+		self.course = Course.objects.create(course_name='Computer Networks', course_code='CN321', description='x', credit=3)
+
+	def test_normalize_query(self):
+		self.assertEqual(normalize_query('  CN \t 321 '), 'cn 321')
+		# decomposed SARA AM and zero-width space normalize to the composed form
+		self.assertEqual(normalize_query('\u0e19\u0e4d\u0e32\u200b'), '\u0e19\u0e33')
+
+	def test_search_populates_and_reuses_cache(self):
+		resp = self.client.get(reverse('core:search'), {'q': 'cn321'})
+		self.assertEqual(resp.status_code, 200)
+		cached = get_cached_results('CN321 ', 'alphabetical', 'asc')
+		self.assertEqual(cached['courses'], [self.course.pk])
+		resp = self.client.get(reverse('core:search'), {'q': ' CN321'})
+		self.assertEqual([c.pk for c in resp.context['courses']], [self.course.pk])
+
+	def test_both_thai_spellings_match_stored_text(self):
+		composed = Prof.objects.create(prof_name='\u0e2d.\u0e19\u0e33\u0e0a\u0e31\u0e22')
+		decomposed = Prof.objects.create(prof_name='\u0e2d.\u0e19\u0e4d\u0e32\u0e1e\u0e23')
+		for query in ('\u0e19\u0e33', '\u0e19\u0e4d\u0e32'):
+			cache.clear()
+			resp = self.client.get(reverse('core:search'), {'q': query})
+			self.assertEqual({p.pk for p in resp.context['professors']}, {composed.pk, decomposed.pk})
+
+	def test_section_with_two_teachers_is_listed_once(self):
+		section = Section.objects.create(course=self.course, section_number='01')
+		section.teachers.add(Prof.objects.create(prof_name='Dr One'), Prof.objects.create(prof_name='Dr Two'))
+		resp = self.client.get(reverse('core:search'), {'q': 'cn321'})
+		self.assertEqual([s.pk for s in resp.context['sections']], [section.pk])
+		self.assertEqual(get_cached_results('cn321', 'alphabetical', 'asc')['sections'], [section.pk])
+
+	def test_catalog_write_invalidates_cache(self):
+		self.client.get(reverse('core:search'), {'q': 'CN'})
+		self.assertIsNotNone(get_cached_results('cn', 'alphabetical', 'asc'))
+		Course.objects.create(course_name='Cloud Networking', course_code='CN999', description='', credit=3)
+		self.assertIsNone(get_cached_results('cn', 'alphabetical', 'asc'))
+		resp = self.client.get(reverse('core:search'), {'q': 'CN'})
+		self.assertEqual(len(resp.context['courses']), 2)
+
+
+class EnrollmentProfileTest(TestCase):
+	def setUp(self):
+		cache.clear()
+		User = get_user_model()
+		self.user = User.objects.create_user(username='enrolled', email='enrolled@example.com', password='pw')
+		self.course = Course.objects.create(course_name='Databases', course_code='CN230', description='', credit=3)
+		self.prof_a = Prof.objects.create(prof_name='Dr A')
+		self.prof_b = Prof.objects.create(prof_name='Dr B')
+		self.sec1 = Section.objects.create(course=self.course, section_number='01')
+		self.sec2 = Section.objects.create(course=self.course, section_number='02')
+		self.sec1.teachers.add(self.prof_a)
+		self.sec2.teachers.add(self.prof_b)
+		Enrollment.objects.create(user=self.user, section=self.sec1)
+
+	def test_profile_is_cached_and_invalidated_on_enrollment(self):
+		profile = get_enrollment_profile(self.user)
+		self.assertEqual(profile.section_ids, {self.sec1.id})
+		self.assertEqual(profile.prof_ids, {self.prof_a.id})
+		self.assertTrue(profile.prof_teaches_course(self.prof_b.id, self.course.id))
+		with self.assertNumQueries(0):
+			get_enrollment_profile(self.user)
+		self.sec2.students.add(self.user)
+		self.assertEqual(get_enrollment_profile(self.user).section_ids, {self.sec1.id, self.sec2.id})
+
+	def test_form_validates_from_profile(self):
+		get_enrollment_profile(self.user)
+		form = ReviewForm({
+			'course': str(self.course.id), 'section': str(self.sec1.id), 'prof': str(self.prof_b.id),
+			'header': 'h', 'body': 'b', 'rating': '4',
+		}, user=self.user)
+		self.assertFalse(form.is_valid())
+		self.assertIn('prof', form.errors)
+
+	def test_ajax_lookups_use_profile(self):
+		self.client.login(username='enrolled', password='pw')
+		resp = self.client.get(reverse('review:ajax_get_sections'), {'course_id': self.course.id})
+		self.assertEqual(resp.json()['sections'], [{'id': self.sec1.id, 'text': 'Section 01'}])
+		resp = self.client.get(reverse('review:ajax_get_professors'), {'section_id': self.sec1.id})
+		self.assertEqual(resp.json()['professors'], [{'id': self.prof_a.id, 'name': 'Dr A'}])
+
+
+class CatalogTest(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.course = Course.objects.create(course_name='Operating Systems', course_code='CN310', description='', credit=3)
+		self.prof = Prof.objects.create(prof_name='Dr Kernel')
+		self.section = Section.objects.create(course=self.course, section_number='01')
+		self.section.teachers.add(self.prof)
+
+	def test_snapshot_is_reused_until_catalog_changes(self):
+		catalog = get_catalog()
+		self.assertEqual(catalog.course_by_code('cn310').sections[0].teachers[0].prof_name, 'Dr Kernel')
+		self.assertEqual(catalog.profs[self.prof.id].teaching_sections[0].course.course_code, 'CN310')
+		with self.assertNumQueries(0):
+			self.assertIs(get_catalog(), catalog)
+		Section.objects.create(course=self.course, section_number='02')
+		self.assertEqual(len(get_catalog().sections_for_course(self.course.id)), 2)
+
+	def test_detail_pages_read_catalog(self):
+		get_catalog()
+		resp = self.client.get(reverse('core:course_detail', args=['cn310']))
+		self.assertEqual(resp.status_code, 200)
+		self.assertContains(resp, 'Dr Kernel')
+		resp = self.client.get(reverse('core:professor_detail', args=[self.prof.id]))
+		self.assertContains(resp, 'CN310')
+		self.assertEqual(self.client.get(reverse('core:course_detail', args=['NOPE'])).status_code, 404)
+
+
+class CatalogSyncTest(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.campus = Campus.objects.create(name='Rangsit')
+		self.course = Course.objects.create(course_name='Networks', course_code='CN321', description='', credit=3)
+		self.prof = Prof.objects.create(prof_name='Dr Packet')
+		self.section = Section.objects.create(course=self.course, section_number='01', campus=self.campus, room='R1')
+		self.section.teachers.add(self.prof)
+		SectionSchedule.objects.create(section=self.section, day_of_week=1, start_time=time(9, 30), end_time=time(11, 0))
+
+	def test_snapshot_is_compact_and_revalidated_by_version(self):
+		url = reverse('core:catalog_snapshot_api')
+		resp = self.client.get(url)
+		data = json.loads(resp.content)
+		self.assertEqual(data['version'], CatalogChange.objects.latest('id').id)
+		self.assertEqual(data['courses'], [[self.course.id, 'CN321', 'Networks', 3]])
+		self.assertEqual(data['sections'], [[self.section.id, self.course.id, '01', self.campus.id, 'R1', '', [self.prof.id], [[1, 570, 660]]]])
+		self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=resp['ETag']).status_code, 304)
+		gz = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+		self.assertEqual(json.loads(gzip.decompress(gz.content)), data)
+		refused = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+		self.assertFalse(refused.has_header('Content-Encoding'))
+		self.assertEqual(json.loads(refused.content), data)
+
+	def test_delta_returns_changed_and_deleted_rows(self):
+		since = json.loads(self.client.get(reverse('core:catalog_snapshot_api')).content)['version']
+		url = reverse('core:catalog_changes_api')
+		self.assertEqual(json.loads(self.client.get(url, {'since': since}).content)['sections'], [])
+		other = Prof.objects.create(prof_name='Dr Route')
+		other.teaching_sections.add(self.section)
+		course_id, section_id = self.course.id, self.section.id
+		self.course.delete()
+		data = json.loads(self.client.get(url, {'since': since}).content)
+		self.assertEqual(data['profs'], [[other.id, 'Dr Route']])
+		self.assertEqual(data['sections'], [])
+		self.assertEqual(data['deleted']['sections'], [section_id])
+		self.assertEqual(data['deleted']['courses'], [course_id])
+		self.assertEqual(self.client.get(url, {'since': 'x'}).status_code, 400)
+
+	def test_deleting_a_campus_logs_its_sections(self):
+		since = CatalogChange.objects.latest('id').id
+		campus_id = self.campus.id
+		self.campus.delete()
+		data = changes_since(since)
+		self.assertEqual(data['deleted']['campuses'], [campus_id])
+		self.assertEqual([(row[0], row[3]) for row in data['sections']], [(self.section.id, None)])
+
+	def test_seed_commands_log_bulk_created_rows(self):
+		since = CatalogChange.objects.latest('id').id
+		call_command('add_course_thai', stdout=io.StringIO())
+		data = changes_since(since)
+		self.assertEqual(len(data['courses']), 10)
+		self.assertEqual(data['deleted']['courses'], [self.course.id])
+
+	def test_pruned_log_asks_for_resync(self):
+		Prof.objects.create(prof_name='Dr Late')
+		CatalogChange.objects.update(created_at=timezone.now() - timedelta(days=60))
+		prune_changes(retention_days=30)
+		self.assertEqual(CatalogChange.objects.count(), 1)
+		resp = self.client.get(reverse('core:catalog_changes_api'), {'since': 1})
+		self.assertTrue(json.loads(resp.content)['resync'])
+
+
+class ConditionalGetTest(TestCase):
+	def setUp(self):
+		cache.clear()
+		User = get_user_model()
+		self.user = User.objects.create_user(username='etag', email='etag@example.com', password='pw')
+		self.course = Course.objects.create(course_name='Networks Lab', course_code='CN322', description='', credit=1)
+		self.prof = Prof.objects.create(prof_name='Dr Packet')
+		self.url = reverse('core:course_detail', args=['CN322'])
+
+	def test_matching_etag_returns_304_without_queries(self):
+		resp = self.client.get(self.url)
+		etag = resp['ETag']
+		self.assertIn('no-cache', resp['Cache-Control'])
+		with self.assertNumQueries(1):  # queuing the view-count job
+			resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+		self.assertEqual(resp.status_code, 304)
+
+		Review.objects.create(user=self.user, course=self.course, prof=self.prof, head='h', body='b', rating=5)
+		resp = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+		self.assertEqual(resp.status_code, 200)
+		self.assertNotEqual(resp['ETag'], etag)
+
+	def test_not_modified_responses_still_count_views_and_searches(self):
+		stat_jobs = Job.objects.filter(task='stats.increment_course_stat')
+		etag = self.client.get(self.url)['ETag']
+		self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+		self.assertEqual([job.payload['course_ids'] for job in stat_jobs.filter(payload__metric='view')], [[self.course.id]] * 2)
+
+		search_url = reverse('core:search')
+		etag = self.client.get(search_url, {'q': 'cn322'})['ETag']
+		self.assertEqual(self.client.get(search_url, {'q': 'cn322'}, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+		self.assertEqual(stat_jobs.filter(payload__metric='search').count(), 2)
+
+	def test_validators_per_stream_and_viewer(self):
+		prof_url = reverse('core:professor_detail', args=[self.prof.id])
+		latest_url = reverse('core:latest_reviews_api')
+		prof_etag = self.client.get(prof_url)['ETag']
+		latest_etag = self.client.get(latest_url)['ETag']
+		# a review of another professor's course leaves this professor's page valid
+		Review.objects.create(user=self.user, course=self.course, head='h', body='b', rating=5)
+		self.assertEqual(self.client.get(prof_url, HTTP_IF_NONE_MATCH=prof_etag).status_code, 304)
+		self.assertEqual(self.client.get(latest_url, HTTP_IF_NONE_MATCH=latest_etag).status_code, 200)
+
+		self.client.login(username='etag', password='pw')
+		etag = self.client.get(self.url)['ETag']
+		self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+		Bookmark.objects.create(user=self.user, course=self.course)
+		self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class StaticPipelineTest(TestCase):
+	def setUp(self):
+		self.root = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, self.root)
+		os.makedirs(os.path.join(self.root, 'css'))
+		with open(os.path.join(self.root, 'css', 'app.0123456789ab.css'), 'w') as f:
+			f.write('body { color: red; }\n' * 100)
+		with open(os.path.join(self.root, 'staticfiles.json'), 'w') as f:
+			json.dump({'paths': {'css/app.css': 'css/app.0123456789ab.css'}, 'version': '1.1', 'hash': ''}, f)
+
+	def test_precompressed_hashed_asset_is_served_immutable(self):
+		with self.settings(STATIC_ROOT=self.root):
+			call_command('compress_static', stdout=io.StringIO())
+			self.assertTrue(os.path.exists(os.path.join(self.root, 'css', 'app.0123456789ab.css.gz')))
+			resp = self.client.get('/static/css/app.0123456789ab.css', HTTP_ACCEPT_ENCODING='gzip, br')
+			self.assertEqual(resp['Content-Encoding'], 'gzip')
+			self.assertIn('immutable', resp['Cache-Control'])
+			body = gzip.decompress(b''.join(resp.streaming_content))
+			self.assertTrue(body.startswith(b'body { color: red; }'))
+			resp = self.client.get('/static/css/app.0123456789ab.css')
+			self.assertFalse(resp.has_header('Content-Encoding'))
+			self.assertEqual(self.client.get('/static/css/missing.css').status_code, 404)
+
+
+class StreamingJsonTest(TestCase):
+	def setUp(self):
+		User = get_user_model()
+		User.objects.create_user(username='planner', email='planner@example.com', password='pw')
+		self.client.login(username='planner', password='pw')
+		course = Course.objects.create(course_name='Algorithms', course_code='CN201', description='', credit=3)
+		for i in range(1, 8):
+			Section.objects.create(course=course, section_number=f'{i:02d}')
+
+	def test_helper_streams_valid_json_in_chunks(self):
+		resp = StreamingJsonResponse(({'n': i} for i in range(5)), extra={'ok': True}, chunk_rows=2)
+		chunks = list(resp.streaming_content)
+		self.assertGreater(len(chunks), 2)
+		self.assertEqual(json.loads(b''.join(chunks)), {'ok': True, 'results': [{'n': i} for i in range(5)]})
+		empty = StreamingJsonResponse(iter(()), key='variants')
+		self.assertEqual(json.loads(b''.join(empty.streaming_content)), {'variants': []})
+
+	def test_accepts_gzip_honours_qvalues(self):
+		cases = {
+			'gzip': True, 'deflate, gzip;q=0.5': True, 'GZIP; Q=1.0': True, '*': True, 'br, *;q=0.1': True,
+			'': False, 'br': False, 'gzip;q=0': False, 'gzip;q=0.000, *': False, '*;q=0': False,
+		}
+		for header, expected in cases.items():
+			request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=header)
+			self.assertIs(accepts_gzip(request), expected, header)
+
+	def test_section_list_gzip(self):
+		resp = self.client.get(reverse('planner:section_list'), HTTP_ACCEPT_ENCODING='gzip')
+		self.assertEqual(resp['Content-Encoding'], 'gzip')
+		data = json.loads(gzip.decompress(b''.join(resp.streaming_content)))
+		self.assertEqual([row['sec'] for row in data['results']], [f'{i:02d}' for i in range(1, 8)])
+		resp = self.client.get(reverse('planner:section_list'), HTTP_ACCEPT_ENCODING='br, gzip; q=0')
+		self.assertFalse(resp.has_header('Content-Encoding'))
+		resp = self.client.get(reverse('planner:search_sections'), {'q': 'cn201'})
+		self.assertEqual(len(json.loads(b''.join(resp.streaming_content))['results']), 7)
+		resp = self.client.get(reverse('review:ajax_search_courses'), {'term': 'algo'})
+		self.assertEqual(json.loads(b''.join(resp.streaming_content))['results'][0]['text'], 'CN201 - Algorithms')
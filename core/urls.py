@@ -1,6 +1,9 @@
 # core/urls.py
 from django.urls import path, register_converter
-from .views import course_detail, homepage_view, about_view, search, prof_detail, toggle_course_bookmark, latest_reviews_api
+from .views import (
+    course_detail, homepage_view, about_view, search, prof_detail, toggle_course_bookmark, latest_reviews_api,
+    course_reviews_api, prof_reviews_api, catalog_snapshot_api, catalog_changes_api,
+)
 from .converters import CaseInsensitiveSlugConverter
 
 register_converter(CaseInsensitiveSlugConverter, 'ci')
@@ -15,4 +18,8 @@ urlpatterns = [
     path('courses/<ci:course_code>/', course_detail, name='course_detail'),
     path('courses/<int:course_id>/bookmark/', toggle_course_bookmark, name='toggle_course_bookmark'),
     path('api/reviews/latest/', latest_reviews_api, name='latest_reviews_api'),
+    path('api/courses/<int:course_id>/reviews/', course_reviews_api, name='course_reviews_api'),
+    path('api/professors/<int:pk>/reviews/', prof_reviews_api, name='prof_reviews_api'),
+    path('api/catalog/', catalog_snapshot_api, name='catalog_snapshot_api'),
+    path('api/catalog/changes/', catalog_changes_api, name='catalog_changes_api'),
 ]
\ No newline at end of file
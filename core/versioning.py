@@ -0,0 +1,76 @@
+# core/versioning.py
+"""Version counters used to invalidate cached data.
+
+Instead of expiring cached entries after a fixed TTL, cached values embed the
+current version of the data they were built from. Writers bump the version
+(see `core.signals` / `review.signals`) and every entry built from the old
+version simply stops being looked up. Counters live in the default cache, which
+must be shared by every process (see CACHES in settings) so a bump made by one
+worker is seen by all of them.
+
+A version is a random number, not an incremented counter: versions are
+only compared for equality, and a fresh random value needs no atomic `incr`
+(the file and database caches do not have one), so two concurrent bumps can
+never both land on the same number. A bump inside a transaction is repeated
+once it commits, so a reader that cached the old rows under the first new
+version between the write and the commit cannot keep serving them.
+"""
+import secrets
+
+from django.core.cache import cache
+from django.db import transaction
+
+# Well-known version namespaces
+CATALOG = 'catalog'   # courses, professors, sections, campuses, teaching assignments
+REVIEWS = 'reviews'   # reviews and votes on them
+COURSE_REVIEWS = 'course_reviews'  # per course: its reviews and their votes
+PROF_REVIEWS = 'prof_reviews'      # per professor: their reviews and the votes on them
+REVIEW_CONTENT = 'review_content'  # per review: what its rendered block shows (text, rating, tags)
+VIEWER = 'viewer'     # per user: anything that changes how pages render for them (bookmarks, own votes, profile)
+
+
+def _new_version():
+    # random rather than incremented or time based: a cache flush or a lost concurrent update never reuses a version
+    return secrets.randbits(63)
+
+
+def _version_key(namespace, obj_id=None):
+    if obj_id is None:
+        return f'version:{namespace}'
+    return f'version:{namespace}:{obj_id}'
+
+
+def get_version(namespace, obj_id=None):
+    """Return the current version number for `namespace` (optionally per object)."""
+    key = _version_key(namespace, obj_id)
+    return cache.get_or_set(key, _new_version, timeout=None)
+
+
+def get_versions(namespace, obj_ids):
+    """Per-object versions for many ids in one cache round trip: {obj_id: version}."""
+    keys = {_version_key(namespace, obj_id): obj_id for obj_id in obj_ids}
+    found = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def bump_version(namespace, obj_id=None):
+    """Invalidate everything cached against `namespace` by moving to a new version."""
+    key = _version_key(namespace, obj_id)
+    version = _new_version()
+    cache.set(key, version, timeout=None)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: cache.set(key, _new_version(), timeout=None))
+    return version
+
+
+def bump_review_versions(course_id=None, prof_id=None):
+    """A review (or its votes / visibility) changed: invalidate the review stream and its course and prof."""
+    bump_version(REVIEWS)
+    if course_id is not None:
+        bump_version(COURSE_REVIEWS, course_id)
+    if prof_id is not None:
+        bump_version(PROF_REVIEWS, prof_id)
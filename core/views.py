@@ -1,70 +1,141 @@
 # core/views.py
 from django.shortcuts import render, get_object_or_404
+from django.urls import reverse
 from django.core.paginator import Paginator, EmptyPage
-from django.template.loader import render_to_string
 from django.db.models import Q, Exists, OuterRef, Sum, F
 from django.utils import timezone
 from datetime import date
 from core.models import Prof, Course, Section
-from stats.models import CourseSearchStat, CourseViewStat
+from core.catalog import get_catalog
+from core import catalog_sync
+from core.conditional import conditional_on_versions
+from core.streaming import accepts_gzip
+from core.versioning import get_version, CATALOG, REVIEWS, COURSE_REVIEWS, PROF_REVIEWS
+from core.search_cache import normalize_query, search_term, filter_matching, get_cached_results, set_cached_results
+from jobs.registry import enqueue
+from stats.trending import get_trending
 from django.db.models.functions import Coalesce
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, Http404
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
 from itertools import chain
 from review.models import Bookmark, Review
+from review import feeds
+from review.fragments import render_review_blocks
+from review.timeline import timeline_review_ids
 from django.db import IntegrityError
 
 # ==================================
 #  Simple Views
 # ==================================
 
-def homepage_view(request):
-    # Show the first page of latest reviews on the homepage
-    from review.models import Review
-    # Annotate whether the current user has bookmarked the review so the UI can show filled icons
-    from review.models import Bookmark
-    user_bookmark_subquery = Bookmark.objects.none()
-    if request.user.is_authenticated:
-        user_bookmark_subquery = Bookmark.objects.filter(user=request.user, review=OuterRef('pk'))
+# Homepage feed orderings; both are served by an index on Review
+HOME_SORTS = {
+    'newest': ('-date_created',),
+    'helpful': ('-helpfulness', '-id'),
+}
 
-    reviews_qs = Review.objects.annotate(
-        is_bookmarked=Exists(user_bookmark_subquery),
-        score=Coalesce(Sum('votes__vote_type'), 0),
-        user_vote=Coalesce(Sum('votes__vote_type', filter=Q(votes__user_id=request.user.id)), 0)
-    ).select_related('user', 'course', 'prof').order_by('-date_created')
+
+def _home_reviews(request):
+    """Visible reviews in the requested homepage order, with the viewer's bookmark/vote state."""
+    sort = request.GET.get('sort')
+    if sort not in HOME_SORTS:
+        sort = 'newest'
+    reviews_qs = feeds.with_viewer_state(Review.objects.visible(), request.user)
+    return sort, reviews_qs.select_related('user', 'course', 'prof', 'section').order_by(*HOME_SORTS[sort])
+
+
+def homepage_view(request):
+    # Show the first page of latest (or most helpful) reviews on the homepage
+    sort, reviews_qs = _home_reviews(request)
     paginator = Paginator(reviews_qs, 10)
     try:
         page_obj = paginator.page(1)
     except EmptyPage:
         page_obj = paginator.page(paginator.num_pages)
 
+    # Personal feed: one range read on the user's timeline, then the reviews by id
+    timeline_reviews = []
+    if request.user.is_authenticated:
+        ids = timeline_review_ids(request.user.id, 5)
+        visible = Review.objects.visible().select_related('user', 'course', 'prof', 'section')
+        by_id = feeds.with_viewer_state(visible, request.user).in_bulk(ids)
+        timeline_reviews = [by_id[pk] for pk in ids if pk in by_id]
+
     context = {
         'reviews': page_obj.object_list,
         'has_next': page_obj.has_next(),
         'next_page': 2 if page_obj.has_next() else None,
+        'sort': sort,
+        'timeline_reviews': timeline_reviews,
+        # Read from the stored ranking; never computed during the request
+        'trending_courses': get_trending(5),
     }
     return render(request, 'core/homepage.html', context)
 
 
+# --- Conditional GET validators: version counters only, never queries (see core/conditional.py) ---
+
+def _review_stream_versions(request):
+    return (REVIEWS, get_version(REVIEWS))
+
+
+def _search_versions(request):
+    return (CATALOG, get_version(CATALOG), REVIEWS, get_version(REVIEWS))
+
+
+def _course_versions(request, course_code=None, course_id=None):
+    if course_id is None:
+        course = get_catalog().course_by_code(course_code)
+        if course is None:
+            return None
+        course_id = course.id
+    return (CATALOG, get_version(CATALOG), course_id, get_version(COURSE_REVIEWS, course_id))
+
+
+def _prof_versions(request, pk):
+    return (CATALOG, get_version(CATALOG), pk, get_version(PROF_REVIEWS, pk))
+
+
+# --- Analytics, counted by the job worker; also run for 304 responses, which skip the view body ---
+
+def _record_course_stat(metric, course_ids):
+    try:
+        if course_ids:
+            enqueue('stats.increment_course_stat', metric=metric, course_ids=course_ids, day=date.today().isoformat())
+    except Exception:
+        # Don't let analytics failures break the page
+        pass
+
+
+def _count_search_not_modified(request):
+    # the top matched courses come from the cached result ids (no query); nothing is counted if they were evicted
+    query = request.GET.get('q', '').strip()
+    cached = get_cached_results(
+        normalize_query(query), request.GET.get('sort_by', 'alphabetical'), request.GET.get('order', 'asc')
+    ) if query else None
+    if cached:
+        _record_course_stat('search', cached['courses'][:5])
+
+
+def _count_view_not_modified(request, course_code):
+    course = get_catalog().course_by_code(course_code)
+    if course is not None:
+        _record_course_stat('view', [course.id])
+
+
+@conditional_on_versions(_review_stream_versions)
 def latest_reviews_api(request):
     """
     Paginated AJAX endpoint returning rendered review blocks.
-    Query params: page (1-based), page_size
+    Query params: page (1-based), page_size, sort (newest|helpful)
     """
-    from review.models import Review, Bookmark
     page = int(request.GET.get('page', 1))
     page_size = int(request.GET.get('page_size', 10))
 
-    user_bookmark_subquery = Bookmark.objects.none()
-    if request.user.is_authenticated:
-        user_bookmark_subquery = Bookmark.objects.filter(user=request.user, review=OuterRef('pk'))
-
-    reviews_qs = Review.objects.annotate(
-        is_bookmarked=Exists(user_bookmark_subquery),
-        score=Coalesce(Sum('votes__vote_type'), 0),
-        user_vote=Coalesce(Sum('votes__vote_type', filter=Q(votes__user_id=request.user.id)), 0)
-    ).select_related('user', 'course', 'prof').order_by('-date_created')
+    sort, reviews_qs = _home_reviews(request)
 
     paginator = Paginator(reviews_qs, page_size)
     try:
@@ -72,10 +143,7 @@ def latest_reviews_api(request):
     except EmptyPage:
         return JsonResponse({'reviews_html': '', 'has_next': False, 'next_page': None})
 
-    rendered_blocks = []
-    for rev in page_obj.object_list:
-        html = render_to_string('review/includes/review_block.html', {'review': rev, 'user': request.user}, request=request)
-        rendered_blocks.append(html)
+    rendered_blocks = render_review_blocks(page_obj.object_list, request)
 
     return JsonResponse({
         'reviews_html': ''.join(rendered_blocks),
@@ -90,11 +158,16 @@ def about_view(request):
 #  Search View
 # ==================================
 
+@conditional_on_versions(_search_versions, on_not_modified=_count_search_not_modified)
 def search(request):
-    query = request.GET.get('q', '')
+    query = request.GET.get('q', '').strip()
     sort_by = request.GET.get('sort_by', 'alphabetical')
     order = request.GET.get('order', 'asc')
     order_prefix = '-' if order == 'desc' else ''
+    # Both the query and the stored text are normalized, so every spelling of a query
+    # matches the same rows and can share one cache entry
+    normalized_query = normalize_query(query)
+    term = search_term(query)
 
     # --- สร้าง subquery สำหรับเช็ค bookmark ก่อน ---
     user_bookmark_subquery = Bookmark.objects.none()
@@ -104,48 +177,38 @@ def search(request):
         )
 
     # --- สร้าง QuerySet พื้นฐานสำหรับ Review พร้อม Annotation ---
-    reviews_queryset = Review.objects.annotate(
+    reviews_queryset = Review.objects.visible().annotate(
         is_bookmarked=Exists(user_bookmark_subquery),
         score=Coalesce(Sum('votes__vote_type'), 0),
         user_vote=Coalesce(Sum('votes__vote_type', filter=Q(votes__user_id=request.user.id)), 0)
     ).select_related('course', 'prof', 'user').distinct()
 
-    if query:
+    cached = get_cached_results(normalized_query, sort_by, order) if normalized_query else None
+
+    if cached is not None:
+        # --- Cache hit: reload rows by id; viewer annotations are applied fresh ---
+        professors = Prof.objects.filter(pk__in=cached['professors'])
+        courses = Course.objects.filter(pk__in=cached['courses'])
+        sections = Section.objects.filter(pk__in=cached['sections']).select_related('course').prefetch_related('teachers')
+        reviews = reviews_queryset.filter(pk__in=cached['reviews'])
+    elif normalized_query:
         # --- กรองข้อมูลตาม query ---
-        professors = Prof.objects.filter(
-            Q(prof_name__icontains=query) | Q(description__icontains=query)
-        ).distinct()
+        professors = filter_matching(Prof.objects.all(), ['prof_name', 'description'], term).distinct()
 
-        courses = Course.objects.filter(
-            Q(course_code__icontains=query) | Q(course_name__icontains=query) | Q(description__icontains=query)
-        ).distinct()
+        courses = filter_matching(Course.objects.all(), ['course_code', 'course_name', 'description'], term).distinct()
 
-        sections = Section.objects.filter(
-            Q(course__course_code__icontains=query) | Q(course__course_name__icontains=query) | Q(teachers__prof_name__icontains=query)
+        sections = filter_matching(
+            Section.objects.all(), ['course__course_code', 'course__course_name', 'teachers__prof_name'], term
         ).select_related('course').prefetch_related('teachers').distinct()
 
-        reviews = reviews_queryset.filter(
-            Q(head__icontains=query) | Q(body__icontains=query)
-        )
+        reviews = filter_matching(reviews_queryset, ['head', 'body'], term)
     else:
         # --- ถ้าไม่มี query ให้ดึงข้อมูลทั้งหมด ---
         professors = Prof.objects.all()
         courses = Course.objects.all()
         sections = Section.objects.select_related('course').prefetch_related('teachers').all()
         reviews = reviews_queryset.all()
-    # --- Analytics: increment course search stats when courses are present in results
-    try:
-        if query and courses.exists():
-            today = date.today()
-            # Only increment top N matched course stats to reduce write amplification (e.g., top 5)
-            for course in courses[:5]:
-                stat, created = CourseSearchStat.objects.get_or_create(course=course, date=today, defaults={'count': 1})
-                if not created:
-                    CourseSearchStat.objects.filter(pk=stat.pk).update(count=F('count') + 1)
-    except Exception:
-        # Don't let analytics failures break the main search flow
-        pass
-    
+
     # --- จัดเรียงข้อมูล ---
     if sort_by == 'alphabetical':
         professors = professors.order_by(f'{order_prefix}prof_name')
@@ -153,6 +216,19 @@ def search(request):
         sections = sections.order_by(f'{order_prefix}course__course_name', f'{order_prefix}section_number')
         reviews = reviews.order_by(f'{order_prefix}head')
 
+    if normalized_query and cached is None:
+        # Querysets cache their rows, so the template reuses this evaluation
+        set_cached_results(
+            normalized_query, sort_by, order,
+            [p.pk for p in professors], [c.pk for c in courses],
+            [s.pk for s in sections], [r.pk for r in reviews],
+        )
+
+    # --- Analytics: count a search hit for the top matched courses (written by the job worker)
+    if query:
+        # Only the top N matched courses (e.g., top 5) to reduce write amplification
+        _record_course_stat('search', [c.pk for c in courses[:5]])
+
     # --- รวมผลลัพธ์ทั้งหมดสำหรับแท็บ "All" ---
     all_results = sorted(
         list(chain(professors, courses, sections, reviews)),
@@ -178,86 +254,129 @@ def search(request):
 #  Detail Views
 # ==================================
 
+@conditional_on_versions(_prof_versions)
 def prof_detail(request, pk):
-    prof = get_object_or_404(Prof.objects.prefetch_related('teaching_sections__course'), pk=pk)
-
-    # สร้าง subquery สำหรับเช็ค bookmark (เฉพาะ user ที่ login)
-    user_bookmark_subquery = Bookmark.objects.filter(user=request.user, review=OuterRef('pk')) if request.user.is_authenticated else Bookmark.objects.none()
-
-    # Annotate รีวิวสำหรับอาจารย์คนนี้
-    reviews = prof.reviews.select_related('user', 'course').annotate(
-        is_bookmarked=Exists(user_bookmark_subquery),
-        # แก้ไข: เปลี่ยนชื่อ annotation จาก 'vote_score' เป็น 'score'
-        score=Coalesce(Sum('votes__vote_type'), 0),
-        user_vote=Coalesce(Sum('votes__vote_type', filter=Q(votes__user_id=request.user.id)), 0)
-    ).distinct()
-
-    return render(request, 'core/prof_detail.html', {'prof': prof, 'reviews': reviews})
+    # Professor and their sections come from the in-memory catalog snapshot
+    prof = get_catalog().profs.get(pk)
+    if prof is None:
+        raise Http404('Professor not found')
+
+    # Only the first page is rendered; the rest is lazy-loaded from prof_reviews_api
+    sort = request.GET.get('sort')
+    if sort not in feeds.SORTS:
+        sort = feeds.DEFAULT_SORT
+    reviews, next_cursor = feeds.review_page(feeds.prof_reviews(prof.id, request.user), sort)
+
+    return render(request, 'core/prof_detail.html', {
+        'prof': prof,
+        'reviews': reviews,
+        'sort': sort,
+        'next_cursor': next_cursor,
+        'feed_url': reverse('core:prof_reviews_api', args=[prof.id]),
+    })
 
 
+@conditional_on_versions(_course_versions, on_not_modified=_count_view_not_modified)
 def course_detail(request, course_code):
-    course = Course.objects.get(course_code__iexact=course_code)
+    # Course, sections, teachers and campuses come from the in-memory catalog snapshot
+    course = get_catalog().course_by_code(course_code)
+    if course is None:
+        raise Http404('Course not found')
     
     # Check if the course is bookmarked by the current user (review=None)
     course_is_bookmarked = False
     if request.user.is_authenticated:
         course_is_bookmarked = Bookmark.objects.filter(
             user=request.user,
-            course=course,
+            course_id=course.id,
             review=None
         ).exists()
     
-    # สร้าง subquery สำหรับเช็ค bookmark (เฉพาะ user ที่ login)
-    # A review is bookmarked if either:
-    # 1. The specific review is bookmarked (review=OuterRef('pk'))
-    # 2. The course is bookmarked (review=None)
-    if request.user.is_authenticated:
-        user_bookmark_subquery = Bookmark.objects.filter(
-            user=request.user,
-            course=course
-        ).filter(
-            Q(review=OuterRef('pk')) | Q(review=None)
-        )
-    else:
-        user_bookmark_subquery = Bookmark.objects.none()
-    
-    # Annotate รีวิวสำหรับคอร์สนี้
-    reviews = course.reviews.select_related('user', 'prof').annotate(
-        is_bookmarked=Exists(user_bookmark_subquery),
-        # แก้ไข: เปลี่ยนชื่อ annotation จาก 'vote_score' เป็น 'score'
-        score=Coalesce(Sum('votes__vote_type'), 0),
-        user_vote=Coalesce(Sum('votes__vote_type', filter=Q(votes__user_id=request.user.id)), 0)
-    ).distinct()
+    # Only the first page is rendered; the rest is lazy-loaded from course_reviews_api
+    sort = request.GET.get('sort')
+    if sort not in feeds.SORTS:
+        sort = feeds.DEFAULT_SORT
+    reviews, next_cursor = feeds.review_page(feeds.course_reviews(course.id, request.user), sort)
 
-    # --- Analytics: increment view count ---
-    try:
-        today = date.today()
-        stat, created = CourseViewStat.objects.get_or_create(course=course, date=today, defaults={'count': 1})
-        if not created:
-            CourseViewStat.objects.filter(pk=stat.pk).update(count=F('count') + 1)
-    except Exception:
-        pass
+    # --- Analytics: count the view in the background job worker ---
+    _record_course_stat('view', [course.id])
 
     return render(request, 'core/course_detail.html', {
         'course': course,
         'reviews': reviews,
-        'course_is_bookmarked': course_is_bookmarked
+        'course_is_bookmarked': course_is_bookmarked,
+        'sort': sort,
+        'next_cursor': next_cursor,
+        'feed_url': reverse('core:course_reviews_api', args=[course.id]),
     })
 
-    # Attempt to increment the CourseViewStat asynchronously is preferred;
-    # for now we increment directly but swallow exceptions to avoid breaking the page.
+
+def _review_feed_response(request, queryset):
+    """
+    One keyset page of a review feed as rendered review blocks.
+    Query params: sort (newest|score|rating), cursor, page_size
+    """
+    sort = request.GET.get('sort', feeds.DEFAULT_SORT)
     try:
-        today = date.today()
-        stat, created = CourseViewStat.objects.get_or_create(course=course, date=today, defaults={'count': 1})
-        if not created:
-            CourseViewStat.objects.filter(pk=stat.pk).update(count=F('count') + 1)
-    except Exception:
-        pass
+        page_size = int(request.GET.get('page_size', feeds.PAGE_SIZE))
+        reviews, next_cursor = feeds.review_page(queryset, sort, request.GET.get('cursor'), page_size)
+    except (ValueError, feeds.InvalidCursor):
+        return JsonResponse({'status': 'error', 'message': 'Invalid cursor or page size.'}, status=400)
+
+    rendered_blocks = render_review_blocks(reviews, request)
+    return JsonResponse({
+        'reviews_html': ''.join(rendered_blocks),
+        'has_next': next_cursor is not None,
+        'next_cursor': next_cursor,
+    })
+
+
+@conditional_on_versions(_course_versions)
+def course_reviews_api(request, course_id):
+    return _review_feed_response(request, feeds.course_reviews(course_id, request.user))
 
-    # Note: this increment moved above return to ensure it runs.
 
+@conditional_on_versions(_prof_versions)
+def prof_reviews_api(request, pk):
+    return _review_feed_response(request, feeds.prof_reviews(pk, request.user))
 
 
+def _catalog_etag(request):
+    return f'catalog-{catalog_sync.current_version()}'
+
+
+@condition(etag_func=_catalog_etag)
+def catalog_snapshot_api(request):
+    """
+    The whole catalog in one compact payload tagged with its version (see core/catalog_sync.py).
+    Clients keep it locally and follow up with catalog_changes_api.
+    """
+    body, gzipped = catalog_sync.get_snapshot_bytes(catalog_sync.current_version())
+    if accepts_gzip(request):
+        response = HttpResponse(gzipped, content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(body, content_type='application/json')
+    patch_vary_headers(response, ('Accept-Encoding',))
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def catalog_changes_api(request):
+    """
+    Catalog rows changed since a version the client already has.
+    Query params: since (version from a snapshot or an earlier delta)
+    Answers {"resync": true} when the client must download the snapshot again.
+    """
+    try:
+        since = int(request.GET.get('since', ''))
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'A numeric "since" version is required.'}, status=400)
+    payload = catalog_sync.changes_since(since)
+    if payload is None:
+        return JsonResponse({'resync': True, 'version': catalog_sync.current_version()})
+    return JsonResponse(payload)
+
 
 @login_required
 @require_POST
@@ -0,0 +1,21 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Job, PeriodicJobState
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'task', 'status', 'attempts', 'run_at', 'finished_at', 'locked_by')
+    list_filter = ('status', 'task')
+    search_fields = ('task', 'last_error')
+    actions = ['retry_jobs']
+
+    @admin.action(description='Retry selected jobs now')
+    def retry_jobs(self, request, queryset):
+        queryset.update(status=Job.STATUS_PENDING, run_at=timezone.now(), attempts=0, locked_at=None)
+
+
+@admin.register(PeriodicJobState)
+class PeriodicJobStateAdmin(admin.ModelAdmin):
+    list_display = ('task', 'next_run_at')
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.worker import run_pending, schedule_periodic, worker_id
+
+
+class Command(BaseCommand):
+    help = 'Run the background job worker: enqueue due periodic jobs, then claim and execute pending jobs in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit (useful from cron).')
+        parser.add_argument('--batch-size', type=int, default=None, help='Jobs claimed per round trip (default JOBS_BATCH_SIZE).')
+        parser.add_argument('--sleep', type=float, default=2.0, help='Seconds to wait when the queue is empty.')
+
+    def handle(self, *args, **options):
+        worker = worker_id()
+        self.stdout.write(f"Worker {worker} started.")
+        while True:
+            scheduled = schedule_periodic()
+            for name in scheduled:
+                self.stdout.write(f"Scheduled periodic job {name}.")
+            succeeded, failed = run_pending(worker, options['batch_size'])
+            if succeeded or failed:
+                self.stdout.write(f"Ran {succeeded} jobs, {failed} failed.")
+            if options['once']:
+                return
+            if not (succeeded or failed):
+                time.sleep(options['sleep'])
@@ -0,0 +1,36 @@
+"""Task registry and the `enqueue` entry point used by views."""
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Job
+
+_TASKS = {}
+
+
+def task(name):
+    """Register the decorated function as the handler for jobs named `name`.
+
+    Handlers receive the job payload as keyword arguments.
+    """
+    def decorator(func):
+        _TASKS[name] = func
+        return func
+    return decorator
+
+
+def get_task(name):
+    try:
+        return _TASKS[name]
+    except KeyError:
+        raise LookupError(f"No job handler registered for '{name}'") from None
+
+
+def enqueue(name, run_at=None, **payload):
+    """Queue `name` to run in the background worker; returns the Job."""
+    get_task(name)  # fail fast on typos instead of in the worker
+    return Job.objects.create(
+        task=name,
+        payload=payload,
+        run_at=run_at or timezone.now(),
+        max_attempts=getattr(settings, 'JOBS_MAX_ATTEMPTS', 5),
+    )
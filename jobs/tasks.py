@@ -0,0 +1,8 @@
+"""Background job handlers for the jobs app itself (executed by `manage.py runworker`)."""
+from .registry import task
+from .worker import prune_jobs
+
+
+@task('jobs.prune_jobs')
+def prune_finished_jobs():
+    prune_jobs()
@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .models import Job, PeriodicJobState
+from .registry import task, enqueue
+from .worker import claim_batch, prune_jobs, run_pending, schedule_periodic
+
+CALLS = []
+
+
+@task('jobs.test_record')
+def record(value):
+    CALLS.append(value)
+
+
+@task('jobs.test_fail')
+def fail():
+    raise RuntimeError('boom')
+
+
+class JobQueueTest(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_jobs_run_in_batches(self):
+        for i in range(5):
+            enqueue('jobs.test_record', value=i)
+        batch = claim_batch('w1', batch_size=2)
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(Job.objects.filter(status=Job.STATUS_RUNNING).count(), 2)
+        # claimed jobs are invisible to other workers
+        self.assertEqual(len(claim_batch('w2', batch_size=10)), 3)
+
+    def test_run_pending_executes_due_jobs_only(self):
+        enqueue('jobs.test_record', value='now')
+        enqueue('jobs.test_record', value='later', run_at=timezone.now() + timedelta(hours=1))
+        self.assertEqual(run_pending('w1'), (1, 0))
+        self.assertEqual(CALLS, ['now'])
+
+    @override_settings(JOBS_RETRY_BACKOFF_SECONDS=10)
+    def test_failed_job_retries_with_backoff_then_fails(self):
+        job = enqueue('jobs.test_fail')
+        self.assertEqual(run_pending('w1'), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_PENDING, 1))
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=5))
+        self.assertIn('boom', job.last_error)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now(), attempts=job.max_attempts - 1)
+        run_pending('w1')
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+
+    @override_settings(JOBS_LOCK_TIMEOUT_SECONDS=60)
+    def test_reclaiming_a_lost_job_counts_as_an_attempt(self):
+        job = enqueue('jobs.test_record', value='x')
+        claim_batch('w1')
+        expired = timezone.now() - timedelta(seconds=120)
+        Job.objects.filter(pk=job.pk).update(locked_at=expired, attempts=job.max_attempts - 2)
+        self.assertEqual([j.attempts for j in claim_batch('w2')], [job.max_attempts - 1])
+
+        # the second lost run uses up the last attempt
+        Job.objects.filter(pk=job.pk).update(locked_at=expired)
+        self.assertEqual(claim_batch('w3'), [])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_FAILED, job.max_attempts))
+        self.assertIn('Lock expired', job.last_error)
+
+    def test_prune_deletes_old_finished_jobs_only(self):
+        now = timezone.now()
+        old_done = enqueue('jobs.test_record', value=1)
+        old_failed = enqueue('jobs.test_record', value=2)
+        recent = enqueue('jobs.test_record', value=3)
+        pending = enqueue('jobs.test_record', value=4)
+        Job.objects.filter(pk=old_done.pk).update(status=Job.STATUS_DONE, finished_at=now - timedelta(days=20))
+        Job.objects.filter(pk=old_failed.pk).update(status=Job.STATUS_FAILED, finished_at=now - timedelta(days=20))
+        Job.objects.filter(pk=recent.pk).update(status=Job.STATUS_DONE, finished_at=now - timedelta(days=1))
+        self.assertEqual(prune_jobs(now, retention_days=14), 2)
+        self.assertEqual(set(Job.objects.values_list('pk', flat=True)), {recent.pk, pending.pk})
+
+    def test_unknown_task_is_rejected_at_enqueue(self):
+        with self.assertRaises(LookupError):
+            enqueue('jobs.does_not_exist')
+
+    @override_settings(JOBS_PERIODIC={'jobs.test_record': 60})
+    def test_periodic_jobs_are_enqueued_once_per_interval(self):
+        now = timezone.now()
+        self.assertEqual(schedule_periodic(now), ['jobs.test_record'])
+        self.assertEqual(schedule_periodic(now + timedelta(seconds=30)), [])
+        self.assertEqual(schedule_periodic(now + timedelta(seconds=61)), ['jobs.test_record'])
+        self.assertEqual(Job.objects.filter(task='jobs.test_record').count(), 2)
+        self.assertTrue(PeriodicJobState.objects.filter(task='jobs.test_record').exists())
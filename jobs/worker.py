@@ -0,0 +1,136 @@
+"""Claiming, executing and scheduling jobs (used by `manage.py runworker`)."""
+import logging
+import socket
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job, PeriodicJobState
+from .registry import get_task, enqueue
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_batch(worker, batch_size=None):
+    """Atomically mark up to `batch_size` due jobs as running for `worker` and return them.
+
+    Jobs left running past JOBS_LOCK_TIMEOUT_SECONDS (crashed worker) are claimable again;
+    the lost run counts as an attempt, so a job that keeps killing its worker
+    ends up failed instead of being retried forever.
+    """
+    batch_size = batch_size or _setting('JOBS_BATCH_SIZE', 20)
+    now = timezone.now()
+    stale = now - timedelta(seconds=_setting('JOBS_LOCK_TIMEOUT_SECONDS', 600))
+    with transaction.atomic():
+        due = (Job.objects.select_for_update(skip_locked=True)
+               .filter(status=Job.STATUS_PENDING, run_at__lte=now)
+               .order_by('run_at')
+               .values_list('pk', flat=True)[:batch_size])
+        ids = list(due)
+        if len(ids) < batch_size:
+            lost = list(Job.objects.select_for_update(skip_locked=True)
+                        .filter(status=Job.STATUS_RUNNING, locked_at__lt=stale)
+                        .values_list('pk', flat=True)[:batch_size - len(ids)])
+            if lost:
+                Job.objects.filter(pk__in=lost).update(
+                    attempts=F('attempts') + 1, last_error='Lock expired (worker lost the job)',
+                )
+                Job.objects.filter(pk__in=lost, attempts__gte=F('max_attempts')).update(
+                    status=Job.STATUS_FAILED, locked_at=None, finished_at=now,
+                )
+                ids += list(Job.objects.filter(pk__in=lost, status=Job.STATUS_RUNNING).values_list('pk', flat=True))
+        if not ids:
+            return []
+        Job.objects.filter(pk__in=ids).update(status=Job.STATUS_RUNNING, locked_at=now, locked_by=worker)
+    return list(Job.objects.filter(pk__in=ids).order_by('run_at'))
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base * 2**(attempts-1), capped at one hour."""
+    base = _setting('JOBS_RETRY_BACKOFF_SECONDS', 30)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 3600))
+
+
+def run_job(job):
+    """Execute one claimed job and record the outcome. Returns True on success."""
+    job.attempts += 1
+    try:
+        get_task(job.task)(**job.payload)
+    except Exception as exc:
+        logger.exception("Job %s (%s) failed", job.pk, job.task)
+        job.last_error = f"{type(exc).__name__}: {exc}"
+        if job.attempts < job.max_attempts:
+            job.status = Job.STATUS_PENDING
+            job.run_at = timezone.now() + retry_delay(job.attempts)
+        else:
+            job.status = Job.STATUS_FAILED
+            job.finished_at = timezone.now()
+        job.locked_at = None
+        job.save(update_fields=['attempts', 'last_error', 'status', 'run_at', 'locked_at', 'finished_at'])
+        return False
+
+    job.status = Job.STATUS_DONE
+    job.finished_at = timezone.now()
+    job.locked_at = None
+    job.save(update_fields=['attempts', 'status', 'finished_at', 'locked_at'])
+    return True
+
+
+def prune_jobs(now=None, retention_days=None):
+    """Delete done and failed jobs that finished more than JOBS_RETENTION_DAYS ago. Returns the count."""
+    if retention_days is None:
+        retention_days = _setting('JOBS_RETENTION_DAYS', None)
+    if retention_days is None:
+        return 0
+    now = now or timezone.now()
+    return Job.objects.filter(
+        status__in=[Job.STATUS_DONE, Job.STATUS_FAILED],
+        finished_at__lt=now - timedelta(days=retention_days),
+    ).delete()[0]
+
+
+def schedule_periodic(now=None):
+    """Enqueue recurring jobs from settings.JOBS_PERIODIC ({task: interval_seconds}) that are due.
+
+    The conditional update on next_run_at makes sure only one worker enqueues each run.
+    """
+    now = now or timezone.now()
+    enqueued = []
+    for name, interval in _setting('JOBS_PERIODIC', {}).items():
+        state, created = PeriodicJobState.objects.get_or_create(task=name, defaults={'next_run_at': now})
+        if state.next_run_at > now:
+            continue
+        claimed = PeriodicJobState.objects.filter(pk=state.pk, next_run_at=state.next_run_at).update(
+            next_run_at=now + timedelta(seconds=interval)
+        )
+        if claimed:
+            enqueue(name)
+            enqueued.append(name)
+    return enqueued
+
+
+def run_pending(worker=None, batch_size=None):
+    """Claim and run batches until no due job is left. Returns (succeeded, failed)."""
+    worker = worker or worker_id()
+    succeeded = failed = 0
+    while True:
+        batch = claim_batch(worker, batch_size)
+        if not batch:
+            return succeeded, failed
+        for job in batch:
+            if run_job(job):
+                succeeded += 1
+            else:
+                failed += 1
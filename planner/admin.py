@@ -1,10 +1,53 @@
 from django.contrib import admin
+from django.forms.models import BaseInlineFormSet
+from django.template.response import TemplateResponse
+from django.urls import path
 from core.models import Section
 from .models import SectionSchedule, Planner, PlanVariant
+from .clashes import get_clash_report
+from .ingest import sweep_overlaps, insert_schedules
+
+
+class SectionScheduleFormSet(BaseInlineFormSet):
+	"""Checks the submitted schedules for overlaps as one batch and bulk-inserts the new ones.
+
+	The inline lists every schedule of the section, so the sweep needs no
+	query, and overlaps between two new rows are caught too.
+	"""
+
+	def _construct_form(self, i, **kwargs):
+		form = super()._construct_form(i, **kwargs)
+		form.instance.overlaps_checked = True
+		return form
+
+	def clean(self):
+		super().clean()
+		forms = [
+			form for form in self.forms
+			if form.is_valid() and form.cleaned_data and not (self.can_delete and self._should_delete_form(form))
+		]
+		rows = [
+			(0, form.cleaned_data['day_of_week'], form.cleaned_data['start_time'], form.cleaned_data['end_time'], i)
+			for i, form in enumerate(forms)
+		]
+		_, violations = sweep_overlaps(rows)
+		for violation in violations:
+			forms[violation['index']].add_error(None, violation['error'])
+
+	def save_new_objects(self, commit=True):
+		if not commit:
+			return super().save_new_objects(commit)
+		rows = [
+			self.save_new(form, commit=False) for form in self.extra_forms
+			if form.has_changed() and not (self.can_delete and self._should_delete_form(form))
+		]
+		self.new_objects = insert_schedules(rows)
+		return self.new_objects
 
 
 class SectionScheduleInline(admin.TabularInline):
 	model = SectionSchedule
+	formset = SectionScheduleFormSet
 	extra = 1
 	fields = ('day_of_week', 'start_time', 'end_time')
 
@@ -28,6 +71,23 @@ admin.site.register(Section, SectionAdminWithSchedule)
 class SectionScheduleAdmin(admin.ModelAdmin):
 	list_display = ('section', 'day_of_week', 'start_time', 'end_time')
 	list_filter = ('day_of_week',)
+	change_list_template = 'admin/planner/sectionschedule/change_list.html'
+
+	def get_urls(self):
+		urls = [
+			path('double-bookings/', self.admin_site.admin_view(self.double_bookings_view), name='planner_sectionschedule_double_bookings'),
+		]
+		return urls + super().get_urls()
+
+	def double_bookings_view(self, request):
+		"""Room and professor clashes across the catalog (see planner/clashes.py)."""
+		context = dict(
+			self.admin_site.each_context(request),
+			opts=self.model._meta,
+			title='Double-booked rooms and professors',
+			clashes=get_clash_report(refresh='refresh' in request.GET),
+		)
+		return TemplateResponse(request, 'admin/planner/sectionschedule/double_bookings.html', context)
 
 
 @admin.register(Planner)
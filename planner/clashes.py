@@ -0,0 +1,107 @@
+"""Catalog-wide double-booking detection for rooms and professors.
+
+Every meeting (a `SectionSchedule` row) is grouped by the room it uses and
+by each professor teaching its section, then each group is swept per day in
+start order (`compare.day_conflicts`). That is O(n log n) plus the number of
+clashes, instead of testing every pair of sections. Reports are cached in
+the shared cache under the catalog change-log version (`catalog_sync.
+current_version`, read from the database, so the worker that recomputes a
+report after an import and the admin reading it agree on the key).
+"""
+import logging
+import re
+from collections import defaultdict
+
+from django.core.cache import cache
+
+from core.models import Prof, Section, Teach
+from core import catalog_sync
+from .compare import day_conflicts
+from .models import SectionSchedule
+
+logger = logging.getLogger(__name__)
+
+REPORT_TIMEOUT = 60 * 60 * 24
+# room values that do not name a physical room (compared case-insensitively, without spaces/dots)
+PLACEHOLDER_ROOMS = {'', '-', 'tba', 'tbd', 'na', 'n/a', 'none', 'online', 'zoom', 'msteams', 'teams'}
+DAY_NAMES = dict(SectionSchedule.DAY_CHOICES)
+
+
+def _minutes(t):
+	return t.hour * 60 + t.minute
+
+
+def is_physical_room(room):
+	"""False for blank and placeholder rooms ("TBA", "Online", ...), which many sections share."""
+	return re.sub(r'[\s.]', '', room or '').lower() not in PLACEHOLDER_ROOMS
+
+
+def find_clashes():
+	"""All room and professor double-bookings as a list of dicts, sorted for display.
+
+	Each clash is {'kind': 'room'|'prof', 'resource', 'day', 'sections': [id, id], 'labels': [...]}.
+	Rooms are told apart by campus; sections without a real room (blank or a
+	placeholder such as TBA / Online) only count for their teachers.
+	"""
+	rows = SectionSchedule.objects.values_list(
+		'section_id', 'day_of_week', 'start_time', 'end_time', 'section__room', 'section__campus__name',
+	)
+	meetings = defaultdict(list)  # section_id -> [(day, start, end)]
+	rooms = {}                    # section_id -> (campus, room)
+	for section_id, day, start, end, room, campus in rows:
+		meetings[section_id].append((day, _minutes(start), _minutes(end)))
+		if is_physical_room(room):
+			rooms[section_id] = (campus or '', room.strip())
+
+	groups = defaultdict(lambda: defaultdict(list))  # (kind, resource) -> day -> intervals
+	for section_id, key in rooms.items():
+		for day, start, end in meetings[section_id]:
+			groups[('room', key)][day].append((start, end, section_id))
+	for section_id, prof_id in Teach.objects.values_list('section_id', 'prof_id'):
+		for day, start, end in meetings.get(section_id, ()):
+			groups[('prof', prof_id)][day].append((start, end, section_id))
+
+	found = []
+	for (kind, resource), by_day in groups.items():
+		for day, intervals in by_day.items():
+			for pair in day_conflicts(intervals):
+				found.append((kind, resource, day, pair))
+	if not found:
+		return []
+
+	involved = {pk for *_, pair in found for pk in pair}
+	labels = {
+		pk: f"{code} Sec {number}"
+		for pk, code, number in Section.objects.filter(pk__in=involved).values_list('pk', 'course__course_code', 'section_number')
+	}
+	prof_names = dict(Prof.objects.filter(pk__in={r for k, r, _, _ in found if k == 'prof'}).values_list('pk', 'prof_name'))
+
+	clashes = []
+	for kind, resource, day, pair in found:
+		if kind == 'room':
+			campus, room = resource
+			name = f"{room} ({campus})" if campus else room
+		else:
+			name = prof_names.get(resource, f'Prof #{resource}')
+		clashes.append({
+			'kind': kind,
+			'resource': name,
+			'day': day,
+			'day_name': DAY_NAMES.get(day, day),
+			'sections': list(pair),
+			'labels': [labels.get(pk, f'Section #{pk}') for pk in pair],
+		})
+	clashes.sort(key=lambda c: (c['kind'], c['resource'], c['day'], c['sections']))
+	return clashes
+
+
+def get_clash_report(refresh=False):
+	"""Clashes for the current catalog version, computed once per version."""
+	key = f'double_bookings:{catalog_sync.current_version()}'
+	report = None if refresh else cache.get(key)
+	if report is None:
+		report = find_clashes()
+		cache.set(key, report, REPORT_TIMEOUT)
+		if report:
+			logger.warning("Catalog has %d room/professor double-bookings", len(report))
+	return report
@@ -0,0 +1,113 @@
+"""Side-by-side comparison of a user's saved plan variants.
+
+Everything is loaded in a fixed number of bulk queries (variants, their
+section rows, the schedules of those sections) and compared in memory, so
+the cost does not grow with the number of variants.
+"""
+from collections import defaultdict
+from itertools import combinations
+
+from .models import PlanVariant, SectionSchedule
+
+
+def _minutes(t):
+	return t.hour * 60 + t.minute
+
+
+def day_conflicts(intervals):
+	"""Pairs of section ids whose (start, end, section_id) intervals overlap on one day.
+
+	Sweeps the intervals in start order keeping the ones still running, so
+	it costs O(n log n) plus the number of overlapping pairs.
+	"""
+	pairs = set()
+	active = []
+	for start, end, section_id in sorted(intervals):
+		active = [(a_end, a_id) for a_end, a_id in active if a_end > start]
+		for _, other_id in active:
+			if other_id != section_id:
+				pairs.add(tuple(sorted((other_id, section_id))))
+		active.append((end, section_id))
+	return pairs
+
+
+def _occupancy(section_ids, schedules):
+	"""(minutes per day Mon..Sun, sorted conflicting section id pairs) for one variant."""
+	by_day = defaultdict(list)
+	for section_id in section_ids:
+		for day, start, end in schedules.get(section_id, ()):
+			by_day[day].append((start, end, section_id))
+
+	minutes = [0] * 7
+	conflicts = set()
+	for day, intervals in by_day.items():
+		conflicts |= day_conflicts(intervals)
+		# merge overlapping meetings so a clash is not counted twice
+		covered_until = None
+		for start, end, _ in sorted(intervals):
+			if covered_until is not None and start < covered_until:
+				if end > covered_until:
+					minutes[day] += end - covered_until
+					covered_until = end
+			else:
+				minutes[day] += end - start
+				covered_until = end
+	return minutes, sorted(conflicts)
+
+
+def compare_variants(planner, variant_ids=None):
+	"""Credits, sections, daily occupancy and conflicts per variant, plus pairwise diffs.
+
+	Runs three queries whatever the number of variants.
+	"""
+	variants = planner.variants.all()
+	if variant_ids is not None:
+		variants = variants.filter(pk__in=variant_ids)
+	variants = list(variants.values_list('id', 'name', 'credits'))
+
+	through = PlanVariant.sections.through
+	sections = {}
+	variant_sections = defaultdict(list)
+	rows = through.objects.filter(planvariant_id__in=[v[0] for v in variants]).order_by(
+		'section__course__course_code', 'section__section_number'
+	).values_list(
+		'planvariant_id', 'section_id', 'section__section_number',
+		'section__course__course_code', 'section__course__credit',
+	)
+	for variant_id, section_id, number, code, credit in rows:
+		sections[section_id] = {'id': section_id, 'code': code, 'sec': number, 'credit': credit or 0}
+		variant_sections[variant_id].append(section_id)
+
+	schedules = defaultdict(list)
+	schedule_rows = SectionSchedule.objects.filter(section_id__in=list(sections)).values_list(
+		'section_id', 'day_of_week', 'start_time', 'end_time'
+	)
+	for section_id, day, start, end in schedule_rows:
+		schedules[section_id].append((day, _minutes(start), _minutes(end)))
+
+	results = []
+	for variant_id, name, credits in variants:
+		section_ids = variant_sections[variant_id]
+		minutes, conflicts = _occupancy(section_ids, schedules)
+		results.append({
+			'id': variant_id,
+			'name': name,
+			'credits': credits,
+			'sections': [sections[pk] for pk in section_ids],
+			'minutes_per_day': minutes,
+			'conflicts': [list(pair) for pair in conflicts],
+			'has_conflict': bool(conflicts),
+		})
+
+	diffs = []
+	for a, b in combinations(results, 2):
+		a_ids, b_ids = set(variant_sections[a['id']]), set(variant_sections[b['id']])
+		diffs.append({
+			'a': a['id'],
+			'b': b['id'],
+			'only_a': sorted(a_ids - b_ids),
+			'only_b': sorted(b_ids - a_ids),
+			'shared': sorted(a_ids & b_ids),
+			'credit_diff': a['credits'] - b['credits'],
+		})
+	return {'variants': results, 'diffs': diffs}
@@ -0,0 +1,51 @@
+"""Denormalized credit totals for `Planner` and `PlanVariant`.
+
+Both models store the sum of their sections' course credits in `credits`, so
+listings and credit checks read one column instead of joining every section.
+`planner.signals` calls `refresh_credits` whenever a sections m2m changes, a
+section moves to another course, a course's credit changes or a section is
+deleted.
+"""
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Planner, PlanVariant
+
+OWNER_MODELS = (Planner, PlanVariant)
+
+
+def _owner_field(model):
+	"""Name of the through-table column pointing at `model` ('planner' / 'planvariant')."""
+	return model.sections.field.m2m_field_name()
+
+
+def refresh_credits(model, ids=None):
+	"""Recompute `credits` for the given `model` rows (all rows when ids is None) in one UPDATE."""
+	through = model.sections.through
+	field = _owner_field(model)
+	totals = (
+		through.objects.filter(**{field: OuterRef('pk')})
+		.values(field)
+		.annotate(total=Sum('section__course__credit'))
+		.values('total')
+	)
+	qs = model.objects.all() if ids is None else model.objects.filter(pk__in=ids)
+	return qs.update(credits=Coalesce(Subquery(totals), 0))
+
+
+def owners_of_sections(model, section_ids):
+	"""Ids of `model` rows containing any of `section_ids`."""
+	through = model.sections.through
+	return list(
+		through.objects.filter(section_id__in=section_ids)
+		.values_list(f'{_owner_field(model)}_id', flat=True)
+		.distinct()
+	)
+
+
+def refresh_credits_for_sections(section_ids):
+	"""Recompute every planner and variant that contains one of `section_ids`."""
+	for model in OWNER_MODELS:
+		ids = owners_of_sections(model, section_ids)
+		if ids:
+			refresh_credits(model, ids)
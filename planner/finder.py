@@ -0,0 +1,116 @@
+"""Multi-criteria section search ("Tue or Thu after 13:00 at Rangsit, 3 credits").
+
+All criteria are turned into one SQL query: meeting-time criteria become an
+uncorrelated `section_id IN (...)` subquery over `SectionSchedule`, so the
+database range-scans the (day_of_week, start_time, end_time, section) index
+once instead of probing it per candidate section; the professor criterion is
+a semi-join on `Teach` (its unique (prof, section) index), campus and credit
+plain filters on the section and course. Results are keyset-paginated on
+section id.
+"""
+from datetime import time
+
+from core.models import Section, Teach
+from .legacy import DAY_NAMES
+from .models import SectionSchedule
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# column order of each result row
+FIELDS = ['id', 'code', 'name', 'sec', 'credit', 'campus', 'room']
+
+
+class InvalidFilter(ValueError):
+	pass
+
+
+# ids are 32-bit; anything larger would overflow the database integer instead of matching nothing
+MAX_ID = 2 ** 31 - 1
+
+
+def _int(value, name, low=0, high=MAX_ID):
+	try:
+		value = int(value)
+	except (TypeError, ValueError):
+		raise InvalidFilter(f'{name} must be a number')
+	if not low <= value <= high:
+		raise InvalidFilter(f'{name} must be between {low} and {high}')
+	return value
+
+
+def _minutes_to_time(value, name):
+	minutes = _int(value, name, high=24 * 60 - 1)
+	return time(minutes // 60, minutes % 60)
+
+
+def _days(value):
+	days = set()
+	for part in value.split(','):
+		part = part.strip().lower()
+		if not part:
+			continue
+		if part.isdigit() and int(part) in range(7):
+			days.add(int(part))
+		elif part in DAY_NAMES:
+			days.add(DAY_NAMES[part])
+		else:
+			raise InvalidFilter(f'Unknown day {part!r}')
+	return days
+
+
+def parse_filters(params):
+	"""Validated filters from query params: days, start_min, end_min, campus, prof, credit."""
+	filters = {}
+	if params.get('days'):
+		filters['days'] = _days(params['days'])
+	if params.get('start_min'):
+		filters['starts_after'] = _minutes_to_time(params['start_min'], 'start_min')
+	if params.get('end_min'):
+		filters['ends_before'] = _minutes_to_time(params['end_min'], 'end_min')
+	for name in ('campus', 'prof', 'credit'):
+		if params.get(name):
+			filters[name] = _int(params[name], name)
+	return filters
+
+
+def parse_page(params):
+	"""Validated (after, page_size) from query params."""
+	after = _int(params.get('after') or 0, 'after')
+	page_size = _int(params.get('page_size') or PAGE_SIZE, 'page_size', low=1, high=MAX_PAGE_SIZE)
+	return after, page_size
+
+
+def find_sections(days=None, starts_after=None, ends_before=None, campus=None, prof=None, credit=None):
+	"""Sections with a meeting matching every time criterion and matching the other filters."""
+	qs = Section.objects.all()
+	if days or starts_after is not None or ends_before is not None:
+		meetings = SectionSchedule.objects.all()
+		if days:
+			meetings = meetings.filter(day_of_week__in=sorted(days))
+		if starts_after is not None:
+			meetings = meetings.filter(start_time__gte=starts_after)
+		if ends_before is not None:
+			meetings = meetings.filter(end_time__lte=ends_before)
+		qs = qs.filter(pk__in=meetings.values('section_id'))
+	if prof:
+		qs = qs.filter(pk__in=Teach.objects.filter(prof_id=prof).values('section_id'))
+	if campus:
+		qs = qs.filter(campus_id=campus)
+	if credit is not None:
+		qs = qs.filter(course__credit=credit)
+	return qs
+
+
+def finder_page(queryset, after=None, page_size=PAGE_SIZE):
+	"""(rows, next_after) for one page ordered by section id; next_after is None on the last page."""
+	page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+	if after:
+		queryset = queryset.filter(pk__gt=after)
+	rows = list(queryset.order_by('pk').values_list(
+		'pk', 'course__course_code', 'course__course_name', 'section_number', 'course__credit', 'campus__name', 'room',
+	)[:page_size + 1])
+	if len(rows) > page_size:
+		rows = rows[:page_size]
+		return rows, rows[-1][0]
+	return rows, None
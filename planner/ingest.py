@@ -0,0 +1,153 @@
+"""Bulk loading of `SectionSchedule` rows.
+
+`SectionSchedule.save()` runs `full_clean()`, whose overlap check queries
+the section's other schedules on every insert. For imports that is a query
+(or two) per row. `ingest_schedules` instead validates a whole batch in
+memory: the batch is merged with the existing schedules of its sections
+(one query), sorted by section/day/start and swept once, so every
+misaligned or overlapping row is reported together. The valid rows are
+then written with `bulk_create`. The Section admin's schedule inline runs
+the same sweep over its forms (see planner/admin.py).
+"""
+from bisect import bisect_left
+from collections import defaultdict, namedtuple
+
+from django.db import transaction
+
+from core import catalog_sync
+from core.models import Section
+from core.versioning import bump_version, CATALOG
+from .models import SectionSchedule
+from .utils import SLOT_START, SLOT_DURATION_MINUTES
+
+ScheduleEntry = namedtuple('ScheduleEntry', 'section_id day_of_week start_time end_time')
+
+
+def _minutes_since_start(t):
+	return (t.hour * 60 + t.minute) - (SLOT_START.hour * 60 + SLOT_START.minute)
+
+
+def slot_errors(day_of_week, start_time, end_time):
+	"""Problems with one schedule row on its own (no overlap check); empty when valid."""
+	errors = []
+	if day_of_week not in range(7):
+		errors.append('day_of_week must be between 0 (Mon) and 6 (Sun)')
+	if end_time <= start_time:
+		errors.append('end_time must be after start_time')
+		return errors
+
+	start_min = _minutes_since_start(start_time)
+	end_min = _minutes_since_start(end_time)
+	if start_min < 0 or end_min <= 0:
+		errors.append('Times must be within planner supported hours')
+	elif start_min % SLOT_DURATION_MINUTES != 0 or end_min % SLOT_DURATION_MINUTES != 0:
+		errors.append('Start and end times must align to 30-minute slots')
+	return errors
+
+
+def validate_schedules(entries):
+	"""Split `entries` (ScheduleEntry-like tuples) into (valid, violations).
+
+	`valid` holds the indexes of rows that can be inserted; `violations` is a
+	list of {'index', 'section_id', 'error'} dicts covering every problem in
+	the batch. A row overlapping an existing schedule, or an earlier row of
+	the batch, on the same section and day is a violation.
+	"""
+	entries = [ScheduleEntry(*entry) for entry in entries]
+	violations = []
+	candidates = []
+
+	section_ids = {entry.section_id for entry in entries}
+	known = set(Section.objects.filter(pk__in=section_ids).values_list('pk', flat=True))
+	for index, entry in enumerate(entries):
+		errors = slot_errors(entry.day_of_week, entry.start_time, entry.end_time)
+		if entry.section_id not in known:
+			errors.insert(0, 'Section not found')
+		for error in errors:
+			violations.append({'index': index, 'section_id': entry.section_id, 'error': error})
+		if not errors:
+			candidates.append(index)
+
+	stored = SectionSchedule.objects.filter(section_id__in=known).values_list(
+		'section_id', 'day_of_week', 'start_time', 'end_time'
+	)
+	valid, overlaps = sweep_overlaps(
+		[row + (None,) for row in stored] + [tuple(entries[i]) + (i,) for i in candidates]
+	)
+	violations += overlaps
+	violations.sort(key=lambda v: v['index'])
+	return valid, violations
+
+
+def sweep_overlaps(rows):
+	"""Split (section_id, day, start, end, index) rows into (valid indexes, overlap violations).
+
+	Rows with index None are already stored: they never become violations but
+	block every batch row overlapping them. Per section/day the stored rows
+	are merged into disjoint blocks, then the batch rows are swept in start
+	order; each one is checked against the block starting last before it
+	ends (bisect) and against the previous kept batch row, so a batch costs
+	a sort instead of a query per row.
+	"""
+	groups = defaultdict(lambda: ([], []))  # (section_id, day) -> (stored, batch)
+	for section_id, day, start, end, index in rows:
+		stored, batch = groups[(section_id, day)]
+		if index is None:
+			stored.append((start, end))
+		else:
+			batch.append((start, index, end))
+
+	valid = []
+	violations = []
+	for (section_id, day), (stored, batch) in groups.items():
+		blocks = []
+		for start, end in sorted(stored):
+			if blocks and start < blocks[-1][1]:
+				blocks[-1][1] = max(blocks[-1][1], end)
+			else:
+				blocks.append([start, end])
+		block_starts = [start for start, _ in blocks]
+
+		busy_until = kept_start = None
+		for start, index, end in sorted(batch):
+			i = bisect_left(block_starts, end) - 1
+			if i >= 0 and blocks[i][1] > start:
+				clash = blocks[i]
+			elif busy_until is not None and start < busy_until:
+				clash = (kept_start, busy_until)
+			else:
+				valid.append(index)
+				busy_until, kept_start = end, start
+				continue
+			violations.append({
+				'index': index,
+				'section_id': section_id,
+				'error': f'Overlaps with schedule {clash[0]}-{clash[1]}',
+			})
+	return sorted(valid), violations
+
+
+def insert_schedules(rows, batch_size=500):
+	"""bulk_create already validated SectionSchedule objects and log them in the catalog."""
+	with transaction.atomic():
+		created = SectionSchedule.objects.bulk_create(rows, batch_size=batch_size)
+		if created:
+			# bulk_create skips the catalog signals
+			catalog_sync.record_changes(catalog_sync.SECTION, [row.section_id for row in created])
+			bump_version(CATALOG)
+	return created
+
+
+def ingest_schedules(entries, strict=False, batch_size=500):
+	"""Validate `entries` as a batch and bulk-insert the valid rows.
+
+	With `strict` nothing is inserted when any row is invalid. Returns
+	(created SectionSchedule objects, violations).
+	"""
+	entries = [ScheduleEntry(*entry) for entry in entries]
+	valid, violations = validate_schedules(entries)
+	if strict and violations:
+		return [], violations
+
+	rows = [SectionSchedule(**entries[i]._asdict()) for i in valid]
+	return insert_schedules(rows, batch_size), violations
@@ -0,0 +1,89 @@
+"""Parsing of the legacy free-text schedule strings into structured meetings.
+
+`core.Section.datetime` and `core.TimeSlot.time` hold strings such as
+"Mon 10:00-11:00", "MWF 10:00 - 10:50", "Tue, Thu 13:00-14:30" or
+"จันทร์ 09:00-12:00". `parse_schedule` turns one of them into
+(day_of_week, start_time, end_time) triples for `SectionSchedule`.
+"""
+import re
+from datetime import time
+
+# spelling -> day_of_week (0=Mon .. 6=Sun); matched longest first
+DAY_NAMES = {
+	'monday': 0, 'mon': 0, 'mo': 0, 'm': 0,
+	'tuesday': 1, 'tues': 1, 'tue': 1, 'tu': 1, 't': 1,
+	'wednesday': 2, 'wed': 2, 'we': 2, 'w': 2,
+	'thursday': 3, 'thurs': 3, 'thur': 3, 'thu': 3, 'th': 3, 'r': 3,
+	'friday': 4, 'fri': 4, 'fr': 4, 'f': 4,
+	'saturday': 5, 'sat': 5, 'sa': 5, 's': 5,
+	'sunday': 6, 'sun': 6, 'su': 6, 'u': 6,
+	'จันทร์': 0, 'จ': 0,
+	'อังคาร': 1, 'อ': 1,
+	'พุธ': 2, 'พ': 2,
+	'พฤหัสบดี': 3, 'พฤหัส': 3, 'พฤ': 3,
+	'ศุกร์': 4, 'ศ': 4,
+	'เสาร์': 5, 'ส': 5,
+	'อาทิตย์': 6, 'อา': 6,
+}
+
+_DAY_RE = re.compile('|'.join(re.escape(name) for name in sorted(DAY_NAMES, key=len, reverse=True)), re.IGNORECASE)
+_SEPARATOR_RE = re.compile(r'(?:[\s,/&.;+]|\band\b|วัน|และ)+', re.IGNORECASE)
+_RANGE_RE = re.compile(r'(\d{1,2})[:.](\d{2})\s*(?:-|–|—|to|ถึง)\s*(\d{1,2})[:.](\d{2})(?:\s*น\.)?', re.IGNORECASE)
+
+
+class UnparseableSchedule(ValueError):
+	pass
+
+
+def _parse_days(text):
+	days = []
+	pos = 0
+	while pos < len(text):
+		separator = _SEPARATOR_RE.match(text, pos)
+		if separator:
+			pos = separator.end()
+			continue
+		match = _DAY_RE.match(text, pos)
+		if not match:
+			raise UnparseableSchedule(f'Unknown day name near {text[pos:]!r}')
+		days.append(DAY_NAMES[match.group(0).lower()])
+		pos = match.end()
+	return days
+
+
+def _time(hour, minute):
+	hour, minute = int(hour), int(minute)
+	if hour > 23 or minute > 59:
+		raise UnparseableSchedule(f'Invalid time {hour}:{minute:02d}')
+	return time(hour, minute)
+
+
+def parse_schedule(text):
+	"""Sorted, de-duplicated [(day_of_week, start_time, end_time)] described by `text`.
+
+	Each time range applies to the day names written before it; a range
+	with no day names of its own reuses the previous ones. Raises
+	UnparseableSchedule when anything in the string is not understood.
+	"""
+	text = (text or '').strip()
+	if not text:
+		raise UnparseableSchedule('Empty schedule')
+
+	meetings = set()
+	days = []
+	pos = 0
+	for match in _RANGE_RE.finditer(text):
+		own_days = _parse_days(text[pos:match.start()])
+		days = own_days or days
+		if not days:
+			raise UnparseableSchedule(f'No day given for {match.group(0)!r}')
+		start, end = _time(*match.group(1, 2)), _time(*match.group(3, 4))
+		if end <= start:
+			raise UnparseableSchedule(f'End before start in {match.group(0)!r}')
+		meetings.update((day, start, end) for day in days)
+		pos = match.end()
+	if not meetings:
+		raise UnparseableSchedule('No time range found')
+	if _parse_days(text[pos:]):
+		raise UnparseableSchedule('Day names after the last time range')
+	return sorted(meetings)
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:42
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_credits(apps, schema_editor):
+    for model_name, field in (('Planner', 'planner'), ('PlanVariant', 'planvariant')):
+        model = apps.get_model('planner', model_name)
+        totals = (
+            model.sections.through.objects.filter(**{field: OuterRef('pk')})
+            .values(field)
+            .annotate(total=Sum('section__course__credit'))
+            .values('total')
+        )
+        model.objects.update(credits=Coalesce(Subquery(totals), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('planner', '0002_planvariant'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='planner',
+            name='credits',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='planvariant',
+            name='credits',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_credits, migrations.RunPython.noop),
+    ]
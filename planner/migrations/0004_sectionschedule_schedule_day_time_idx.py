@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_course_course_credit_idx'),
+        ('planner', '0003_denormalized_credits'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sectionschedule',
+            index=models.Index(fields=['day_of_week', 'start_time', 'end_time', 'section'], name='schedule_day_time_idx'),
+        ),
+    ]
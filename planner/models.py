@@ -28,29 +28,24 @@ class SectionSchedule(models.Model):
 	class Meta:
 		verbose_name = 'Section Schedule'
 		verbose_name_plural = 'Section Schedules'
+		indexes = [
+			# section finder: day/time range scans that resolve the section without a table lookup
+			models.Index(fields=['day_of_week', 'start_time', 'end_time', 'section'], name='schedule_day_time_idx'),
+		]
 
 	def __str__(self):
 		return f"{self.section} {self.get_day_of_week_display()} {self.start_time}-{self.end_time}"
 
 	def clean(self):
-		# Basic validations: end_time > start_time
-		if self.end_time <= self.start_time:
-			raise ValidationError('end_time must be after start_time')
+		# end after start, within planner hours, aligned to 30-minute slots (shared with bulk ingestion)
+		from .ingest import slot_errors
+		errors = slot_errors(self.day_of_week, self.start_time, self.end_time)
+		if errors:
+			raise ValidationError(errors[0])
 
-		# Ensure times align with 30-minute slots based on SLOT_START/SLOT_DURATION
-		from .utils import SLOT_START, SLOT_DURATION_MINUTES
-		# compute minutes since slot start
-		def minutes_since_start(t):
-			return (t.hour * 60 + t.minute) - (SLOT_START.hour * 60 + SLOT_START.minute)
-
-		start_min = minutes_since_start(self.start_time)
-		end_min = minutes_since_start(self.end_time)
-
-		if start_min < 0 or end_min <= 0:
-			raise ValidationError('Times must be within planner supported hours')
-
-		if start_min % SLOT_DURATION_MINUTES != 0 or end_min % SLOT_DURATION_MINUTES != 0:
-			raise ValidationError('Start and end times must align to 30-minute slots')
+		if getattr(self, 'overlaps_checked', False):
+			# validated together with its batch (admin inline formset)
+			return
 
 		# Prevent overlapping schedules for the same section on same day
 		overlaps = SectionSchedule.objects.filter(section=self.section, day_of_week=self.day_of_week).exclude(pk=self.pk)
@@ -68,13 +63,14 @@ class Planner(models.Model):
 	"""Per-user planner containing a set of `core.Section` instances."""
 	user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='planner')
 	sections = models.ManyToManyField('core.Section', blank=True, related_name='in_planners')
+	# Sum of the sections' course credits, kept current by planner/credits.py
+	credits = models.PositiveIntegerField(default=0)
 
 	def __str__(self):
 		return f"Planner for {self.user}"
 
 	def total_credits(self):
-		# Sum credit value from each section's course
-		return sum([s.course.credit or 0 for s in self.sections.select_related('course').all()])
+		return self.credits
 
 
 class PlanVariant(models.Model):
@@ -83,6 +79,8 @@ class PlanVariant(models.Model):
 	name = models.CharField(max_length=120)
 	sections = models.ManyToManyField('core.Section', blank=True, related_name='variants')
 	created_at = models.DateTimeField(auto_now_add=True)
+	# Sum of the sections' course credits, kept current by planner/credits.py
+	credits = models.PositiveIntegerField(default=0)
 
 	class Meta:
 		ordering = ['-created_at']
@@ -91,4 +89,4 @@ class PlanVariant(models.Model):
 		return f"{self.name} ({self.planner.user})"
 
 	def total_credits(self):
-		return sum([s.course.credit or 0 for s in self.sections.select_related('course').all()])
\ No newline at end of file
+		return self.credits
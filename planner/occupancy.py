@@ -0,0 +1,72 @@
+"""In-memory weekly occupancy of every section, for conflict-aware search.
+
+Each section's meetings are folded into seven bitmasks (one per day, one bit
+per planner slot, see `planner.utils`), so "does this section clash with the
+planner?" is seven integer ANDs. The index is derived from the process's
+catalog snapshot (`core.catalog.get_catalog`) and rebuilt when it changes.
+"""
+import threading
+
+from core.catalog import get_catalog
+from .utils import _time_to_slot_range
+
+EMPTY = (0,) * 7
+
+
+def _mask(start, end):
+	bits = 0
+	for slot in _time_to_slot_range(start, end):
+		bits |= 1 << slot
+	return bits
+
+
+class OccupancyIndex:
+	"""section id -> 7-tuple of slot bitmasks (sections without schedules are absent)."""
+
+	def __init__(self, version, masks):
+		self.version = version
+		self.masks = masks
+
+	def occupancy(self, section_ids):
+		"""Union of the weekly occupancy of `section_ids`."""
+		days = [0] * 7
+		for section_id in section_ids:
+			for day, bits in enumerate(self.masks.get(section_id, EMPTY)):
+				days[day] |= bits
+		return tuple(days)
+
+	def fits(self, section_id, occupied):
+		"""True when `section_id` shares no slot with the `occupied` masks."""
+		masks = self.masks.get(section_id)
+		if masks is None:
+			return True
+		return not any(a & b for a, b in zip(masks, occupied))
+
+
+def build_index(catalog):
+	masks = {}
+	for section in catalog.sections.values():
+		if not section.schedules:
+			continue
+		days = [0] * 7
+		for day, start, end in section.schedules:
+			days[day] |= _mask(start, end)
+		masks[section.id] = tuple(days)
+	return OccupancyIndex(catalog.version, masks)
+
+
+_lock = threading.Lock()
+_index = None
+
+
+def get_occupancy_index():
+	"""This process's occupancy index, rebuilt alongside the catalog snapshot."""
+	global _index
+	catalog = get_catalog()
+	index = _index
+	if index is not None and index.version == catalog.version:
+		return index
+	with _lock:
+		if _index is None or _index.version != catalog.version:
+			_index = build_index(catalog)
+		return _index
@@ -0,0 +1,66 @@
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+
+from core import catalog_sync
+from core.versioning import bump_version, CATALOG
+from core.models import Course, Section
+from .models import SectionSchedule, Planner, PlanVariant
+from .credits import OWNER_MODELS, owners_of_sections, refresh_credits, refresh_credits_for_sections
+
+
+@receiver(post_save, sender=SectionSchedule)
+@receiver(post_delete, sender=SectionSchedule)
+def bump_catalog_version(sender, **kwargs):
+	"""Section schedules are part of the catalog snapshot (see core/catalog.py)."""
+	bump_version(CATALOG)
+
+
+@receiver(post_save, sender=SectionSchedule)
+@receiver(post_delete, sender=SectionSchedule)
+def log_catalog_change(sender, instance, **kwargs):
+	"""A schedule is part of its section's row in catalog snapshots and deltas."""
+	catalog_sync.record_change(catalog_sync.SECTION, instance.section_id)
+
+
+@receiver(m2m_changed, sender=Planner.sections.through)
+@receiver(m2m_changed, sender=PlanVariant.sections.through)
+def refresh_credits_on_sections_change(sender, instance, action, reverse, pk_set, **kwargs):
+	owner_model = Planner if sender is Planner.sections.through else PlanVariant
+	if not reverse:
+		if action in ('post_add', 'post_remove', 'post_clear'):
+			refresh_credits(owner_model, [instance.pk])
+			instance.refresh_from_db(fields=['credits'])
+		return
+	# section.in_planners / section.variants side: pk_set holds owner ids
+	if action == 'pre_clear':
+		instance._credit_owner_ids = owners_of_sections(owner_model, [instance.pk])
+	elif action in ('post_add', 'post_remove'):
+		refresh_credits(owner_model, pk_set or ())
+	elif action == 'post_clear':
+		refresh_credits(owner_model, getattr(instance, '_credit_owner_ids', ()))
+
+
+@receiver(pre_delete, sender=Section)
+def remember_credit_owners(sender, instance, **kwargs):
+	# the cascade removes the m2m rows without m2m_changed, so look the owners up first
+	instance._credit_owners = {model: owners_of_sections(model, [instance.pk]) for model in OWNER_MODELS}
+
+
+@receiver(post_delete, sender=Section)
+def refresh_credits_after_section_delete(sender, instance, **kwargs):
+	for model, ids in getattr(instance, '_credit_owners', {}).items():
+		if ids:
+			refresh_credits(model, ids)
+
+
+@receiver(post_save, sender=Section)
+def refresh_credits_on_section_save(sender, instance, created, **kwargs):
+	# a section moved to another course changes its credit
+	if not created:
+		refresh_credits_for_sections([instance.pk])
+
+
+@receiver(post_save, sender=Course)
+def refresh_credits_on_course_save(sender, instance, created, **kwargs):
+	if not created:
+		refresh_credits_for_sections(Section.objects.filter(course=instance).values('pk'))
@@ -0,0 +1,9 @@
+"""Background job handlers for the planner app (executed by `manage.py runworker`)."""
+from jobs.registry import task
+from . import clashes
+
+
+@task('planner.detect_double_bookings')
+def detect_double_bookings():
+	"""Recompute the room/professor clash report after a catalog import."""
+	clashes.get_clash_report(refresh=True)
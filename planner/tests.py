@@ -1,3 +1,366 @@
+import json
+from datetime import time
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
+from django.urls import reverse
+
+from core.models import Campus, Course, Prof, Section, SectionTime, TimeSlot
+from .clashes import find_clashes, get_clash_report
+from .finder import find_sections
+from .ingest import ingest_schedules
+from .legacy import parse_schedule, UnparseableSchedule
+from jobs.models import Job
+from jobs.worker import run_pending
+from .models import Planner, PlanVariant, SectionSchedule
+
+
+class VariantComparisonTest(TestCase):
+	def setUp(self):
+		User = get_user_model()
+		self.user = User.objects.create_user(username='plan', email='plan@example.com', password='pw')
+		self.client.login(username='plan', password='pw')
+		self.client.get(reverse('planner:list_variants'))  # daily-active-user bookkeeping happens once
+		self.planner = Planner.objects.get(user=self.user)
+		self.db = Course.objects.create(course_name='Databases', course_code='CN230', description='', credit=3)
+		self.ai = Course.objects.create(course_name='AI', course_code='CN240', description='', credit=2)
+		self.db1 = Section.objects.create(course=self.db, section_number='01')
+		self.db2 = Section.objects.create(course=self.db, section_number='02')
+		self.ai1 = Section.objects.create(course=self.ai, section_number='01')
+		SectionSchedule.objects.create(section=self.db1, day_of_week=0, start_time=time(9, 0), end_time=time(10, 30))
+		SectionSchedule.objects.create(section=self.db2, day_of_week=2, start_time=time(13, 0), end_time=time(14, 0))
+		SectionSchedule.objects.create(section=self.ai1, day_of_week=0, start_time=time(10, 0), end_time=time(11, 0))
+
+	def _variant(self, name, *sections):
+		variant = PlanVariant.objects.create(planner=self.planner, name=name)
+		variant.sections.add(*sections)
+		return variant
+
+	def test_credits_follow_sections_and_courses(self):
+		self.planner.sections.add(self.db1, self.ai1)
+		self.assertEqual(self.planner.total_credits(), 5)
+		self.ai1.in_planners.remove(self.planner)
+		self.planner.refresh_from_db()
+		self.assertEqual(self.planner.credits, 3)
+		variant = self._variant('A', self.db1, self.db2)
+		self.assertEqual(variant.credits, 6)
+		self.db.credit = 4
+		self.db.save()
+		variant.refresh_from_db()
+		self.assertEqual(variant.credits, 8)
+		self.db2.delete()
+		variant.refresh_from_db()
+		self.assertEqual(variant.credits, 4)
+
+	def test_compare_runs_constant_queries(self):
+		a = self._variant('A', self.db1, self.ai1)
+		b = self._variant('B', self.db2, self.ai1)
+		url = reverse('planner:compare_variants')
+		# session, user, active-user check, planner, variants, sections, schedules
+		with self.assertNumQueries(7):
+			data = json.loads(self.client.get(url).content)
+		self._variant('C', self.db2)
+		with self.assertNumQueries(7):
+			self.client.get(url)
+
+		by_id = {v['id']: v for v in data['variants']}
+		self.assertEqual(by_id[a.id]['credits'], 5)
+		self.assertEqual(by_id[a.id]['conflicts'], [[self.db1.id, self.ai1.id]])
+		self.assertEqual(by_id[a.id]['minutes_per_day'][0], 120)
+		self.assertFalse(by_id[b.id]['has_conflict'])
+		diff = data['diffs'][0]
+		self.assertEqual({diff['a'], diff['b']}, {a.id, b.id})
+		self.assertEqual(diff['shared'], [self.ai1.id])
+
+		subset = json.loads(self.client.get(url, {'ids': str(b.id)}).content)
+		self.assertEqual([v['id'] for v in subset['variants']], [b.id])
+		self.assertEqual(self.client.get(url, {'ids': 'x'}).status_code, 400)
+
+	def test_list_variants_reads_stored_credits(self):
+		for name in ('A', 'B', 'C'):
+			self._variant(name, self.db1)
+		with self.assertNumQueries(5):  # session, user, active-user check, planner, variants
+			resp = self.client.get(reverse('planner:list_variants'))
+			data = json.loads(b''.join(resp.streaming_content))
+		self.assertEqual([v['credits'] for v in data['variants']], [3, 3, 3])
+
+
+class CompatibleSearchTest(TestCase):
+	def setUp(self):
+		User = get_user_model()
+		user = User.objects.create_user(username='fit', email='fit@example.com', password='pw')
+		self.client.login(username='fit', password='pw')
+		course = Course.objects.create(course_name='Compilers', course_code='CN340', description='', credit=3)
+		self.taken = Section.objects.create(course=course, section_number='00')
+		SectionSchedule.objects.create(section=self.taken, day_of_week=1, start_time=time(9, 0), end_time=time(12, 0))
+		self.planner = Planner.objects.create(user=user)
+		self.planner.sections.add(self.taken)
+		self.free = []
+		for i in range(1, 26):
+			section = Section.objects.create(course=course, section_number=f'{i:02d}')
+			# odd sections clash with the planner on Tuesday morning
+			day = 1 if i % 2 else 3
+			SectionSchedule.objects.create(section=section, day_of_week=day, start_time=time(10, 0), end_time=time(11, 0))
+			if not i % 2:
+				self.free.append(section.id)
+		self.unscheduled = Section.objects.create(course=course, section_number='99')
+
+	def _ids(self, **params):
+		resp = self.client.get(reverse('planner:search_sections'), dict(q='cn340', **params))
+		return [row['id'] for row in json.loads(b''.join(resp.streaming_content))['results']]
+
+	def test_compatible_mode_filters_before_limit(self):
+		self.assertEqual(len(self._ids()), 20)
+		ids = self._ids(compatible='1')
+		self.assertEqual(sorted(ids), sorted(self.free + [self.unscheduled.id]))
+		self.assertNotIn(self.taken.id, ids)
+
+	def test_compatible_against_variant(self):
+		variant = PlanVariant.objects.create(planner=self.planner, name='Empty')
+		self.assertEqual(len(self._ids(compatible='1', variant=str(variant.id))), 20)
+		resp = self.client.get(reverse('planner:search_sections'), {'compatible': '1', 'variant': '999'})
+		self.assertEqual(resp.status_code, 404)
+
+
+class BulkScheduleTest(TestCase):
+	def setUp(self):
+		course = Course.objects.create(course_name='Security', course_code='CN350', description='', credit=3)
+		self.a = Section.objects.create(course=course, section_number='01')
+		self.b = Section.objects.create(course=course, section_number='02')
+		SectionSchedule.objects.create(section=self.a, day_of_week=0, start_time=time(9, 0), end_time=time(10, 0))
+
+	def test_batch_reports_every_violation_and_inserts_the_rest(self):
+		entries = [
+			(self.a.id, 0, time(9, 30), time(10, 30)),   # overlaps the stored row
+			(self.a.id, 0, time(10, 0), time(11, 0)),    # fine, touches it
+			(self.b.id, 1, time(13, 0), time(14, 0)),    # fine
+			(self.b.id, 1, time(13, 30), time(15, 0)),   # overlaps row 2 of the batch
+			(self.b.id, 2, time(13, 15), time(14, 0)),   # misaligned
+			(999, 3, time(8, 0), time(9, 0)),            # unknown section
+		]
+		with self.assertNumQueries(6):  # sections, stored schedules, savepoint, insert, change log, release
+			created, errors = ingest_schedules(entries)
+		self.assertEqual(len(created), 2)
+		self.assertEqual([e['index'] for e in errors], [0, 3, 4, 5])
+		self.assertEqual(SectionSchedule.objects.count(), 3)
+
+		created, errors = ingest_schedules([(self.b.id, 4, time(8, 0), time(9, 0)), (self.b.id, 4, time(7, 0), time(9, 0))], strict=True)
+		self.assertEqual((created, [e['index'] for e in errors]), ([], [1]))
+
+	def test_batch_row_starting_before_a_stored_row_is_rejected(self):
+		SectionSchedule.objects.create(section=self.b, day_of_week=3, start_time=time(9, 30), end_time=time(11, 0))
+		created, errors = ingest_schedules([
+			(self.b.id, 3, time(9, 0), time(10, 0)),     # ends inside the stored 09:30-11:00
+			(self.b.id, 3, time(8, 0), time(9, 30)),     # touches it
+			(self.b.id, 3, time(10, 30), time(12, 0)),   # starts inside it
+		])
+		self.assertEqual([(row.start_time, row.end_time) for row in created], [(time(8, 0), time(9, 30))])
+		self.assertEqual([(e['index'], e['error']) for e in errors], [
+			(0, 'Overlaps with schedule 09:30:00-11:00:00'), (2, 'Overlaps with schedule 09:30:00-11:00:00'),
+		])
+
+	def test_bulk_endpoint_is_staff_only(self):
+		User = get_user_model()
+		User.objects.create_user(username='staff', email='staff@example.com', password='pw', is_staff=True)
+		url = reverse('planner:bulk_add_schedules')
+		body = json.dumps({'schedules': [{'section_id': self.b.id, 'day': 4, 'start': '10:00', 'end': '11:30'}]})
+		self.assertEqual(self.client.post(url, body, content_type='application/json').status_code, 302)
+		self.client.login(username='staff', password='pw')
+		data = json.loads(self.client.post(url, body, content_type='application/json').content)
+		self.assertEqual((data['ok'], data['created']), (True, 1))
+		resp = self.client.post(url, '{"schedules": [{"day": 1}]}', content_type='application/json')
+		self.assertEqual(resp.status_code, 400)
+
+
+	def admin_post(self, rows):
+		"""Save section `a` in the admin with its stored schedule plus `rows` as new inline rows."""
+		stored = SectionSchedule.objects.get(section=self.a)
+		data = {
+			'section_number': '01', 'course': self.a.course_id, 'datetime': '', 'room': '', 'campus': '',
+			'schedules-TOTAL_FORMS': len(rows) + 1, 'schedules-INITIAL_FORMS': 1,
+			'schedules-MIN_NUM_FORMS': 0, 'schedules-MAX_NUM_FORMS': 1000,
+			'schedules-0-id': stored.id, 'schedules-0-section': self.a.id,
+			'schedules-0-day_of_week': 0, 'schedules-0-start_time': '09:00', 'schedules-0-end_time': '10:00',
+		}
+		for i, (day, start, end) in enumerate(rows, 1):
+			data.update({
+				f'schedules-{i}-section': self.a.id, f'schedules-{i}-day_of_week': day,
+				f'schedules-{i}-start_time': start, f'schedules-{i}-end_time': end,
+			})
+		return self.client.post(reverse('admin:core_section_change', args=[self.a.id]), data)
+
+	def test_admin_inline_validates_and_inserts_as_a_batch(self):
+		User = get_user_model()
+		User.objects.create_superuser(username='admin', email='admin@example.com', password='pw')
+		self.client.login(username='admin', password='pw')
+		# the two new rows overlap each other, not the stored one
+		resp = self.admin_post([(1, '13:00', '14:00'), (1, '13:30', '15:00')])
+		self.assertEqual(resp.status_code, 200)
+		self.assertContains(resp, 'Overlaps with schedule 13:00:00-14:00:00')
+		self.assertEqual(SectionSchedule.objects.filter(section=self.a).count(), 1)
+
+		resp = self.admin_post([(1, '13:00', '14:00'), (1, '14:00', '15:00'), (0, '10:00', '11:00')])
+		self.assertEqual(resp.status_code, 302)
+		self.assertEqual(SectionSchedule.objects.filter(section=self.a).count(), 4)
+
+
+class LegacyScheduleTest(TestCase):
+	def test_parse_english_and_thai(self):
+		self.assertEqual(parse_schedule('Mon 10:00-11:00'), [(0, time(10), time(11))])
+		self.assertEqual([m[0] for m in parse_schedule('MWF 10:00 - 10:50')], [0, 2, 4])
+		self.assertEqual([m[0] for m in parse_schedule('TTh 13:00-14:30')], [1, 3])
+		self.assertEqual(parse_schedule('Tue, Thu 13:00-14:30; Sat 9:00-12:00')[-1], (5, time(9), time(12)))
+		self.assertEqual([m[0] for m in parse_schedule('วันจันทร์ และ พฤหัสบดี 09.00-12.00 น.')], [0, 3])
+		self.assertEqual([m[0] for m in parse_schedule('อ. อา. 13:00-16:00')], [1, 6])
+		for bad in ('', 'TBA', 'Mon', 'Xyz 10:00-11:00', 'Mon 11:00-10:00', '10:00-11:00'):
+			with self.assertRaises(UnparseableSchedule):
+				parse_schedule(bad)
+
+	def test_import_is_chunked_and_rerunnable(self):
+		course = Course.objects.create(course_name='Graphics', course_code='CN360', description='', credit=3)
+		a = Section.objects.create(course=course, section_number='01', datetime='MWF 10:00 - 10:50')
+		b = Section.objects.create(course=course, section_number='02', datetime='ศุกร์ 13:00-15:00')
+		Section.objects.create(course=course, section_number='03', datetime='to be announced')
+		c = Section.objects.create(course=course, section_number='04')
+		SectionTime.objects.create(section=c, slot=TimeSlot.objects.create(time='Tue 08:00-9:00'))
+
+		out = StringIO()
+		call_command('import_legacy_schedules', chunk_size=2, stdout=out)
+		self.assertIn("could not parse 'to be announced'", out.getvalue())
+		self.assertEqual(SectionSchedule.objects.filter(section=a).count(), 3)
+		self.assertEqual(SectionSchedule.objects.get(section=a, day_of_week=0).end_time, time(11))
+		self.assertTrue(SectionSchedule.objects.filter(section=b, day_of_week=4, start_time=time(13)).exists())
+		self.assertTrue(SectionSchedule.objects.filter(section=c, day_of_week=1).exists())
+
+		call_command('import_legacy_schedules', stdout=out)
+		self.assertEqual(SectionSchedule.objects.count(), 5)
+		self.assertIn('Created 0 schedules; 5 already present', out.getvalue())
+
+
+class SectionFinderTest(TestCase):
+	def setUp(self):
+		User = get_user_model()
+		User.objects.create_user(username='find', email='find@example.com', password='pw')
+		self.client.login(username='find', password='pw')
+		self.client.get(reverse('planner:find_sections'))  # daily-active-user bookkeeping happens once
+		rangsit = Campus.objects.create(name='Rangsit')
+		tha_prachan = Campus.objects.create(name='Tha Prachan')
+		self.prof = Prof.objects.create(prof_name='Dr Finder')
+		three = Course.objects.create(course_name='Theory', course_code='CN370', description='', credit=3)
+		two = Course.objects.create(course_name='Seminar', course_code='CN371', description='', credit=2)
+
+		def section(course, number, campus, day, start, teacher=None):
+			s = Section.objects.create(course=course, section_number=number, campus=campus, room='R')
+			SectionSchedule.objects.create(section=s, day_of_week=day, start_time=time(start), end_time=time(start + 2))
+			if teacher:
+				s.teachers.add(teacher)
+			return s
+
+		self.match = section(three, '01', rangsit, 3, 14, self.prof)
+		self.match2 = section(three, '02', rangsit, 1, 13, self.prof)
+		section(three, '03', rangsit, 1, 9, self.prof)          # too early
+		section(three, '04', tha_prachan, 3, 14, self.prof)     # other campus
+		section(two, '01', rangsit, 3, 14, self.prof)           # 2 credits
+		section(three, '05', rangsit, 3, 14)                    # other teacher
+		section(three, '06', rangsit, 2, 14, self.prof)         # Wednesday
+		self.rangsit = rangsit
+
+	def test_all_filters_in_one_query(self):
+		params = {'days': 'tue,thu', 'start_min': 13 * 60, 'campus': self.rangsit.id, 'prof': self.prof.id, 'credit': 3}
+		with self.assertNumQueries(4):  # session, user, active-user check, finder
+			data = json.loads(self.client.get(reverse('planner:find_sections'), params).content)
+		self.assertEqual([row[0] for row in data['results']], [self.match.id, self.match2.id])
+		self.assertEqual(data['results'][0][1:], ['CN370', 'Theory', '01', 3, 'Rangsit', 'R'])
+		self.assertIsNone(data['next'])
+
+	def test_time_filter_is_an_uncorrelated_index_scan(self):
+		plan = find_sections(days={1, 3}, starts_after=time(13)).explain()
+		self.assertIn('schedule_day_time_idx', plan)
+		self.assertNotIn('CORRELATED', plan)
+
+	def test_pagination_and_validation(self):
+		url = reverse('planner:find_sections')
+		first = json.loads(self.client.get(url, {'page_size': 4}).content)
+		second = json.loads(self.client.get(url, {'page_size': 4, 'after': first['next']}).content)
+		self.assertEqual(len(first['results']) + len(second['results']), 7)
+		self.assertIsNone(second['next'])
+		self.assertEqual(self.client.get(url, {'days': 'someday'}).status_code, 400)
+		self.assertEqual(self.client.get(url, {'end_min': 5000}).status_code, 400)
+		for params in ({'after': 10 ** 30}, {'page_size': 10 ** 30}, {'page_size': 0}, {'prof': 2 ** 63}, {'after': -1}):
+			resp = self.client.get(url, params)
+			self.assertEqual((resp.status_code, resp.json()['ok']), (400, False), params)
+
+
+class DoubleBookingTest(TestCase):
+	def setUp(self):
+		cache.clear()
+		rangsit = Campus.objects.create(name='Rangsit')
+		lampang = Campus.objects.create(name='Lampang')
+		course = Course.objects.create(course_name='Robotics', course_code='CN380', description='', credit=3)
+		self.prof = Prof.objects.create(prof_name='Dr Busy')
+
+		def section(number, room, campus, day, start, end):
+			s = Section.objects.create(course=course, section_number=number, room=room, campus=campus)
+			SectionSchedule.objects.create(section=s, day_of_week=day, start_time=time(*start), end_time=time(*end))
+			return s
+
+		self.a = section('01', 'R101', rangsit, 0, (9, 0), (11, 0))
+		self.b = section('02', 'R101', rangsit, 0, (10, 0), (12, 0))    # same room, overlapping
+		self.c = section('03', 'R101', rangsit, 0, (11, 0), (12, 0))    # same room, overlaps b only
+		section('04', 'R101', lampang, 0, (9, 0), (11, 0))               # same room name, other campus
+		self.d = section('05', 'R202', rangsit, 2, (13, 0), (15, 0))
+		self.e = section('06', '', rangsit, 2, (14, 0), (16, 0))
+		self.d.teachers.add(self.prof)
+		self.e.teachers.add(self.prof)
+
+	def test_sweep_finds_room_and_prof_clashes(self):
+		clashes = find_clashes()
+		rooms = sorted(c['sections'] for c in clashes if c['kind'] == 'room')
+		self.assertEqual(rooms, [sorted([self.a.id, self.b.id]), sorted([self.b.id, self.c.id])])
+		profs = [c for c in clashes if c['kind'] == 'prof']
+		self.assertEqual(len(profs), 1)
+		self.assertEqual((profs[0]['resource'], profs[0]['day_name']), ('Dr Busy', 'Wed'))
+
+	def test_placeholder_rooms_are_not_double_booked(self):
+		course = Course.objects.create(course_name='Remote', course_code='CN390', description='', credit=3)
+		for number, room in enumerate(['TBA', 'tba', 'Online', 'MS Teams', 'N/A', '-']):
+			section = Section.objects.create(course=course, section_number=f'9{number}', room=room)
+			SectionSchedule.objects.create(section=section, day_of_week=4, start_time=time(9, 0), end_time=time(12, 0))
+		self.assertEqual(len([c for c in find_clashes() if c['kind'] == 'room']), 2)
+
+	def test_command_admin_report_and_import_hook(self):
+		out = StringIO()
+		call_command('find_double_bookings', stdout=out)
+		self.assertIn('3 double-bookings found.', out.getvalue())
+		with self.assertRaises(CommandError):
+			call_command('find_double_bookings', fail=True, stdout=StringIO())
+
+		User = get_user_model()
+		User.objects.create_superuser(username='admin', email='admin@example.com', password='pw')
+		self.client.login(username='admin', password='pw')
+		resp = self.client.get(reverse('admin:planner_sectionschedule_double_bookings'))
+		self.assertContains(resp, 'Dr Busy')
+		self.assertContains(resp, 'R101 (Rangsit)')
+
+		body = json.dumps({'schedules': [{'section_id': self.c.id, 'day': 4, 'start': '08:00', 'end': '09:00'}]})
+		self.client.post(reverse('planner:bulk_add_schedules'), body, content_type='application/json')
+		run_pending()
+		job = Job.objects.get(task='planner.detect_double_bookings')
+		self.assertEqual(job.status, Job.STATUS_DONE)
 
-# Create your tests here.
+	def test_worker_report_is_read_without_recomputing(self):
+		get_clash_report(refresh=True)
+		# another process has its own catalog version counter, but the key comes from the database
+		cache.delete('version:catalog')
+		with mock.patch('planner.clashes.find_clashes') as find:
+			self.assertEqual(len(get_clash_report()), 3)
+		find.assert_not_called()
+		SectionSchedule.objects.create(section=self.c, day_of_week=4, start_time=time(8, 0), end_time=time(9, 0))
+		with mock.patch('planner.clashes.find_clashes', return_value=[]) as find:
+			self.assertEqual(get_clash_report(), [])
+		find.assert_called_once_with()
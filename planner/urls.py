@@ -10,6 +10,7 @@ urlpatterns = [
     # Variant endpoints
     path('variant/create/', views.create_variant, name='create_variant'),
     path('variant/list/', views.list_variants, name='list_variants'),
+    path('variant/compare/', views.compare_variants, name='compare_variants'),
     path('variant/save_current/', views.save_current_variant, name='save_current_variant'),
     path('variant/<int:variant_id>/load/', views.load_variant, name='load_variant'),
     path('variant/<int:variant_id>/delete/', views.delete_variant, name='delete_variant'),
@@ -17,6 +18,12 @@ urlpatterns = [
     path('variant/<int:variant_id>/remove/<int:section_id>/', views.remove_section_from_variant, name='variant_remove_section'),
     # user schedule editing: add schedule slot to a section
     path('schedule/add/', views.add_section_schedule, name='add_section_schedule'),
+    # staff: bulk schedule import, validated as one batch
+    path('schedule/bulk/', views.bulk_add_schedules, name='bulk_add_schedules'),
     # search sections
     path('search/', views.search_sections, name='search_sections'),
+    # full section list (streamed JSON)
+    path('sections/', views.section_list, name='section_list'),
+    # multi-criteria section finder
+    path('sections/find/', views.find_sections, name='find_sections'),
 ]
@@ -1,13 +1,24 @@
 from django.shortcuts import render, get_object_or_404
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
+from django.utils.dateparse import parse_time
+from django.views.decorators.http import require_POST
 from django.core.exceptions import ValidationError
 
 from .models import Planner, SectionSchedule, PlanVariant
 from core.models import Section
 from . import utils
+from .compare import compare_variants as build_variant_comparison
+from core.streaming import StreamingJsonResponse
+from jobs.registry import enqueue
+from .occupancy import get_occupancy_index
+from .ingest import ingest_schedules
+from . import finder
 
 import hashlib
+import json
+from itertools import islice
 
 
 @login_required
@@ -45,7 +56,7 @@ def remove_section_from_planner(request, section_id):
 		return JsonResponse({'ok': False, 'error': 'Planner not found'}, status=404)
 
 	planner.sections.remove(section)
-	total = planner.total_credits() if hasattr(planner, 'total_credits') else sum([s.course.credit or 0 for s in planner.sections.select_related('course').all()])
+	total = planner.total_credits()
 	return JsonResponse({'ok': True, 'message': 'Section removed', 'total_credits': total})
 
 
@@ -122,9 +133,6 @@ def planner_view(request):
 	user_sections = [{'id': s.id, 'label': f"{s.course.course_code} Sec {s.section_number}"} for s in planner.sections.select_related('course').all()]
 	user_section_ids = [s.id for s in planner.sections.all()]  # For JS to mark already-added sections
 
-	# for future planner: provide ALL sections to browse/add
-	all_sections = [{'id': s.id, 'code': s.course.course_code, 'name': s.course.course_name, 'sec': s.section_number} for s in Section.objects.select_related('course').all().order_by('course__course_code', 'section_number')]
-
 	context = {
 		'planner': planner,
 		'items': items,
@@ -137,7 +145,6 @@ def planner_view(request):
 		'course_rows': course_rows,
 		'user_sections': user_sections,
 		'user_section_ids': user_section_ids,  # JS array for marking added sections
-		'all_sections': all_sections,
 		'planner_total_credits': planner.total_credits(),
 	}
 	return render(request, 'planner/index.html', context)
@@ -196,6 +203,32 @@ def add_section_schedule(request):
 	return JsonResponse({'ok': True, 'message': 'Schedule added', 'id': ss.id})
 
 
+@staff_member_required
+@require_POST
+def bulk_add_schedules(request):
+	"""Validate and insert many SectionSchedule rows at once (see planner/ingest.py).
+
+	Expects a JSON body {"schedules": [{"section_id", "day", "start": "HH:MM", "end": "HH:MM"}, ...],
+	"strict": false}. Every invalid row is reported in `errors` with its index;
+	with strict=true nothing is inserted unless the whole batch is valid.
+	"""
+	try:
+		data = json.loads(request.body)
+		entries = [
+			(int(row['section_id']), int(row['day']), parse_time(row['start']), parse_time(row['end']))
+			for row in data['schedules']
+		]
+	except (ValueError, TypeError, KeyError):
+		return JsonResponse({'ok': False, 'error': 'Invalid schedules payload'}, status=400)
+	if any(start is None or end is None for _, _, start, end in entries):
+		return JsonResponse({'ok': False, 'error': 'Times must be HH:MM'}, status=400)
+
+	created, errors = ingest_schedules(entries, strict=bool(data.get('strict')))
+	if created:
+		enqueue('planner.detect_double_bookings')
+	return JsonResponse({'ok': not errors, 'created': len(created), 'errors': errors})
+
+
 @login_required
 def create_variant(request):
 	"""Create a new PlanVariant for the current user (POST: name).
@@ -216,10 +249,28 @@ def create_variant(request):
 
 @login_required
 def list_variants(request):
-	"""Return JSON list of user's PlanVariants."""
+	"""Return JSON list of user's PlanVariants (streamed)."""
 	planner, _ = Planner.objects.get_or_create(user=request.user)
-	variants = [{'id': v.id, 'name': v.name, 'credits': v.total_credits()} for v in planner.variants.all()]
-	return JsonResponse({'ok': True, 'variants': variants})
+	rows = planner.variants.values_list('id', 'name', 'credits')
+	variants = ({'id': pk, 'name': name, 'credits': credits} for pk, name, credits in rows.iterator())
+	return StreamingJsonResponse(variants, request, key='variants', extra={'ok': True})
+
+
+@login_required
+def compare_variants(request):
+	"""Compare the user's variants: credits, sections, minutes per day, conflicts and pairwise diffs.
+
+	Optional GET `ids` (comma separated) limits the comparison to those variants.
+	"""
+	planner, _ = Planner.objects.get_or_create(user=request.user)
+	ids = request.GET.get('ids')
+	variant_ids = None
+	if ids:
+		try:
+			variant_ids = [int(pk) for pk in ids.split(',') if pk.strip()]
+		except ValueError:
+			return JsonResponse({'ok': False, 'error': 'Invalid variant ids'}, status=400)
+	return JsonResponse(dict(build_variant_comparison(planner, variant_ids), ok=True))
 
 
 @login_required
@@ -262,8 +313,8 @@ def save_current_variant(request):
 		return JsonResponse({'ok': False, 'error': 'Name required'}, status=400)
 
 	planner, _ = Planner.objects.get_or_create(user=request.user)
-	sections = planner.sections.select_related('course').all()
-	total = sum([s.course.credit or 0 for s in sections])
+	sections = planner.sections.all()
+	total = planner.total_credits()
 	# enforce credit limits
 	if total < 9 or total > 22:
 		return JsonResponse({'ok': False, 'error': f'Total credits must be between 9 and 22. Current: {total}'} , status=400)
@@ -300,11 +351,19 @@ def delete_variant(request, variant_id):
 	return JsonResponse({'ok': True, 'message': 'Variant deleted', 'variant_id': variant_id})
 
 
+SEARCH_LIMIT = 20
+
+
 @login_required
 def search_sections(request):
-	"""Search all available sections by course code or name."""
+	"""Search all available sections by course code or name.
+
+	With `compatible=1` only sections that can be added without a time
+	conflict are returned, checked against the planner or against the
+	variant given as `variant`. Sections already in that plan are left out.
+	"""
 	q = request.GET.get('q', '').lower()
-	sections = Section.objects.select_related('course').all()
+	sections = Section.objects.all()
 	
 	if q:
 		from django.db.models import Q
@@ -313,16 +372,69 @@ def search_sections(request):
 			Q(course__course_name__icontains=q)
 		)
 	
-	results = [
+	rows = sections.values_list('id', 'course__course_code', 'course__course_name', 'section_number', 'course__credit')
+	if request.GET.get('compatible') in ('1', 'true'):
+		variant_id = request.GET.get('variant')
+		if variant_id:
+			try:
+				plan = PlanVariant.objects.get(pk=int(variant_id), planner__user=request.user)
+			except (ValueError, PlanVariant.DoesNotExist):
+				return JsonResponse({'ok': False, 'error': 'Variant not found'}, status=404)
+		else:
+			plan, _ = Planner.objects.get_or_create(user=request.user)
+		taken = set(plan.sections.values_list('id', flat=True))
+		index = get_occupancy_index()
+		occupied = index.occupancy(taken)
+		# filter before limiting so every returned row can be added
+		compatible = (row for row in rows.iterator(chunk_size=200) if row[0] not in taken and index.fits(row[0], occupied))
+		rows = list(islice(compatible, SEARCH_LIMIT))
+	else:
+		rows = rows[:SEARCH_LIMIT].iterator()
+	results = (
 		{
-			'id': s.id,
-			'code': s.course.course_code,
-			'name': s.course.course_name,
-			'sec': s.section_number,
-			'credit': s.course.credit or 0,
-			'label': f"{s.course.course_code} Sec {s.section_number} - {s.course.course_name}",
+			'id': sid,
+			'code': code,
+			'name': name,
+			'sec': number,
+			'credit': credit or 0,
+			'label': f"{code} Sec {number} - {name}",
 		}
-		for s in sections[:20]  # limit to 20 results
-	]
-	return JsonResponse({'ok': True, 'results': results})
+		for sid, code, name, number, credit in rows
+	)
+	return StreamingJsonResponse(results, request, extra={'ok': True})
+
+
+@login_required
+def section_list(request):
+	"""Every section in the catalog (optionally one course), streamed row by row."""
+	sections = Section.objects.order_by('course__course_code', 'section_number', 'id')
+	course_id = request.GET.get('course_id')
+	if course_id:
+		try:
+			sections = sections.filter(course_id=int(course_id))
+		except ValueError:
+			return JsonResponse({'ok': False, 'error': 'Invalid course_id'}, status=400)
+	rows = sections.values_list('id', 'course__course_code', 'course__course_name', 'section_number', 'course__credit')
+	results = (
+		{'id': sid, 'code': code, 'name': name, 'sec': number, 'credit': credit or 0}
+		for sid, code, name, number, credit in rows.iterator(chunk_size=2000)
+	)
+	return StreamingJsonResponse(results, request, extra={'ok': True})
+
+
+@login_required
+def find_sections(request):
+	"""Sections matching every given filter, as compact rows (column order in `fields`).
+
+	Query params: days (e.g. "1,3" or "tue,thu"), start_min / end_min (minutes
+	after midnight a meeting must start after / end before), campus, prof,
+	credit, after (id from `next`), page_size.
+	"""
+	try:
+		filters = finder.parse_filters(request.GET)
+		after, page_size = finder.parse_page(request.GET)
+	except finder.InvalidFilter as e:
+		return JsonResponse({'ok': False, 'error': str(e)}, status=400)
 
+	rows, next_after = finder.finder_page(finder.find_sections(**filters), after, page_size)
+	return JsonResponse({'ok': True, 'fields': finder.FIELDS, 'results': rows, 'next': next_after})
@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError, transaction
-from .models import Review, Bookmark, ReviewUpvote, Report, Tag
+from .models import Review, Bookmark, ReviewUpvote, Report, Tag, ReportedReview
+from .moderation import triage_queue
 
 class AutoUserAdminMixin:
     exclude = ('user',)
@@ -25,7 +26,9 @@ class TagAdmin(admin.ModelAdmin):
 
 @admin.register(Review)
 class ReviewAdmin(AutoUserAdminMixin, admin.ModelAdmin):
-    list_display = ('id', '__str__', 'course', 'prof', 'rating', 'date_created')
+    list_display = ('id', '__str__', 'course', 'prof', 'rating', 'report_count', 'is_hidden', 'date_created')
+    list_filter = ('is_hidden', 'hidden_by_moderator')
+    readonly_fields = ('report_count', 'last_reported_at')
     filter_horizontal = ('tags',) # Improves the UI for ManyToManyFields
     raw_id_fields = ('course', 'prof')
 
@@ -45,4 +48,32 @@ class ReviewVoteAdmin(AutoUserAdminMixin, admin.ModelAdmin):
 @admin.register(Report)
 class ReviewReportAdmin(AutoUserAdminMixin, admin.ModelAdmin):
     list_display = ('id', 'review', 'user')
-    raw_id_fields = ('review',)
\ No newline at end of file
+    raw_id_fields = ('review',)
+
+
+@admin.register(ReportedReview)
+class ReportTriageAdmin(admin.ModelAdmin):
+    list_display = ('id', 'head', 'course', 'report_count', 'last_reported_at', 'is_hidden')
+    list_select_related = ('course',)
+    readonly_fields = ('report_count', 'last_reported_at')
+    actions = ['hide_reviews', 'dismiss_reports']
+
+    def get_queryset(self, request):
+        return triage_queue()
+
+    def get_ordering(self, request):
+        return ('-report_count', '-last_reported_at')
+
+    @admin.action(description='Hide selected reviews')
+    def hide_reviews(self, request, queryset):
+        for review in queryset:
+            review.is_hidden = True
+            review.hidden_by_moderator = True
+            review.save(update_fields=['is_hidden', 'hidden_by_moderator'])
+
+    @admin.action(description='Dismiss reports (and unhide) for selected reviews')
+    def dismiss_reports(self, request, queryset):
+        queryset.filter(hidden_by_moderator=True).update(hidden_by_moderator=False)
+        # Deleting the reports brings each counter back to zero through the post_delete signal
+        for report in Report.objects.filter(review__in=queryset):
+            report.delete()
@@ -0,0 +1,111 @@
+"""Keyset-paginated review feeds for course and professor pages.
+
+Pages are addressed by an opaque cursor holding the sort key and id of the
+last review shown, so fetching page N is one range scan on the matching
+composite index (see `Review.Meta.indexes`) instead of an OFFSET that
+re-reads every earlier row. Ties on the sort key are broken by id.
+"""
+import base64
+import json
+
+from django.db.models import Exists, OuterRef, Q, Subquery, Value, F
+from django.db.models.functions import Coalesce
+from django.utils.dateparse import parse_datetime
+
+from .models import Bookmark, Review, ReviewUpvote
+
+PAGE_SIZE = 10
+MAX_PAGE_SIZE = 50
+
+# sort name -> field compared in the cursor (always descending, then -id)
+SORTS = {
+    'newest': 'date_created',
+    'score': 'net_votes',
+    'rating': 'rating',
+    'helpful': 'helpfulness',
+}
+DEFAULT_SORT = 'newest'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(review, sort):
+    value = getattr(review, SORTS[sort])
+    if sort == 'newest':
+        value = value.isoformat()
+    raw = json.dumps([value, review.pk]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, sort):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, pk = json.loads(raw)
+        pk = int(pk)
+        if sort == 'newest':
+            value = parse_datetime(value)
+            if value is None:
+                raise ValueError
+        elif sort == 'helpful':
+            value = float(value)
+        else:
+            value = int(value)
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor.')
+    return value, pk
+
+
+def with_viewer_state(queryset, user, bookmark_filter=None):
+    """Annotate is_bookmarked / score / user_vote without joining the vote table.
+
+    `bookmark_filter` overrides which of the viewer's bookmarks mark a review
+    (the course page also counts a bookmark on the whole course).
+    """
+    if user.is_authenticated:
+        bookmarks = Bookmark.objects.filter(user=user)
+        bookmarks = bookmarks.filter(bookmark_filter) if bookmark_filter is not None else bookmarks.filter(review=OuterRef('pk'))
+        own_vote = ReviewUpvote.objects.filter(user=user, review=OuterRef('pk')).values('vote_type')[:1]
+        user_vote = Coalesce(Subquery(own_vote), 0)
+    else:
+        bookmarks = Bookmark.objects.none()
+        user_vote = Value(0)
+    return queryset.annotate(
+        is_bookmarked=Exists(bookmarks),
+        score=F('net_votes'),
+        user_vote=user_vote,
+    )
+
+
+def review_page(queryset, sort=DEFAULT_SORT, cursor=None, page_size=PAGE_SIZE):
+    """Return (reviews, next_cursor) for one page of `queryset` in `sort` order.
+
+    Raises InvalidCursor for a malformed cursor; next_cursor is None on the last page.
+    """
+    if sort not in SORTS:
+        sort = DEFAULT_SORT
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    field = SORTS[sort]
+    if cursor:
+        value, pk = decode_cursor(cursor, sort)
+        queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'pk__lt': pk}))
+    rows = list(queryset.order_by(f'-{field}', '-pk')[:page_size + 1])
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return rows, encode_cursor(rows[-1], sort)
+    return rows, None
+
+
+def course_reviews(course_id, user):
+    """Visible reviews of a course with the viewer's bookmark/vote state."""
+    qs = Review.objects.visible().filter(course_id=course_id)
+    # bookmarking the whole course marks all of its reviews
+    bookmark_filter = Q(course_id=course_id) & (Q(review=OuterRef('pk')) | Q(review=None))
+    return with_viewer_state(qs, user, bookmark_filter).select_related('user', 'course', 'prof', 'section').prefetch_related('tags')
+
+
+def prof_reviews(prof_id, user):
+    """Visible reviews of a professor with the viewer's bookmark/vote state."""
+    qs = Review.objects.visible().filter(prof_id=prof_id)
+    return with_viewer_state(qs, user).select_related('user', 'course', 'prof', 'section').prefetch_related('tags')
@@ -1,6 +1,7 @@
 from django import forms
 from .models import Review, Tag, Report, ReviewUpvote
 from core.models import Course, Prof, Section
+from core.enrollment import get_enrollment_profile
 
 class ReviewForm(forms.ModelForm):
     # 1. กำหนด Field ทั้งหมดให้ไม่บังคับเลือก (required=False) ในตอนแรก
@@ -64,18 +65,19 @@ class ReviewForm(forms.ModelForm):
         # keep a reference to user for use in clean()
         self.user = user
 
-        if user:
+        # Enrollment profile (cached per user) answers every enrollment question in memory
+        self.profile = get_enrollment_profile(user) if user else None
+
+        if self.profile:
             # กรอง "รายวิชา" ให้แสดงเฉพาะที่ user เคยลงทะเบียน
-            enrolled_courses = Course.objects.filter(
-                sections__students=user
-            ).distinct().order_by('course_code')
-            self.fields['course'].queryset = enrolled_courses
+            self.fields['course'].queryset = Course.objects.filter(
+                pk__in=self.profile.course_ids
+            ).order_by('course_code')
 
             # กรอง "อาจารย์" ให้แสดงเฉพาะที่เคยสอน user
-            taught_professors = Prof.objects.filter(
-                teaching_sections__students=user
-            ).distinct().order_by('prof_name')
-            self.fields['professor'].queryset = taught_professors
+            self.fields['professor'].queryset = Prof.objects.filter(
+                pk__in=self.profile.prof_ids
+            ).order_by('prof_name')
 
         # ทำให้ช่อง Section เริ่มต้นเป็น disabled (จะถูกเปิดใช้งานด้วย JavaScript)
         self.fields['section'].widget.attrs['disabled'] = True
@@ -103,9 +105,10 @@ class ReviewForm(forms.ModelForm):
                     course_id = int(course_val)
                     sections_qs = Section.objects.filter(course_id=course_id)
                     # Optionally restrict to sections the user enrolled in
-                    if user:
-                        sections_qs = sections_qs.filter(students=user)
-                    self.fields['section'].queryset = sections_qs.distinct().order_by('section_number')
+                    if self.profile:
+                        section_ids = [sid for sid, _ in self.profile.sections_for_course(course_id)]
+                        sections_qs = sections_qs.filter(pk__in=section_ids)
+                    self.fields['section'].queryset = sections_qs.order_by('section_number')
                     # If a section was submitted, enable the widget so validation runs normally
                     if 'section' in self.data and self.data.get('section'):
                         self.fields['section'].widget.attrs.pop('disabled', None)
@@ -130,12 +133,16 @@ class ReviewForm(forms.ModelForm):
         # --- Validation 2: ตรวจสอบความสอดคล้องของข้อมูลที่เลือก ---
         # กรณี 2.1: ถ้าเลือก Course และ Section -> Section ต้องอยู่ใน Course นั้น
         if course and section:
-            if section.course != course:
+            if section.course_id != course.pk:
                 self.add_error('section', f"Section {section.section_number} is not in course {course.course_code}")
 
         # กรณี 2.2: ถ้าเลือก Course และ Professor -> Professor ต้องเคยสอน Course นั้น
         if course and prof:
-            if not Section.objects.filter(course=course, teachers=prof).exists():
+            if self.profile:
+                teaches = self.profile.prof_teaches_course(prof.pk, course.pk)
+            else:
+                teaches = Section.objects.filter(course=course, teachers=prof).exists()
+            if not teaches:
                 self.add_error('prof', f"{prof.prof_name} does not teach course {course.course_code}")
 
         # If user selected a professor but no course, try to infer a course.
@@ -143,10 +150,10 @@ class ReviewForm(forms.ModelForm):
         if prof and not course:
             inferred_course = None
             try:
-                if hasattr(self, 'user') and self.user:
-                    qs = Section.objects.filter(teachers=prof, students=self.user)
-                    if qs.exists():
-                        inferred_course = qs.first().course
+                if self.profile:
+                    course_id = self.profile.course_taken_with_prof(prof.pk)
+                    if course_id:
+                        inferred_course = Course.objects.get(pk=course_id)
                 if not inferred_course:
                     qs_any = Section.objects.filter(teachers=prof)
                     if qs_any.exists():
@@ -165,7 +172,11 @@ class ReviewForm(forms.ModelForm):
 
         # กรณี 2.3: ถ้าเลือก Professor และ Section -> Professor ต้องสอน Section นั้น
         if prof and section:
-            if prof not in section.teachers.all():
+            if self.profile and section.pk in self.profile.sections:
+                teaches = self.profile.prof_teaches_section(prof.pk, section.pk)
+            else:
+                teaches = section.teachers.filter(pk=prof.pk).exists()
+            if not teaches:
                 self.add_error('prof', f"{prof.prof_name} does not teach Section {section.section_number}")
 
         return cleaned_data
@@ -0,0 +1,103 @@
+"""Cached review blocks with a per-viewer overlay.
+
+`review/includes/review_block.html` is rendered once per review (and per
+signed-in / anonymous variant) with placeholder tokens wherever the output
+depends on the viewer: bookmark state, own vote, current score, CSRF token
+and the owner's delete button. The result is cached under the review id and
+its content version; each request only fills the tokens in, so a page of
+reviews is mostly cache reads and string concatenation. Tokens carry a
+secret derived from SECRET_KEY, so text written into a review can never form
+one; it is the same in every process sharing the cache.
+"""
+import hashlib
+import re
+
+from django.core.cache import cache
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.crypto import salted_hmac
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from core.versioning import get_version, get_versions, CATALOG, REVIEW_CONTENT
+
+TEMPLATE = 'review/includes/review_block.html'
+FRAGMENT_TIMEOUT = 60 * 60 * 24
+
+SLOTS = (
+    'bookmark_active', 'bookmarked', 'bookmark_pressed', 'bookmark_icon',
+    'owner_actions', 'csrf', 'upvote_class', 'downvote_class', 'score',
+)
+_SLOT_NONCE = salted_hmac('review.fragments.slot', 'slot').hexdigest()[:16]
+SLOT_TOKENS = {name: f'@@slot:{_SLOT_NONCE}:{name}@@' for name in SLOTS}
+_SLOT_RE = re.compile(rf'@@slot:{_SLOT_NONCE}:(\w+)@@')
+
+
+def fragment_key(review, authenticated, content_version, catalog_version):
+    # the author's name and picture are rendered too; hash them into the key instead of versioning users
+    author = hashlib.md5(f'{review.user.username}\0{review.user.imgurl or ""}'.encode('utf-8')).hexdigest()[:12]
+    variant = 'auth' if authenticated else 'anon'
+    return f'review_block:{variant}:{review.pk}:{content_version}:{catalog_version}:{author}'
+
+
+def render_fragment(review, authenticated):
+    return render_to_string(TEMPLATE, {'review': review, 'authenticated': authenticated, 'slot': SLOT_TOKENS})
+
+
+def overlay_values(review, request):
+    """Viewer-dependent values for one review's placeholders."""
+    user = request.user
+    score = getattr(review, 'score', None)
+    values = {'score': str(review.net_votes if score is None else score)}
+    if not user.is_authenticated:
+        return values
+    bookmarked = bool(getattr(review, 'is_bookmarked', False))
+    user_vote = getattr(review, 'user_vote', 0)
+    values.update({
+        'bookmark_active': 'active' if bookmarked else '',
+        'bookmarked': 'True' if bookmarked else 'False',
+        'bookmark_pressed': 'true' if bookmarked else 'false',
+        'bookmark_icon': 'fas' if bookmarked else 'far',
+        'upvote_class': 'btn-success' if user_vote == 1 else 'btn-outline-success',
+        'downvote_class': 'btn-danger' if user_vote == -1 else 'btn-outline-danger',
+        'csrf': format_html('<input type="hidden" name="csrfmiddlewaretoken" value="{}">', get_token(request)),
+        'owner_actions': '',
+    })
+    match = getattr(request, 'resolver_match', None)
+    if match and match.view_name == 'users:profile' and review.user_id == user.pk:
+        values['owner_actions'] = format_html(
+            '<button class="btn btn-sm btn-outline-danger delete-review-btn" data-review-id="{}" data-url="{}">'
+            '<i class="fas fa-trash"></i> Delete</button>',
+            review.pk, reverse('review:delete_review', args=[review.pk]),
+        )
+    return values
+
+
+def apply_overlay(fragment, values):
+    return mark_safe(_SLOT_RE.sub(lambda m: values.get(m.group(1), ''), fragment))
+
+
+def render_review_blocks(reviews, request):
+    """Rendered HTML of each review block for this request's viewer, in order."""
+    reviews = list(reviews)
+    if not reviews:
+        return []
+    authenticated = request.user.is_authenticated
+    catalog_version = get_version(CATALOG)
+    content_versions = get_versions(REVIEW_CONTENT, [review.pk for review in reviews])
+    keys = [fragment_key(review, authenticated, content_versions[review.pk], catalog_version) for review in reviews]
+    fragments = cache.get_many(keys)
+
+    missing = {}
+    for review, key in zip(reviews, keys):
+        if key not in fragments:
+            missing[key] = fragments[key] = render_fragment(review, authenticated)
+    if missing:
+        cache.set_many(missing, FRAGMENT_TIMEOUT)
+
+    return [apply_overlay(fragments[key], overlay_values(review, request)) for review, key in zip(reviews, keys)]
+
+
+def render_review_block(review, request):
+    return render_review_blocks([review], request)[0]
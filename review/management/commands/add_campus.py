@@ -1,5 +1,7 @@
 from django.core.management.base import BaseCommand
 from core.models import Campus
+from core import catalog_sync
+from core.versioning import bump_version, CATALOG
 
 class Command(BaseCommand):
     help = 'Creates predefined campus records in the database.'
@@ -19,5 +21,8 @@ class Command(BaseCommand):
 
         # Execute the bulk creation
         Campus.objects.bulk_create(items)
+        # bulk_create skips the catalog signals
+        catalog_sync.record_changes(catalog_sync.CAMPUS, [item.pk for item in items])
+        bump_version(CATALOG)
 
         self.stdout.write(self.style.SUCCESS(f"Successfully created {len(items)} new campuses."))
\ No newline at end of file
@@ -8,6 +8,7 @@ from datetime import timedelta
 
 from review.models import Review
 from core.models import Course, Section, Prof
+from review.signals import reviews_bulk_created
 
 User = get_user_model()
 
@@ -88,6 +89,8 @@ class Command(BaseCommand):
             reviews_to_create.append(Review(**review_data))
 
         # Bulk create for efficiency
-        Review.objects.bulk_create(reviews_to_create)
+        created_reviews = Review.objects.bulk_create(reviews_to_create)
+        # bulk_create skips the review signals
+        reviews_bulk_created(created_reviews)
 
         self.stdout.write(self.style.SUCCESS(f'Successfully created {total} random reviews.'))
@@ -4,7 +4,8 @@ from django.core.management.base import BaseCommand
 from django.db import transaction
 
 from core.models import Section
-from planner.models import SectionSchedule
+from jobs.registry import enqueue
+from planner.ingest import ingest_schedules
 
 
 class Command(BaseCommand):
@@ -39,8 +40,7 @@ class Command(BaseCommand):
             (time(16, 0), time(17, 0)),
         ]
 
-        created_count = 0
-
+        entries = []
         for section in sections:
             # Generate 2-3 random days per section
             num_days = random.randint(2, 3)
@@ -48,21 +48,15 @@ class Command(BaseCommand):
 
             for day in selected_days:
                 start_time, end_time = random.choice(time_slot_options)
+                entries.append((section.id, day, start_time, end_time))
 
-                # Check if this schedule already exists
-                if not SectionSchedule.objects.filter(
-                    section=section,
-                    day_of_week=day,
-                    start_time=start_time,
-                    end_time=end_time
-                ).exists():
-                    SectionSchedule.objects.create(
-                        section=section,
-                        day_of_week=day,
-                        start_time=start_time,
-                        end_time=end_time
-                    )
-                    created_count += 1
+        # Validated as one batch; rows clashing with a section's existing schedule are skipped
+        created, skipped = ingest_schedules(entries)
+        created_count = len(created)
+        if skipped:
+            self.stdout.write(f"Skipped {len(skipped)} schedules that overlap existing ones.")
+        if created:
+            enqueue('planner.detect_double_bookings')
 
         self.stdout.write(
             self.style.SUCCESS(
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from planner.clashes import get_clash_report
+
+
+class Command(BaseCommand):
+    help = 'Report rooms and professors booked for two overlapping sections at once.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fail', action='store_true', help='Exit with an error when any clash is found.')
+
+    def handle(self, *args, **options):
+        clashes = get_clash_report(refresh=True)
+        for clash in clashes:
+            first, second = clash['labels']
+            self.stdout.write(
+                f"[{clash['kind']}] {clash['resource']} on {clash['day_name']}: {first} overlaps {second}"
+            )
+        if clashes and options['fail']:
+            raise CommandError(f"{len(clashes)} double-bookings found.")
+        style = self.style.WARNING if clashes else self.style.SUCCESS
+        self.stdout.write(style(f"{len(clashes)} double-bookings found."))
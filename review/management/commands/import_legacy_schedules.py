@@ -0,0 +1,92 @@
+from datetime import time
+
+from django.core.management.base import BaseCommand
+
+from core.models import Section, SectionTime
+from jobs.registry import enqueue
+from planner.ingest import ingest_schedules
+from planner.legacy import parse_schedule, UnparseableSchedule
+from planner.models import SectionSchedule
+from planner.utils import SLOT_DURATION_MINUTES
+
+
+def snap_to_slots(start, end):
+    """Widen a meeting to whole planner slots (10:00-10:50 -> 10:00-11:00)."""
+    start_min = start.hour * 60 + start.minute
+    end_min = end.hour * 60 + end.minute
+    start_min -= start_min % SLOT_DURATION_MINUTES
+    end_min += -end_min % SLOT_DURATION_MINUTES
+    end_min = min(end_min, 23 * 60 + 30)
+    return time(start_min // 60, start_min % 60), time(end_min // 60, end_min % 60)
+
+
+class Command(BaseCommand):
+    help = 'Parse legacy Section.datetime / TimeSlot.time strings into SectionSchedule rows (safe to re-run).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Sections loaded and written per batch.')
+        parser.add_argument('--dry-run', action='store_true', help='Parse and report without writing anything.')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        parsed_strings = {}
+        unparseable = []
+        scanned = created = existing = 0
+        rejected = []
+
+        last_id = 0
+        while True:
+            rows = list(Section.objects.filter(pk__gt=last_id).order_by('pk').values_list('pk', 'datetime')[:chunk_size])
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            section_ids = [pk for pk, _ in rows]
+            scanned += len(rows)
+
+            sources = [(pk, text) for pk, text in rows if text and text.strip()]
+            sources += list(SectionTime.objects.filter(section_id__in=section_ids).values_list('section_id', 'slot__time'))
+            stored = set(SectionSchedule.objects.filter(section_id__in=section_ids).values_list(
+                'section_id', 'day_of_week', 'start_time', 'end_time'
+            ))
+
+            wanted = set()
+            for section_id, text in sources:
+                # the same TimeSlot string is shared by many sections
+                if text not in parsed_strings:
+                    try:
+                        parsed_strings[text] = parse_schedule(text)
+                    except UnparseableSchedule as exc:
+                        parsed_strings[text] = exc
+                meetings = parsed_strings[text]
+                if isinstance(meetings, UnparseableSchedule):
+                    unparseable.append((section_id, text, meetings))
+                    continue
+                for day, start, end in meetings:
+                    wanted.add((section_id, day) + snap_to_slots(start, end))
+
+            entries = sorted(wanted - stored)
+            existing += len(wanted & stored)
+            if options['dry_run']:
+                created += len(entries)
+                continue
+            if not entries:
+                continue
+            new_rows, violations = ingest_schedules(entries)
+            created += len(new_rows)
+            rejected += [(entries[v['index']], v['error']) for v in violations]
+
+        for section_id, text, error in unparseable:
+            self.stdout.write(self.style.WARNING(f"Section {section_id}: could not parse {text!r} ({error})"))
+        for (section_id, day, start, end), error in rejected:
+            self.stdout.write(self.style.WARNING(
+                f"Section {section_id}: skipped day {day} {start:%H:%M}-{end:%H:%M} ({error})"
+            ))
+
+        if created and not options['dry_run']:
+            enqueue('planner.detect_double_bookings')
+
+        action = 'Would create' if options['dry_run'] else 'Created'
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {scanned} sections. {action} {created} schedules; {existing} already present, "
+            f"{len(rejected)} rejected, {len(unparseable)} unparseable strings."
+        ))
@@ -1,5 +1,7 @@
 from django.core.management.base import BaseCommand
 from core.models import Campus
+from core import catalog_sync
+from core.versioning import bump_version, CATALOG
 import random
 
 class Command(BaseCommand):
@@ -26,4 +28,7 @@ class Command(BaseCommand):
         items = [Campus(name=city) for city in selected_cities]
         
         Campus.objects.bulk_create(items)
+        # bulk_create skips the catalog signals
+        catalog_sync.record_changes(catalog_sync.CAMPUS, [item.pk for item in items])
+        bump_version(CATALOG)
         self.stdout.write(self.style.SUCCESS(f"Successfully created {len(items)} new campuses."))
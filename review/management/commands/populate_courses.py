@@ -1,5 +1,7 @@
 from django.core.management.base import BaseCommand
 from core.models import Course
+from core import catalog_sync
+from core.versioning import bump_version, CATALOG
 from faker import Faker
 import random
 
@@ -39,4 +41,7 @@ class Command(BaseCommand):
             ))
         
         Course.objects.bulk_create(items)
+        # bulk_create skips the catalog signals
+        catalog_sync.record_changes(catalog_sync.COURSE, [item.pk for item in items])
+        bump_version(CATALOG)
         self.stdout.write(self.style.SUCCESS(f"Successfully created {len(items)} new courses."))
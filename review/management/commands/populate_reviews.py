@@ -8,6 +8,7 @@ from datetime import timedelta
 
 from review.models import Review, Tag
 from core.models import Course, Section, Prof
+from review.signals import reviews_bulk_created
 
 User = get_user_model()
 
@@ -87,6 +88,8 @@ class Command(BaseCommand):
 
         # Bulk create reviews
         created_reviews = Review.objects.bulk_create(reviews_to_create)
+        # bulk_create skips the review signals
+        reviews_bulk_created(created_reviews)
 
         self.stdout.write("Assigning tags to reviews...")
 
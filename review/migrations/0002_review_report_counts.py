@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:17
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_report_counts(apps, schema_editor):
+    Review = apps.get_model('review', 'Review')
+    threshold = getattr(settings, 'REVIEW_REPORT_HIDE_THRESHOLD', 5)
+    counts = Review.objects.annotate(n=Count('reports')).filter(n__gt=0).values_list('pk', 'n')
+    for pk, n in counts:
+        Review.objects.filter(pk=pk).update(report_count=n, is_hidden=n >= threshold)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_create_missing_stat_tables'),
+        ('review', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='is_hidden',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='last_reported_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='report_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['is_hidden', '-date_created'], name='review_visible_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('report_count__gt', 0)), fields=['-report_count', '-last_reported_at'], name='review_triage_idx'),
+        ),
+        migrations.CreateModel(
+            name='ReportedReview',
+            fields=[
+            ],
+            options={
+                'verbose_name': 'Reported review',
+                'verbose_name_plural': 'Report triage queue',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('review.review',),
+        ),
+        migrations.RunPython(backfill_report_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:22
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_net_votes(apps, schema_editor):
+    Review = apps.get_model('review', 'Review')
+    totals = Review.objects.annotate(total=Sum('votes__vote_type')).exclude(total=None).values_list('pk', 'total')
+    for pk, total in totals:
+        Review.objects.filter(pk=pk).update(net_votes=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_create_missing_stat_tables'),
+        ('review', '0002_review_report_counts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='net_votes',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_net_votes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['course', 'is_hidden', '-date_created', '-id'], name='review_course_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['course', 'is_hidden', '-net_votes', '-id'], name='review_course_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['course', 'is_hidden', '-rating', '-id'], name='review_course_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['prof', 'is_hidden', '-date_created', '-id'], name='review_prof_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['prof', 'is_hidden', '-net_votes', '-id'], name='review_prof_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['prof', 'is_hidden', '-rating', '-id'], name='review_prof_rating_idx'),
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:24
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+from review.votes import wilson_lower_bound
+
+
+def backfill_helpfulness(apps, schema_editor):
+    Review = apps.get_model('review', 'Review')
+    counts = (Review.objects
+              .annotate(up=Count('votes', filter=Q(votes__vote_type__gt=0)),
+                        down=Count('votes', filter=Q(votes__vote_type__lt=0)))
+              .filter(Q(up__gt=0) | Q(down__gt=0))
+              .values_list('pk', 'up', 'down'))
+    for pk, up, down in counts:
+        Review.objects.filter(pk=pk).update(upvotes=up, downvotes=down, helpfulness=wilson_lower_bound(up, down))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_create_missing_stat_tables'),
+        ('review', '0003_review_feed_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='downvotes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='helpfulness',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='upvotes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_helpfulness, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['course', 'is_hidden', '-helpfulness', '-id'], name='review_course_helpful_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['prof', 'is_hidden', '-helpfulness', '-id'], name='review_prof_helpful_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['is_hidden', '-helpfulness', '-id'], name='review_helpful_idx'),
+        ),
+    ]
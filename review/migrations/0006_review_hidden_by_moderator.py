@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('review', '0005_timeline_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='hidden_by_moderator',
+            field=models.BooleanField(default=False),
+        ),
+    ]
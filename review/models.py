@@ -12,6 +12,12 @@ class Tag(models.Model):
         return self.name
 
 
+class ReviewQuerySet(models.QuerySet):
+    def visible(self):
+        """Reviews shown in public listings (not hidden by the report threshold)."""
+        return self.filter(is_hidden=False)
+
+
 # Main Review Entity
 class Review(models.Model):
     id = models.AutoField(primary_key=True)
@@ -30,18 +36,62 @@ class Review(models.Model):
     incognito = models.BooleanField(default=False)
     date_created = models.DateTimeField(default=timezone.now)
 
+    # Moderation (denormalized from Report, maintained in review/moderation.py)
+    report_count = models.PositiveIntegerField(default=0)
+    last_reported_at = models.DateTimeField(null=True, blank=True)
+    is_hidden = models.BooleanField(default=False)
+    # set when a moderator hid the review; report counts dropping never unhide it
+    hidden_by_moderator = models.BooleanField(default=False)
+
+    # Vote totals (denormalized, maintained in review/votes.py)
+    upvotes = models.PositiveIntegerField(default=0)
+    downvotes = models.PositiveIntegerField(default=0)
+    net_votes = models.IntegerField(default=0)
+    # Wilson score lower bound of upvotes / (upvotes + downvotes)
+    helpfulness = models.FloatField(default=0.0)
+
+    objects = ReviewQuerySet.as_manager()
+
     @property
     def vote_score(self):
-        """Calculates the total vote score for the review."""
-        # ใช้ aggregation เพื่อหาผลรวมของ vote_type ทั้งหมด (1 สำหรับ upvote, -1 สำหรับ downvote)
-        result = self.votes.aggregate(score=Sum('vote_type'))
-        return result['score'] or 0 # ถ้ายังไม่มีใคร vote เลย ให้คืนค่า 0
+        """Total vote score of the review (upvotes - downvotes)."""
+        # เก็บไว้ในคอลัมน์ net_votes แล้ว (อัปเดตทุกครั้งที่มีการ vote) ไม่ต้อง aggregate ใหม่
+        return self.net_votes
 
     def __str__(self):
         return f"Review by {self.user.email} for {self.course.course_code}"
 
     class Meta:
         ordering = ['-date_created']
+        indexes = [
+            # Public listings: visible reviews, newest first
+            models.Index(fields=['is_hidden', '-date_created'], name='review_visible_recent_idx'),
+            # Course / professor feeds (review/feeds.py): one index per sort, id breaks ties
+            models.Index(fields=['course', 'is_hidden', '-date_created', '-id'], name='review_course_recent_idx'),
+            models.Index(fields=['course', 'is_hidden', '-net_votes', '-id'], name='review_course_score_idx'),
+            models.Index(fields=['course', 'is_hidden', '-rating', '-id'], name='review_course_rating_idx'),
+            models.Index(fields=['prof', 'is_hidden', '-date_created', '-id'], name='review_prof_recent_idx'),
+            models.Index(fields=['prof', 'is_hidden', '-net_votes', '-id'], name='review_prof_score_idx'),
+            models.Index(fields=['prof', 'is_hidden', '-rating', '-id'], name='review_prof_rating_idx'),
+            # Most helpful first: course / professor feeds and the homepage
+            models.Index(fields=['course', 'is_hidden', '-helpfulness', '-id'], name='review_course_helpful_idx'),
+            models.Index(fields=['prof', 'is_hidden', '-helpfulness', '-id'], name='review_prof_helpful_idx'),
+            models.Index(fields=['is_hidden', '-helpfulness', '-id'], name='review_helpful_idx'),
+            # Moderator triage queue: most reported first, then most recently reported
+            models.Index(
+                fields=['-report_count', '-last_reported_at'],
+                name='review_triage_idx',
+                condition=models.Q(report_count__gt=0),
+            ),
+        ]
+
+
+class ReportedReview(Review):
+    """Proxy used for the moderator triage queue in the admin."""
+    class Meta:
+        proxy = True
+        verbose_name = 'Reported review'
+        verbose_name_plural = 'Report triage queue'
 
 
 class ReviewUpvote(models.Model):
@@ -92,4 +142,21 @@ class Report(models.Model):
         unique_together = (('user', 'review'),)
 
     def __str__(self):
-        return f"Report on Review {self.review.id} by {self.user.email}"
\ No newline at end of file
+        return f"Report on Review {self.review.id} by {self.user.email}"
+
+
+class TimelineEntry(models.Model):
+    """A review pushed into a user's personal feed (fan-out on write, see review/timeline.py)."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='timeline')
+    review = models.ForeignKey(Review, on_delete=models.CASCADE, related_name='timeline_entries')
+    # copied from the review so the feed is ordered without joining it
+    created_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = (('user', 'review'),)
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='timeline_user_recent_idx'),
+        ]
+
+    def __str__(self):
+        return f"Timeline entry of Review {self.review_id} for user {self.user_id}"
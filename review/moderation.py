@@ -0,0 +1,44 @@
+"""Report counters and the auto-hide threshold.
+
+`Review.report_count` / `last_reported_at` mirror the Report table so the
+triage queue is a single indexed query, and `Review.is_hidden` lets listings
+drop heavily reported reviews without joining Report. Reviews hidden by a
+moderator (`hidden_by_moderator`) are only unhidden by dismissing them in
+the triage admin, never by their report count dropping.
+"""
+from django.conf import settings
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from core.versioning import bump_review_versions
+from .models import Review
+
+
+def hide_threshold():
+    return getattr(settings, 'REVIEW_REPORT_HIDE_THRESHOLD', 5)
+
+
+def apply_report_delta(review_id, delta):
+    """Adjust a review's report counter by `delta` and re-evaluate its hidden flag."""
+    updates = {'report_count': Greatest(F('report_count') + delta, 0)}
+    if delta > 0:
+        updates['last_reported_at'] = timezone.now()
+    Review.objects.filter(pk=review_id).update(**updates)
+
+    threshold = hide_threshold()
+    review = Review.objects.filter(pk=review_id).values('course_id', 'prof_id').first()
+    if review is None:
+        return
+    changed = Review.objects.filter(pk=review_id, is_hidden=False, report_count__gte=threshold).update(is_hidden=True)
+    changed += Review.objects.filter(
+        pk=review_id, is_hidden=True, hidden_by_moderator=False, report_count__lt=threshold,
+    ).update(is_hidden=False)
+    if changed:
+        # listings and cached search results must pick up the visibility change
+        bump_review_versions(review['course_id'], review['prof_id'])
+
+
+def triage_queue():
+    """Reported reviews, worst offenders first (served by `review_triage_idx`)."""
+    return Review.objects.filter(report_count__gt=0).order_by('-report_count', '-last_reported_at')
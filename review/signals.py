@@ -0,0 +1,76 @@
+# review/signals.py
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from core.versioning import bump_version, bump_review_versions, VIEWER, REVIEW_CONTENT
+from jobs.registry import enqueue
+from .models import Review, Report, ReviewUpvote, Bookmark
+from .moderation import apply_report_delta
+from .votes import refresh_vote_totals
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def bump_review_version(sender, instance, **kwargs):
+    """New, edited or deleted reviews invalidate review-derived caches."""
+    bump_review_versions(instance.course_id, instance.prof_id)
+    # cached review blocks (review/fragments.py) are keyed on this
+    bump_version(REVIEW_CONTENT, instance.pk)
+
+
+@receiver(m2m_changed, sender=Review.tags.through)
+def bump_review_content_on_tags_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    # review.tags.add(...) passes the review; tag.reviews.add(...) passes the review ids
+    review_ids = (pk_set or ()) if reverse else [instance.pk]
+    for review_id in review_ids:
+        bump_version(REVIEW_CONTENT, review_id)
+
+
+@receiver(post_save, sender=Review)
+def push_to_timelines(sender, instance, created, **kwargs):
+    """Fan new reviews out to followers' timelines in the background worker."""
+    if created:
+        enqueue('review.fan_out_review', review_id=instance.pk)
+
+
+def reviews_bulk_created(reviews):
+    """Do what the Review receivers do for rows written with bulk_create (seeding commands).
+
+    bulk_create sends no post_save, so the authors' profile counters, the
+    review versions and the followers' timelines would otherwise stay stale.
+    """
+    from users.counters import recount_user_counters
+
+    for user_id in {review.user_id for review in reviews}:
+        recount_user_counters(user_id)
+    for course_id, prof_id in {(review.course_id, review.prof_id) for review in reviews}:
+        bump_review_versions(course_id, prof_id)
+    for review in reviews:
+        enqueue('review.fan_out_review', review_id=review.pk)
+
+
+@receiver(post_save, sender=Report)
+def count_new_report(sender, instance, created, **kwargs):
+    if created:
+        apply_report_delta(instance.review_id, 1)
+
+
+@receiver(post_delete, sender=Report)
+def count_removed_report(sender, instance, **kwargs):
+    apply_report_delta(instance.review_id, -1)
+
+
+@receiver(post_save, sender=ReviewUpvote)
+@receiver(post_delete, sender=ReviewUpvote)
+def refresh_review_votes(sender, instance, **kwargs):
+    refresh_vote_totals(instance.review_id)
+    # the voter's own vote state is part of what they see
+    bump_version(VIEWER, instance.user_id)
+
+
+@receiver(post_save, sender=Bookmark)
+@receiver(post_delete, sender=Bookmark)
+def bump_viewer_version_on_bookmark(sender, instance, **kwargs):
+    bump_version(VIEWER, instance.user_id)
@@ -0,0 +1,8 @@
+"""Background job handlers for the review app (executed by `manage.py runworker`)."""
+from jobs.registry import task
+from . import timeline
+
+
+@task('review.fan_out_review')
+def fan_out_review(review_id):
+    timeline.fan_out_review(review_id)
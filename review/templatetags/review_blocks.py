@@ -0,0 +1,12 @@
+# review/templatetags/review_blocks.py
+from django import template
+
+from review.fragments import render_review_block
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def review_block(context, review):
+    """Render a review block from the fragment cache with the current viewer's state."""
+    return render_review_block(review, context['request'])
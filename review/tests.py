@@ -1,34 +1,33 @@
 import json
-from django.test import TestCase, Client
+import re
+from unittest import mock
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
+from django.utils import timezone
+from django.contrib import admin
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 
-from core.models import Course, Prof, Section, Campus, RoomMSTeam
-from .models import Review
+from core.models import Course, Prof, Section, Enrollment
+from jobs.worker import run_pending
+from .admin import ReportTriageAdmin
+from .models import Review, Report, ReportedReview, ReviewUpvote, Bookmark, TimelineEntry
+from .moderation import triage_queue
+from .timeline import timeline_review_ids
+from .votes import wilson_lower_bound
 
 User = get_user_model()
 
 class WriteReviewViewTestCase(TestCase):
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpassword123')
-        self.campus = Campus.objects.create(name='Test Campus')
-        self.room = RoomMSTeam.objects.create(name='TestMS', campus=self.campus)
-        self.course = Course.objects.create(code='CS331', name='Software Engineering')
-        self.professor = Prof.objects.create(
-            name='Dr. Test',
-            campus=self.campus,
-            room=self.room,
-            description='A test professor.'
-        )
-        self.section = Section.objects.create(
-            course=self.course,
-            section_number='701',
-            professor=self.professor,
-            campus=self.campus,
-            room=self.room,
-            date_time='Mon 10:00-12:00',
-            location='Main Building'
-        )
+        self.course = Course.objects.create(course_code='CS331', course_name='Software Engineering', credit=3)
+        self.professor = Prof.objects.create(prof_name='Dr. Test', description='A test professor.')
+        self.section = Section.objects.create(course=self.course, section_number='701', room='Main Building')
+        self.section.teachers.add(self.professor)
+        # the form only offers courses and sections the user enrolled in
+        Enrollment.objects.create(user=self.user, section=self.section)
         self.client = Client()
         self.write_review_url = reverse('review:write_review')
 
@@ -46,8 +45,8 @@ class WriteReviewViewTestCase(TestCase):
         self.assertEqual(Review.objects.count(), 0)
         review_data = {
             'course': self.course.id,
-            'section': '701',
-            'professor': self.professor.id,
+            'section': self.section.id,
+            'prof': self.professor.id,
             'rating': 5,
             'header': 'Great course!',
             'body': 'Learned a lot.',
@@ -61,8 +60,8 @@ class WriteReviewViewTestCase(TestCase):
         self.client.login(username='testuser', password='testpassword123')
         invalid_data = {
             'course': self.course.id,
-            'section': '701',
-            'professor': self.professor.id,
+            'section': self.section.id,
+            'prof': self.professor.id,
             'header': 'Incomplete',
             'body': 'Forgot rating.',
         }
@@ -74,15 +73,15 @@ class WriteReviewViewTestCase(TestCase):
         self.client.login(username='testuser', password='testpassword123')
         invalid_data = {
             'course': self.course.id,
-            'section': '999',
-            'professor': self.professor.id,
+            'section': 999,
+            'prof': self.professor.id,
             'rating': 4,
             'header': 'Wrong section',
             'body': 'Testing fake section.',
         }
         response = self.client.post(self.write_review_url, data=invalid_data)
         self.assertEqual(Review.objects.count(), 0)
-        self.assertIn('__all__', response.context['form'].errors)
+        self.assertIn('section', response.context['form'].errors)
 
     def test_incognito_review_is_saved_correctly(self):
         """
@@ -92,8 +91,8 @@ class WriteReviewViewTestCase(TestCase):
         self.client.login(username='testuser', password='testpassword123')
         review_data = {
             'course': self.course.id,
-            'section': '701',
-            'professor': self.professor.id,
+            'section': self.section.id,
+            'prof': self.professor.id,
             'rating': 4,
             'header': 'Anonymous Review',
             'body': 'This is an incognito review.',
@@ -107,58 +106,33 @@ class WriteReviewViewTestCase(TestCase):
 
 class ReviewAPIsTestCase(TestCase):
     def setUp(self):
-        self.campus = Campus.objects.create(name='API Test Campus')
-        self.room = RoomMSTeam.objects.create(name='API Room', campus=self.campus)
-        self.course1 = Course.objects.create(code='CS101', name='Intro to CS')
-        self.course2 = Course.objects.create(code='MA202', name='Calculus II') # Add another course for testing
-        self.prof1 = Prof.objects.create(
-            name='Prof. Turing',
-            campus=self.campus,
-            room=self.room,
-            description='API test professor.'
-        )
-        self.prof2 = Prof.objects.create( # Add another professor
-            name='Prof. Knuth',
-            campus=self.campus,
-            room=self.room,
-            description='Another API test professor.'
-        )
-        self.sec1 = Section.objects.create(
-            course=self.course1,
-            section_number='01',
-            professor=self.prof1,
-            campus=self.campus,
-            room=self.room,
-            date_time='Tue 13:00-15:00',
-            location='CS Building'
-        )
-        # Section 2 for the same course but different professor
-        self.sec2 = Section.objects.create(
-            course=self.course1,
-            section_number='02',
-            professor=self.prof2,
-            campus=self.campus,
-            room=self.room,
-            date_time='Wed 10:00-12:00',
-            location='CS Building'
-        )
+        cache.clear()
+        self.course1 = Course.objects.create(course_code='CS101', course_name='Intro to CS', credit=3)
+        self.course2 = Course.objects.create(course_code='MA202', course_name='Calculus II', credit=3) # Add another course for testing
+        self.prof1 = Prof.objects.create(prof_name='Prof. Turing', description='API test professor.')
+        self.prof2 = Prof.objects.create(prof_name='Prof. Knuth', description='Another API test professor.') # Add another professor
+        self.sec1 = Section.objects.create(course=self.course1, section_number='01', room='CS Building')
+        # Section 1 is co-taught, section 2 has a single professor
+        self.sec1.teachers.add(self.prof1, self.prof2)
+        self.sec2 = Section.objects.create(course=self.course1, section_number='02', room='CS Building')
+        self.sec2.teachers.add(self.prof2)
         self.client = Client()
 
-    def test_search_courses_api(self):
-        url = reverse('review:ajax_search_courses')
-        response = self.client.get(url, {'term': 'CS'})
+    def get_json(self, url, params):
+        response = self.client.get(url, params)
         self.assertEqual(response.status_code, 200)
-        data = response.json()
+        if response.streaming:
+            return json.loads(b''.join(response.streaming_content))
+        return response.json()
+
+    def test_search_courses_api(self):
+        data = self.get_json(reverse('review:ajax_search_courses'), {'term': 'CS'})
         self.assertEqual(len(data['results']), 1)
 
-    def test_get_professors_for_course_api(self):
-        url = reverse('review:ajax_get_professors')
-        params = {'course_id': self.course1.id}
-        response = self.client.get(url, params)
-        self.assertEqual(response.status_code, 200)
-        data = response.json()
+    def test_get_professors_for_section_api(self):
+        data = self.get_json(reverse('review:ajax_get_professors'), {'section_id': self.sec1.id})
         self.assertIn('professors', data)
-        self.assertEqual(len(data['professors']), 2) # Should find 2 professors for CS101
+        self.assertEqual(len(data['professors']), 2) # Should find 2 professors for section 01
         professor_names = {p['name'] for p in data['professors']}
         self.assertIn('Prof. Turing', professor_names)
         self.assertIn('Prof. Knuth', professor_names)
@@ -168,24 +142,231 @@ class ReviewAPIsTestCase(TestCase):
         Test (Sad Path): Ensure the search API returns an empty list
         when no courses match the search term.
         """
-        url = reverse('review:ajax_search_courses')
-        response = self.client.get(url, {'term': 'XYZ'}) # Search for a term that doesn't exist
-        self.assertEqual(response.status_code, 200)
-        data = response.json()
+        data = self.get_json(reverse('review:ajax_search_courses'), {'term': 'XYZ'}) # Search for a term that doesn't exist
         self.assertIn('results', data)
         self.assertEqual(len(data['results']), 0, "Should return an empty list for no matches.")
 
-    def test_get_professors_for_course_api_invalid_id(self):
+    def test_get_professors_for_section_api_invalid_id(self):
         """
         Test (Sad Path): Ensure the professors API returns an empty list
-        when an invalid or non-existent course_id is provided.
+        when an invalid or non-existent section_id is provided.
         """
-        url = reverse('review:ajax_get_professors')
-        params = {'course_id': 999} # Use an ID that doesn't exist
-        response = self.client.get(url, params)
-        self.assertEqual(response.status_code, 200)
-        data = response.json()
+        data = self.get_json(reverse('review:ajax_get_professors'), {'section_id': 999}) # Use an ID that doesn't exist
         self.assertIn('professors', data)
-        self.assertEqual(len(data['professors']), 0, "Should return an empty list for an invalid course ID.")
+        self.assertEqual(len(data['professors']), 0, "Should return an empty list for an invalid section ID.")
+
+
+class ReviewFeedTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.user = User.objects.create_user(username='feeder', email='feeder@example.com', password='pw')
+        self.voter = User.objects.create_user(username='voter', email='voter@example.com', password='pw')
+        self.course = Course.objects.create(course_name='Compilers', course_code='CN340', description='', credit=3)
+        self.prof = Prof.objects.create(prof_name='Dr Parser')
+        base = timezone.now()
+        self.reviews = [
+            Review.objects.create(user=self.user, course=self.course, prof=self.prof, head=f'R{i}', body='b',
+                rating=i % 5 + 1, date_created=base - timezone.timedelta(minutes=i))
+            for i in range(25)
+        ]
+        self.url = reverse('core:course_reviews_api', args=[self.course.id])
+
+    def test_cursor_pages_cover_feed_once(self):
+        self.client.login(username='feeder', password='pw')
+        seen, cursor = [], None
+        while True:
+            params = {'cursor': cursor} if cursor else {}
+            data = self.client.get(self.url, params).json()
+            seen += [int(x) for x in re.findall(r'class="vote-score" data-review-id="(\d+)"', data['reviews_html'])]
+            cursor = data['next_cursor']
+            if not data['has_next']:
+                break
+        self.assertEqual(seen, [r.id for r in self.reviews])
+
+    def test_score_sort_uses_stored_votes(self):
+        top = self.reviews[20]
+        ReviewUpvote.objects.create(user=self.voter, review=top, vote_type=1)
+        top.refresh_from_db()
+        self.assertEqual(top.net_votes, 1)
+        self.client.login(username='voter', password='pw')
+        resp = self.client.get(reverse('core:course_detail', args=['CN340']), {'sort': 'score'})
+        first = resp.context['reviews'][0]
+        self.assertEqual((first.id, first.score, first.user_vote), (top.id, 1, 1))
+        self.assertEqual(len(resp.context['reviews']), 10)
+        self.assertIsNotNone(resp.context['next_cursor'])
+
+    def test_helpfulness_accounts_for_vote_volume(self):
+        self.assertLess(wilson_lower_bound(1, 0), wilson_lower_bound(50, 5))
+        self.assertEqual(wilson_lower_bound(0, 0), 0.0)
+        lone, popular = self.reviews[3], self.reviews[7]
+        ReviewUpvote.objects.create(user=self.voter, review=lone, vote_type=1)
+        ReviewUpvote.objects.create(user=self.voter, review=popular, vote_type=1)
+        ReviewUpvote.objects.create(user=self.user, review=popular, vote_type=1)
+        vote = ReviewUpvote.objects.create(user=self.user, review=lone, vote_type=-1)
+        lone.refresh_from_db()
+        self.assertEqual((lone.upvotes, lone.downvotes, lone.net_votes), (1, 1, 0))
+        vote.delete()
+        lone.refresh_from_db()
+        self.assertEqual(lone.helpfulness, wilson_lower_bound(1, 0))
+        resp = self.client.get(reverse('core:homepage'), {'sort': 'helpful'})
+        self.assertEqual([r.id for r in resp.context['reviews']][:2], [popular.id, lone.id])
+        data = self.client.get(self.url, {'sort': 'helpful', 'page_size': 1}).json()
+        data = self.client.get(self.url, {'sort': 'helpful', 'page_size': 1, 'cursor': data['next_cursor']}).json()
+        self.assertIn('<h4>R3</h4>', data['reviews_html'])
+
+    def test_prof_feed_and_bad_cursor(self):
+        data = self.client.get(reverse('core:prof_reviews_api', args=[self.prof.id]), {'sort': 'rating', 'page_size': 5}).json()
+        self.assertTrue(data['has_next'])
+        self.assertEqual(self.client.get(self.url, {'cursor': 'not-a-cursor'}).status_code, 400)
+
+
+class TimelineTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.author = User.objects.create_user(username='author', email='author@example.com', password='pw')
+        self.fan = User.objects.create_user(username='fan', email='fan@example.com', password='pw')
+        self.student = User.objects.create_user(username='student', email='student@example.com', password='pw')
+        self.stranger = User.objects.create_user(username='stranger', email='stranger@example.com', password='pw')
+        self.course = Course.objects.create(course_name='Graphics', course_code='CN360', description='', credit=3)
+        section = Section.objects.create(course=self.course, section_number='01')
+        Bookmark.objects.create(user=self.fan, course=self.course)
+        Enrollment.objects.create(user=self.student, section=section)
+
+    def post_review(self, head):
+        return Review.objects.create(user=self.author, course=self.course, head=head, body='b', rating=4)
+
+    def test_new_review_is_pushed_to_followers(self):
+        review = self.post_review('Shaders')
+        self.assertFalse(TimelineEntry.objects.exists())
+        run_pending()
+        self.assertEqual(
+            set(TimelineEntry.objects.values_list('user__username', flat=True)), {'fan', 'student'}
+        )
+        self.client.login(username='fan', password='pw')
+        resp = self.client.get(reverse('core:homepage'))
+        self.assertEqual([r.id for r in resp.context['timeline_reviews']], [review.id])
+        self.client.login(username='stranger', password='pw')
+        self.assertEqual(self.client.get(reverse('core:homepage')).context['timeline_reviews'], [])
+
+    @override_settings(REVIEW_TIMELINE_MAX_ENTRIES=3)
+    def test_timeline_is_capped(self):
+        reviews = [self.post_review(f'R{i}') for i in range(5)]
+        run_pending()
+        self.assertEqual(timeline_review_ids(self.fan.id), [r.id for r in reversed(reviews)][:3])
+
+    @override_settings(REVIEW_TIMELINE_MAX_ENTRIES=2)
+    def test_only_recipients_over_the_cap_are_trimmed(self):
+        Bookmark.objects.filter(user=self.fan).delete()
+        self.post_review('R0')
+        run_pending()
+        Bookmark.objects.create(user=self.fan, course=self.course)
+        self.post_review('R1')
+        self.post_review('R2')
+        with mock.patch('review.timeline.trim_timeline') as trim:
+            run_pending()
+        # the student now has three entries, the fan only two
+        trim.assert_called_once_with(self.student.id)
+
+
+class ReviewFragmentTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.author = User.objects.create_user(username='frag', email='frag@example.com', password='pw')
+        self.viewer = User.objects.create_user(username='looker', email='looker@example.com', password='pw')
+        self.course = Course.objects.create(course_name='Embedded', course_code='CN380', description='', credit=3)
+        self.review = Review.objects.create(user=self.author, course=self.course, head='Blinky', body='b', rating=3)
+        self.url = reverse('core:course_reviews_api', args=[self.course.id])
+
+    def test_fragment_is_reused_and_overlaid_per_viewer(self):
+        anon_html = self.client.get(self.url).json()['reviews_html']
+        self.assertIn('Blinky', anon_html)
+        self.assertNotIn('@@slot', anon_html)
+        self.assertNotIn('reportModal', anon_html)
+
+        self.client.login(username='looker', password='pw')
+        self.client.get(self.url)
+        Bookmark.objects.create(user=self.viewer, review=self.review, course=self.course)
+        ReviewUpvote.objects.create(user=self.viewer, review=self.review, vote_type=1)
+        # viewer state changed, the cached fragment did not
+        with self.assertTemplateNotUsed('review/includes/review_block.html'):
+            html = self.client.get(self.url).json()['reviews_html']
+        self.assertIn('bookmark-btn active', html)
+        self.assertIn('upvote-btn btn-success', html)
+        self.assertIn('name="csrfmiddlewaretoken"', html)
+        self.assertNotIn('delete-review-btn', html)
+
+    def test_content_change_rerenders(self):
+        self.client.get(self.url)
+        self.review.head = 'Blinky v2'
+        self.review.save()
+        self.assertIn('Blinky v2', self.client.get(self.url).json()['reviews_html'])
+
+    def test_owner_sees_delete_on_profile(self):
+        others = Review.objects.create(user=self.viewer, course=self.course, head='Theirs', body='b', rating=4)
+        Bookmark.objects.create(user=self.author, review=others, course=self.course)
+        self.client.login(username='frag', password='pw')
+        html = self.client.get(reverse('users:profile')).content.decode()
+        # only the author's own review, not the bookmarked one, offers deletion
+        self.assertIn('Theirs', html)
+        self.assertEqual(re.findall(r'delete-review-btn" data-review-id="(\d+)"', html), [str(self.review.id)])
+        self.assertNotIn('delete-review-btn', self.client.get(self.url).json()['reviews_html'])
+
+    def test_slot_text_inside_a_review_is_not_substituted(self):
+        Review.objects.create(user=self.author, course=self.course, head='Sneaky', body='score @@slot:score@@ here', rating=2)
+        html = self.client.get(self.url).json()['reviews_html']
+        self.assertIn('score @@slot:score@@ here', html)
+
+
+@override_settings(REVIEW_REPORT_HIDE_THRESHOLD=2)
+class ReportTriageTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.author = User.objects.create_user(username='author', email='author@example.com', password='pw')
+        self.reporters = [User.objects.create_user(username=f'rep{i}', email=f'rep{i}@example.com', password='pw') for i in range(2)]
+        course = Course.objects.create(course_name='Ethics', course_code='TU100', description='', credit=3)
+        self.review = Review.objects.create(user=self.author, course=course, head='Spam', body='Spam', rating=1)
+        self.other = Review.objects.create(user=self.author, course=course, head='Fine', body='Fine', rating=5)
+
+    def report(self, user, review):
+        self.client.login(username=user.username, password='pw')
+        return self.client.post(reverse('review:report_review', args=[review.id]), {'comment': 'bad'})
+
+    def test_reports_update_counters_and_hide_at_threshold(self):
+        self.report(self.reporters[0], self.review)
+        self.report(self.reporters[0], self.other)
+        self.review.refresh_from_db()
+        self.assertEqual((self.review.report_count, self.review.is_hidden), (1, False))
+        self.assertIsNotNone(self.review.last_reported_at)
+
+        self.report(self.reporters[1], self.review)
+        self.review.refresh_from_db()
+        self.assertTrue(self.review.is_hidden)
+        self.assertEqual(list(triage_queue()), [self.review, self.other])
+
+        resp = self.client.get(reverse('core:homepage'))
+        self.assertEqual([r.id for r in resp.context['reviews']], [self.other.id])
+
+    def test_dismissing_reports_unhides(self):
+        for user in self.reporters:
+            self.report(user, self.review)
+        Report.objects.filter(review=self.review).first().delete()
+        self.review.refresh_from_db()
+        self.assertEqual((self.review.report_count, self.review.is_hidden), (1, False))
+
+    def test_moderator_hidden_review_stays_hidden_until_dismissed(self):
+        triage = ReportTriageAdmin(ReportedReview, admin.site)
+        self.report(self.reporters[0], self.review)
+        triage.hide_reviews(None, ReportedReview.objects.filter(pk=self.review.pk))
+        # a second report reaches the threshold, withdrawing it must not unhide
+        self.report(self.reporters[1], self.review)
+        Report.objects.filter(review=self.review, user=self.reporters[1]).delete()
+        self.review.refresh_from_db()
+        self.assertEqual((self.review.report_count, self.review.is_hidden), (1, True))
 
-        
\ No newline at end of file
+        triage.dismiss_reports(None, ReportedReview.objects.filter(pk=self.review.pk))
+        self.review.refresh_from_db()
+        self.assertEqual((self.review.report_count, self.review.is_hidden, self.review.hidden_by_moderator), (0, False, False))
@@ -0,0 +1,72 @@
+"""Per-user review timeline (fan-out on write).
+
+When a review is posted, a background job pushes a TimelineEntry to every
+user who bookmarked the course or is enrolled in one of its sections. The
+personal feed is then a single range read on `timeline_user_recent_idx`
+instead of a bookmark/enrollment/review join per request. Each user keeps at
+most REVIEW_TIMELINE_MAX_ENTRIES entries; after each fan-out one grouped
+count finds the recipients over the cap and only those are trimmed.
+"""
+from django.conf import settings
+from django.db.models import Count, Q
+
+from core.models import Enrollment
+from .models import Bookmark, Review, TimelineEntry
+
+
+def max_entries():
+    return getattr(settings, 'REVIEW_TIMELINE_MAX_ENTRIES', 200)
+
+
+def followers_of_course(course_id):
+    """Ids of users who bookmarked the course or are enrolled in one of its sections."""
+    bookmarked = Bookmark.objects.filter(course_id=course_id, review=None).values_list('user_id', flat=True)
+    enrolled = Enrollment.objects.filter(section__course_id=course_id).values_list('user_id', flat=True)
+    return set(bookmarked) | set(enrolled)
+
+
+def trim_timeline(user_id, cap=None):
+    """Drop everything older than the newest `cap` entries of one user."""
+    cap = cap or max_entries()
+    boundary = (TimelineEntry.objects.filter(user_id=user_id)
+                .order_by('-created_at', '-id').values_list('created_at', 'id')[cap:cap + 1])
+    for created_at, pk in boundary:
+        TimelineEntry.objects.filter(user_id=user_id).filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lte=pk)
+        ).delete()
+
+
+def users_over_cap(user_ids, cap=None, chunk_size=500):
+    """Ids among `user_ids` holding more than `cap` timeline entries (one grouped count per chunk)."""
+    cap = cap or max_entries()
+    user_ids = sorted(user_ids)
+    over = []
+    for i in range(0, len(user_ids), chunk_size):
+        over += (TimelineEntry.objects.filter(user_id__in=user_ids[i:i + chunk_size])
+                 .values('user_id').annotate(n=Count('id')).filter(n__gt=cap)
+                 .values_list('user_id', flat=True))
+    return over
+
+
+def fan_out_review(review_id):
+    """Push one review into its followers' timelines; returns the number of entries written."""
+    review = Review.objects.filter(pk=review_id).values('course_id', 'user_id', 'date_created').first()
+    if review is None:
+        return 0
+    recipients = followers_of_course(review['course_id'])
+    recipients.discard(review['user_id'])
+    entries = [
+        TimelineEntry(user_id=user_id, review_id=review_id, created_at=review['date_created'])
+        for user_id in sorted(recipients)
+    ]
+    # ignore_conflicts keeps a retried job from failing on entries it already wrote
+    TimelineEntry.objects.bulk_create(entries, batch_size=500, ignore_conflicts=True)
+    for user_id in users_over_cap(recipients):
+        trim_timeline(user_id)
+    return len(entries)
+
+
+def timeline_review_ids(user_id, limit=10):
+    """Newest review ids from the user's timeline (one indexed range read)."""
+    return list(TimelineEntry.objects.filter(user_id=user_id)
+                .order_by('-created_at', '-id').values_list('review_id', flat=True)[:limit])
@@ -15,9 +15,12 @@ from django.http import JsonResponse
 from django.db import transaction, models
 from django.views.decorators.http import require_POST
 from core.models import Course, Prof, Section
-from stats.models import CourseReviewStat
+from core.enrollment import get_enrollment_profile
+from core.catalog import get_catalog
+from jobs.registry import enqueue
 from datetime import date
-from django.db.models import F
+from django.db.models import F, Q
+from core.streaming import StreamingJsonResponse
 from .forms import ReviewForm, ReportForm, ReviewUpvoteForm
 from .models import Review, Bookmark, Report, ReviewUpvote
 
@@ -32,15 +35,12 @@ def write_review(request):
             review.user = request.user
             review.save()
             form.save_m2m() # จำเป็นถ้าฟอร์มมี ManyToManyFields
-            # Analytics: increment course review stat
+            # Analytics: count the review in the background job worker
             try:
-                today = date.today()
-                stat, created = CourseReviewStat.objects.get_or_create(course=review.course, date=today, defaults={'count': 1})
-                if not created:
-                    CourseReviewStat.objects.filter(pk=stat.pk).update(count=F('count') + 1)
+                enqueue('stats.increment_course_stat', metric='review', course_ids=[review.course_id], day=date.today().isoformat())
             except Exception:
                 pass
-            
+
             messages.success(request, 'ขอบคุณสำหรับรีวิวของคุณ!')
             return redirect('core:homepage')
     else:
@@ -59,9 +59,9 @@ def ajax_search_courses(request):
     term = request.GET.get('term', '')
     courses = Course.objects.filter(
         Q(course_code__icontains=term) | Q(course_name__icontains=term)
-    )[:20]
-    results = [{'id': course.id, 'text': f"{course.course_code} - {course.course_name}"} for course in courses]
-    return JsonResponse({'results': results})
+    ).values_list('id', 'course_code', 'course_name')[:20]
+    results = ({'id': pk, 'text': f"{code} - {name}"} for pk, code, name in courses.iterator())
+    return StreamingJsonResponse(results, request)
 
 
 # --- แก้ไขฟังก์ชันนี้ ---
@@ -74,12 +74,24 @@ def ajax_get_professors(request):
     if not section_id:
         return JsonResponse({'professors': []})
 
-    # 2. ค้นหาอาจารย์จากตาราง Teach ที่เชื่อมกับ Section ID นี้โดยตรง
-    professors = Prof.objects.filter(
-        teach__section_id=section_id
-    ).distinct().order_by('prof_name')
+    # Sections the user enrolled in are answered from the cached enrollment profile
+    if request.user.is_authenticated:
+        profile = get_enrollment_profile(request.user)
+        try:
+            section_pk = int(section_id)
+        except ValueError:
+            return JsonResponse({'professors': []})
+        if section_pk in profile.sections:
+            results = [{'id': pid, 'name': name} for pid, name in profile.profs_for_section(section_pk)]
+            return JsonResponse({'professors': results})
+
+    # 2. ค้นหาอาจารย์ของ Section นี้จาก catalog ในหน่วยความจำ
+    try:
+        professors = get_catalog().teachers_for_section(int(section_id))
+    except ValueError:
+        professors = []
 
-    results = [{'id': p.id, 'name': p.prof_name} for p in professors]
+    results = [{'id': p.id, 'name': p.prof_name} for p in sorted(professors, key=lambda p: p.prof_name)]
     
     return JsonResponse({'professors': results})
 
@@ -89,7 +101,20 @@ def ajax_get_sections(request):
     course_id = request.GET.get('course_id')
     if not course_id:
         return JsonResponse({'sections': []})
-    sections = Section.objects.filter(course_id=course_id).order_by('section_number')
+    # The review form only accepts the user's own sections, so offer exactly those
+    if request.user.is_authenticated:
+        profile = get_enrollment_profile(request.user)
+        try:
+            course_pk = int(course_id)
+        except ValueError:
+            return JsonResponse({'sections': []})
+        if course_pk in profile.course_ids:
+            results = [{'id': sid, 'text': f"Section {number}"} for sid, number in profile.sections_for_course(course_pk)]
+            return JsonResponse({'sections': results})
+    try:
+        sections = get_catalog().sections_for_course(int(course_id))
+    except ValueError:
+        sections = []
     results = [{'id': s.id, 'text': f"Section {s.section_number}"} for s in sections]
     return JsonResponse({'sections': results})
 
@@ -182,9 +207,8 @@ def vote_review(request, review_id):
             # ถ้าเพิ่งสร้าง vote ใหม่
             user_vote_status = vote_type
 
-    # 4. คำนวณคะแนนใหม่โดยใช้ property จาก model ที่เราสร้างไว้
-    # การทำแบบนี้ทำให้ View ไม่ต้องรู้ว่าคะแนนคำนวณอย่างไร
-    new_score = review.vote_score
+    # 4. อ่านคะแนนใหม่จากคอลัมน์ net_votes (signal คำนวณใหม่ทุกครั้งที่ vote เปลี่ยน)
+    new_score = Review.objects.filter(pk=review.pk).values_list('net_votes', flat=True).first()
     
     return JsonResponse({
         'status': 'ok',
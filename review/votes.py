@@ -0,0 +1,64 @@
+"""Denormalized vote totals on Review.
+
+`Review.upvotes` / `downvotes` / `net_votes` mirror the ReviewUpvote table and
+`Review.helpfulness` stores the Wilson score lower bound of the upvote ratio,
+so feeds can sort by score or helpfulness from an index instead of
+aggregating votes per request. Everything is recomputed from the vote table
+after every vote change.
+"""
+import math
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from core.versioning import bump_review_versions
+from users.counters import apply_counter_delta
+from .models import Review, ReviewUpvote
+
+# 95% confidence
+WILSON_Z = 1.96
+
+
+def wilson_lower_bound(upvotes, downvotes, z=WILSON_Z):
+    """Lower bound of the Wilson score interval for the share of upvotes.
+
+    Small samples are pulled towards 0, so one upvote (0.21) ranks below
+    50 up / 5 down (0.80).
+    """
+    n = upvotes + downvotes
+    if n == 0:
+        return 0.0
+    phat = upvotes / n
+    z2 = z * z
+    centre = phat + z2 / (2 * n)
+    margin = z * math.sqrt((phat * (1 - phat) + z2 / (4 * n)) / n)
+    return (centre - margin) / (1 + z2 / n)
+
+
+def refresh_vote_totals(review_id):
+    """Recompute the stored vote totals of one review; returns the new net score.
+
+    The change in net score is also applied to the author's `score_received`.
+    """
+    with transaction.atomic():
+        # lock the review so concurrent votes see each other's totals
+        current = (Review.objects.select_for_update().filter(pk=review_id)
+                   .values_list('net_votes', 'user_id', 'course_id', 'prof_id').first())
+        if current is None:
+            return 0
+        old_net, author_id, course_id, prof_id = current
+        counts = ReviewUpvote.objects.filter(review_id=review_id).aggregate(
+            up=Count('pk', filter=Q(vote_type__gt=0)),
+            down=Count('pk', filter=Q(vote_type__lt=0)),
+        )
+        up, down = counts['up'], counts['down']
+        Review.objects.filter(pk=review_id).update(
+            upvotes=up,
+            downvotes=down,
+            net_votes=up - down,
+            helpfulness=wilson_lower_bound(up, down),
+        )
+        apply_counter_delta(author_id, score_received=up - down - old_net)
+    # scores are shown on every listing of the review
+    bump_review_versions(course_id, prof_id)
+    return up - down
@@ -0,0 +1,61 @@
+"""Distinct active-user counts over arbitrary date windows.
+
+`record_active_user` is called the first time a user is seen on a day and
+folds them into that day's `DailyActiveUserSketch`. `estimate_active_users`
+merges one small sketch per day in the window; `exact_active_users` is the
+COUNT(DISTINCT) fallback over `DailyActiveUser`.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+
+from .hll import HyperLogLog
+from .models import DailyActiveUser, DailyActiveUserSketch
+
+
+def record_active_user(user_id, day):
+    with transaction.atomic():
+        sketch, _ = DailyActiveUserSketch.objects.select_for_update().get_or_create(
+            date=day, defaults={'registers': HyperLogLog().to_bytes()}
+        )
+        hll = HyperLogLog.from_bytes(sketch.registers)
+        hll.add(user_id)
+        sketch.registers = hll.to_bytes()
+        sketch.save(update_fields=['registers'])
+
+
+def build_day_sketch(day):
+    """(Re)build a day's sketch from its DailyActiveUser rows; returns the sketch."""
+    hll = HyperLogLog()
+    for user_id in DailyActiveUser.objects.filter(date=day).values_list('user_id', flat=True).iterator():
+        hll.add(user_id)
+    DailyActiveUserSketch.objects.update_or_create(date=day, defaults={'registers': hll.to_bytes()})
+    return hll
+
+
+def estimate_active_users(start, end, backfill=False):
+    """Approximate number of distinct users active between `start` and `end` (inclusive).
+
+    Days recorded before sketches existed are only counted after running
+    ``manage.py build_dau_sketches`` (or with `backfill`, which builds them here).
+    """
+    merged = HyperLogLog()
+    found = set()
+    for day, registers in DailyActiveUserSketch.objects.filter(date__gte=start, date__lte=end).values_list('date', 'registers'):
+        merged.update(HyperLogLog.from_bytes(registers))
+        found.add(day)
+    if backfill:
+        missing = set(DailyActiveUser.objects.filter(date__gte=start, date__lte=end)
+                      .values_list('date', flat=True).distinct()) - found
+        for day in sorted(missing):
+            merged.update(build_day_sketch(day))
+    return merged.count()
+
+
+def exact_active_users(start, end):
+    return DailyActiveUser.objects.filter(date__gte=start, date__lte=end).values('user_id').distinct().count()
+
+
+def window_start(end, days):
+    """First day of a `days`-long window ending on `end` (e.g. 7 for WAU, 30 for MAU)."""
+    return end - timedelta(days=days - 1)
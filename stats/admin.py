@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import DailyActiveUser, CourseSearchStat, CourseViewStat, CourseReviewStat
+from .models import DailyActiveUser, CourseSearchStat, CourseViewStat, CourseReviewStat, TrendingCourse, CourseStatRollup, ActiveUserRollup, RollupCheckpoint, RetentionCell
 
 @admin.register(DailyActiveUser)
 class DailyActiveUserAdmin(admin.ModelAdmin):
@@ -23,3 +23,32 @@ class CourseReviewStatAdmin(admin.ModelAdmin):
     list_display = ('course', 'date', 'count')
     list_filter = ('date', 'course')
     search_fields = ('course__course_code',)
+
+@admin.register(TrendingCourse)
+class TrendingCourseAdmin(admin.ModelAdmin):
+    list_display = ('rank', 'course', 'score', 'computed_at')
+    ordering = ('rank',)
+
+@admin.register(CourseStatRollup)
+class CourseStatRollupAdmin(admin.ModelAdmin):
+    list_display = ('course', 'period', 'period_start', 'views', 'searches', 'reviews')
+    list_filter = ('period',)
+    date_hierarchy = 'period_start'
+    search_fields = ('course__course_code',)
+    list_select_related = ('course',)
+
+@admin.register(ActiveUserRollup)
+class ActiveUserRollupAdmin(admin.ModelAdmin):
+    list_display = ('period', 'period_start', 'active_users')
+    list_filter = ('period',)
+    date_hierarchy = 'period_start'
+
+@admin.register(RollupCheckpoint)
+class RollupCheckpointAdmin(admin.ModelAdmin):
+    list_display = ('name', 'last_date')
+
+@admin.register(RetentionCell)
+class RetentionCellAdmin(admin.ModelAdmin):
+    list_display = ('cohort_start', 'day_offset', 'cohort_size', 'retained', 'rate', 'computed_at')
+    list_filter = ('day_offset',)
+    date_hierarchy = 'cohort_start'
@@ -0,0 +1,34 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+
+from stats.active_users import build_day_sketch
+from stats.models import DailyActiveUser, DailyActiveUserSketch
+
+
+class Command(BaseCommand):
+    help = 'Build per-day active-user sketches from DailyActiveUser rows (backfill or repair).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, help='First day (YYYY-MM-DD); default oldest DAU row.')
+        parser.add_argument('--end', type=date.fromisoformat, help='Last day (YYYY-MM-DD); default newest DAU row.')
+        parser.add_argument('--rebuild', action='store_true', help='Rebuild days that already have a sketch.')
+
+    def handle(self, *args, **options):
+        bounds = DailyActiveUser.objects.aggregate(first=Min('date'), last=Max('date'))
+        start = options['start'] or bounds['first']
+        end = options['end'] or bounds['last']
+        if not start or not end:
+            self.stdout.write(self.style.WARNING('No DailyActiveUser rows found.'))
+            return
+
+        days = DailyActiveUser.objects.filter(date__gte=start, date__lte=end).values_list('date', flat=True).distinct()
+        if not options['rebuild']:
+            days = days.exclude(date__in=DailyActiveUserSketch.objects.values('date'))
+
+        built = 0
+        for day in days.order_by('date'):
+            build_day_sketch(day)
+            built += 1
+        self.stdout.write(self.style.SUCCESS(f"Built {built} daily sketches between {start} and {end}."))
@@ -0,0 +1,26 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from stats.retention import compute_retention, DEFAULT_OFFSETS, CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the signup-week retention matrix (day-N return rates) from DailyActiveUser in one pass.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--offsets', default=','.join(map(str, DEFAULT_OFFSETS)),
+                            help='Comma separated day offsets (default: 1,7,30).')
+        parser.add_argument('--as-of', type=date.fromisoformat, default=None, help='Last day of data (YYYY-MM-DD); default today.')
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Rows fetched per database round trip.')
+
+    def handle(self, *args, **options):
+        try:
+            offsets = [int(o) for o in options['offsets'].split(',') if o.strip()]
+        except ValueError:
+            raise CommandError('--offsets must be a comma separated list of integers')
+        if not offsets or min(offsets) < 1:
+            raise CommandError('--offsets must contain positive integers')
+
+        written = compute_retention(offsets, as_of=options['as_of'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} retention cells."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from stats.trending import compute_trending
+
+
+class Command(BaseCommand):
+    help = 'Recompute the trending courses ranking from daily search/view stats. Run periodically (e.g. hourly).'
+
+    def handle(self, *args, **options):
+        count = compute_trending()
+        self.stdout.write(self.style.SUCCESS(f"Stored {count} trending courses."))
@@ -0,0 +1,25 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from stats.active_users import estimate_active_users, exact_active_users, window_start
+
+
+class Command(BaseCommand):
+    help = 'Count distinct active users in a window from daily sketches, or exactly with --exact.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--end', type=date.fromisoformat, default=None, help='Last day (YYYY-MM-DD); default today.')
+        parser.add_argument('--days', type=int, default=30, help='Window length in days (7 = WAU, 30 = MAU).')
+        parser.add_argument('--exact', action='store_true', help='Use COUNT(DISTINCT user) over DailyActiveUser instead of sketches.')
+
+    def handle(self, *args, **options):
+        end = options['end'] or date.today()
+        start = window_start(end, options['days'])
+        if options['exact']:
+            count = exact_active_users(start, end)
+            label = 'exact'
+        else:
+            count = estimate_active_users(start, end)
+            label = 'estimated'
+        self.stdout.write(f"{start} .. {end}: {count} active users ({label})")
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from stats.rollups import rollup_stats, compact_daily_stats
+
+
+class Command(BaseCommand):
+    help = 'Fold daily course/DAU stats into weekly and monthly rollups; optionally compact old daily rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rebuild every period whose daily rows are fully retained.')
+        parser.add_argument('--compact', action='store_true', help='Delete daily rows past the retention window after rolling up.')
+        parser.add_argument('--retention-days', type=int, default=None, help='Override STATS_DAILY_RETENTION_DAYS.')
+        parser.add_argument('--dau-retention-days', type=int, default=None, help='Override STATS_DAU_RETENTION_DAYS.')
+
+    def handle(self, *args, **options):
+        written = rollup_stats(full=options['full'])
+        if written is None:
+            self.stdout.write(self.style.WARNING('No daily stats to roll up.'))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {written['course']} course rollups and {written['active_users']} active-user rollups."
+        ))
+
+        if options['compact']:
+            deleted = compact_daily_stats(
+                retention_days=options['retention_days'],
+                dau_retention_days=options['dau_retention_days'],
+            )
+            for table, count in deleted.items():
+                self.stdout.write(f"Compacted {count} rows from {table}.")
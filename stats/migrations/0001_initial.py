@@ -0,0 +1,77 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('core', '0006_create_missing_stat_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseReviewStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'core_coursereviewstat',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='CourseSearchStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'core_coursesearchstat',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='CourseViewStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'core_courseviewstat',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyActiveUser',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+            ],
+            options={
+                'db_table': 'core_dailyactiveuser',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TrendingCourse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveIntegerField()),
+                ('score', models.FloatField()),
+                ('computed_at', models.DateTimeField()),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trending_entries', to='core.course')),
+            ],
+            options={
+                'ordering': ['rank'],
+                'indexes': [models.Index(fields=['rank'], name='stats_trend_rank_cca71e_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_create_missing_stat_tables'),
+        ('stats', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_date', models.DateField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ActiveUserRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'Day'), ('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('active_users', models.IntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('period', 'period_start')},
+            },
+        ),
+        migrations.CreateModel(
+            name='CourseStatRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('views', models.IntegerField(default=0)),
+                ('searches', models.IntegerField(default=0)),
+                ('reviews', models.IntegerField(default=0)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stat_rollups', to='core.course')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['period', 'period_start'], name='stats_cours_period_d1369e_idx')],
+                'unique_together': {('course', 'period', 'period_start')},
+            },
+        ),
+    ]
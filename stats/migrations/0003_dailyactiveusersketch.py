@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stats', '0002_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyActiveUserSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('registers', models.BinaryField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stats', '0003_dailyactiveusersketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RetentionCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cohort_start', models.DateField()),
+                ('day_offset', models.PositiveIntegerField()),
+                ('cohort_size', models.IntegerField()),
+                ('retained', models.IntegerField()),
+                ('computed_at', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ['cohort_start', 'day_offset'],
+                'unique_together': {('cohort_start', 'day_offset')},
+            },
+        ),
+    ]
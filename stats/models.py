@@ -59,3 +59,106 @@ class CourseReviewStat(models.Model):
 
     def __str__(self):
         return f"{self.course.course_code} reviews on {self.date}: {self.count}"
+
+
+class TrendingCourse(models.Model):
+    """Precomputed trending ranking, rebuilt by `stats.trending.compute_trending`."""
+    course = models.ForeignKey('core.Course', on_delete=models.CASCADE, related_name='trending_entries')
+    rank = models.PositiveIntegerField()
+    score = models.FloatField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['rank']
+        indexes = [models.Index(fields=['rank'])]
+
+    def __str__(self):
+        return f"#{self.rank} {self.course.course_code} ({self.score:.2f})"
+
+
+PERIOD_DAY = 'day'
+PERIOD_WEEK = 'week'
+PERIOD_MONTH = 'month'
+
+
+class CourseStatRollup(models.Model):
+    """Weekly / monthly totals of the per-course daily stat tables (see stats/rollups.py)."""
+    PERIOD_CHOICES = [
+        (PERIOD_WEEK, 'Week'),
+        (PERIOD_MONTH, 'Month'),
+    ]
+
+    course = models.ForeignKey('core.Course', on_delete=models.CASCADE, related_name='stat_rollups')
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    views = models.IntegerField(default=0)
+    searches = models.IntegerField(default=0)
+    reviews = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('course', 'period', 'period_start')
+        indexes = [models.Index(fields=['period', 'period_start'])]
+
+    def __str__(self):
+        return f"{self.course.course_code} {self.period} of {self.period_start}"
+
+
+class ActiveUserRollup(models.Model):
+    """Distinct active users per day / week / month (DAU / WAU / MAU)."""
+    PERIOD_CHOICES = [
+        (PERIOD_DAY, 'Day'),
+        (PERIOD_WEEK, 'Week'),
+        (PERIOD_MONTH, 'Month'),
+    ]
+
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    active_users = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('period', 'period_start')
+
+    def __str__(self):
+        return f"{self.period} of {self.period_start}: {self.active_users} active users"
+
+
+class RollupCheckpoint(models.Model):
+    """Last date folded into the rollup tables, so each run only rebuilds open periods."""
+    name = models.CharField(max_length=50, unique=True)
+    last_date = models.DateField()
+
+    def __str__(self):
+        return f"{self.name} rolled up to {self.last_date}"
+
+
+class DailyActiveUserSketch(models.Model):
+    """HyperLogLog sketch of one day's active users (see stats/hll.py)."""
+    date = models.DateField(unique=True)
+    registers = models.BinaryField()
+
+    def __str__(self):
+        return f"Active user sketch for {self.date}"
+
+
+class RetentionCell(models.Model):
+    """One cell of the signup-week retention matrix (see stats/retention.py).
+
+    `retained` of the `cohort_size` users who joined in the week starting
+    `cohort_start` were active exactly `day_offset` days after joining.
+    """
+    cohort_start = models.DateField()
+    day_offset = models.PositiveIntegerField()
+    cohort_size = models.IntegerField()
+    retained = models.IntegerField()
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('cohort_start', 'day_offset')
+        ordering = ['cohort_start', 'day_offset']
+
+    @property
+    def rate(self):
+        return self.retained / self.cohort_size if self.cohort_size else 0.0
+
+    def __str__(self):
+        return f"Week of {self.cohort_start} day {self.day_offset}: {self.retained}/{self.cohort_size}"
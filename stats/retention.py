@@ -0,0 +1,96 @@
+"""Signup-week retention matrix computed in one streaming pass.
+
+Users (ordered by id) and DailyActiveUser rows (ordered by user, date) are
+read with server-side iterators and merge-joined, so only the current user's
+activity bitset is held in memory: bit N is set when the user was active N
+days after joining. Each finished user is folded into per-cohort counters,
+so memory is bounded by the number of cohorts, not users or DAU rows.
+Cohorts that joined before the oldest retained DAU row (see
+`rollups.compact_daily_stats`) keep the cells computed while their activity
+still existed.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from .models import DailyActiveUser, RetentionCell, RollupCheckpoint
+from .rollups import period_start, DAU_COMPACTED, PERIOD_WEEK
+
+DEFAULT_OFFSETS = (1, 7, 30)
+CHUNK_SIZE = 5000
+
+
+def _join_date(value):
+    if timezone.is_aware(value):
+        return timezone.localdate(value)
+    return value.date()
+
+
+def _first_complete_cohort():
+    """Start of the oldest signup week whose activity has not been compacted, or None."""
+    compacted = RollupCheckpoint.objects.filter(name=DAU_COMPACTED).values_list('last_date', flat=True).first()
+    if compacted is None:
+        return None
+    start = period_start(compacted, PERIOD_WEEK)
+    return start if start == compacted else start + timedelta(days=7)
+
+
+def compute_retention(offsets=DEFAULT_OFFSETS, as_of=None, chunk_size=CHUNK_SIZE):
+    """Rebuild `RetentionCell` rows; returns the number of cells written.
+
+    A cell only counts users for whom `join date + offset` is on or before
+    `as_of` (default today), so young cohorts are not penalised for days
+    that have not happened yet. Cohorts older than the retained DAU rows
+    are left as they are.
+    """
+    as_of = as_of or date.today()
+    offsets = sorted(set(offsets))
+    horizon = offsets[-1]
+    # cohort_start -> {offset: [eligible, retained]}
+    matrix = defaultdict(lambda: {d: [0, 0] for d in offsets})
+
+    first_cohort = _first_complete_cohort()
+    users = get_user_model().objects.order_by('pk')
+    activity = DailyActiveUser.objects.order_by('user_id', 'date')
+    stale = RetentionCell.objects.all()
+    if first_cohort is not None:
+        users = users.filter(date_joined__date__gte=first_cohort)
+        activity = activity.filter(date__gte=first_cohort)
+        stale = stale.filter(cohort_start__gte=first_cohort)
+    users = users.values_list('pk', 'date_joined').iterator(chunk_size=chunk_size)
+    activity = activity.values_list('user_id', 'date').iterator(chunk_size=chunk_size)
+    pending = next(activity, None)
+
+    for user_id, joined in users:
+        joined = _join_date(joined)
+        bits = 0
+        # Skip activity of users that no longer exist, then consume this user's rows
+        while pending is not None and pending[0] < user_id:
+            pending = next(activity, None)
+        while pending is not None and pending[0] == user_id:
+            offset = (pending[1] - joined).days
+            if 0 <= offset <= horizon:
+                bits |= 1 << offset
+            pending = next(activity, None)
+
+        cells = matrix[period_start(joined, PERIOD_WEEK)]
+        for d in offsets:
+            if joined + timedelta(days=d) <= as_of:
+                cells[d][0] += 1
+                if bits >> d & 1:
+                    cells[d][1] += 1
+
+    now = timezone.now()
+    rows = [
+        RetentionCell(cohort_start=cohort, day_offset=d, cohort_size=eligible, retained=retained, computed_at=now)
+        for cohort, cells in sorted(matrix.items())
+        for d, (eligible, retained) in cells.items()
+        if eligible
+    ]
+    with transaction.atomic():
+        stale.delete()
+        RetentionCell.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
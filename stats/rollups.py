@@ -0,0 +1,190 @@
+"""Incremental weekly / monthly rollups of the daily stat tables.
+
+`rollup_stats` rebuilds only the periods that are still open since the last
+run (tracked by `RollupCheckpoint`), so each run touches a few weeks of daily
+rows no matter how much history exists. `compact_daily_stats` then deletes
+daily rows older than the retention window, but never rows belonging to a
+period that could still be rebuilt.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Min, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from .models import (
+    ActiveUserRollup, CourseReviewStat, CourseSearchStat, CourseStatRollup, CourseViewStat,
+    DailyActiveUser, RollupCheckpoint, PERIOD_DAY, PERIOD_MONTH, PERIOD_WEEK,
+)
+
+CHECKPOINT_NAME = 'daily_stats'
+# first daily date kept by the last compaction of each table group
+COURSE_COMPACTED = 'daily_stats_compacted'
+DAU_COMPACTED = 'daily_active_users_compacted'
+
+# rollup column -> daily table feeding it
+COURSE_METRICS = (
+    ('views', CourseViewStat),
+    ('searches', CourseSearchStat),
+    ('reviews', CourseReviewStat),
+)
+
+_TRUNC = {PERIOD_WEEK: TruncWeek, PERIOD_MONTH: TruncMonth}
+
+
+def period_start(day, period):
+    """First day of the day / week (Monday) / month containing `day`."""
+    if period == PERIOD_WEEK:
+        return day - timedelta(days=day.weekday())
+    if period == PERIOD_MONTH:
+        return day.replace(day=1)
+    return day
+
+
+def _earliest_course_date():
+    dates = [model.objects.aggregate(d=Min('date'))['d'] for _, model in COURSE_METRICS]
+    dates = [d for d in dates if d]
+    return min(dates) if dates else None
+
+
+def _earliest_dau_date():
+    return DailyActiveUser.objects.aggregate(d=Min('date'))['d']
+
+
+def _next_period_start(start, period):
+    if period == PERIOD_WEEK:
+        return start + timedelta(days=7)
+    if period == PERIOD_MONTH:
+        return (start + timedelta(days=32)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def _full_rebuild_starts(periods, earliest, compacted_name):
+    """Where a full rebuild of each period begins, given the oldest daily row.
+
+    Once compaction has deleted rows, the period containing the first
+    retained day only has part of its days left; it is kept as rolled up
+    and the rebuild begins at the next period.
+    """
+    compacted = RollupCheckpoint.objects.filter(name=compacted_name).values_list('last_date', flat=True).first()
+    retained_from = max(earliest, compacted) if compacted else earliest
+    starts = {}
+    for period in periods:
+        start = period_start(retained_from, period)
+        if compacted and start < retained_from:
+            start = _next_period_start(start, period)
+        starts[period] = start
+    return starts
+
+
+def _rebuild_course_rollups(period, start, until):
+    trunc = _TRUNC[period]
+    totals = defaultdict(lambda: dict.fromkeys([name for name, _ in COURSE_METRICS], 0))
+    for name, model in COURSE_METRICS:
+        rows = (model.objects.filter(date__gte=start, date__lte=until)
+                .annotate(bucket=trunc('date')).values('course_id', 'bucket')
+                .annotate(total=Sum('count')).order_by())
+        for row in rows:
+            totals[(row['course_id'], row['bucket'])][name] = row['total']
+
+    CourseStatRollup.objects.filter(period=period, period_start__gte=start).delete()
+    CourseStatRollup.objects.bulk_create([
+        CourseStatRollup(course_id=course_id, period=period, period_start=bucket, **values)
+        for (course_id, bucket), values in totals.items()
+    ])
+    return len(totals)
+
+
+def _rebuild_active_user_rollups(period, start, until):
+    rows = DailyActiveUser.objects.filter(date__gte=start, date__lte=until)
+    if period == PERIOD_DAY:
+        rows = rows.values(bucket=F('date'))
+    else:
+        rows = rows.annotate(bucket=_TRUNC[period]('date')).values('bucket')
+    rows = rows.annotate(active=Count('user_id', distinct=True)).order_by()
+
+    ActiveUserRollup.objects.filter(period=period, period_start__gte=start).delete()
+    ActiveUserRollup.objects.bulk_create([
+        ActiveUserRollup(period=period, period_start=row['bucket'], active_users=row['active'])
+        for row in rows
+    ])
+    return len(rows)
+
+
+def rollup_stats(until=None, full=False):
+    """Fold daily stat rows into the rollup tables up to `until` (default today).
+
+    Returns a dict of rollup rows written per table, or None when there is no data.
+    """
+    until = until or date.today()
+    checkpoint = RollupCheckpoint.objects.filter(name=CHECKPOINT_NAME).first()
+    if full or checkpoint is None:
+        course_since, dau_since = _earliest_course_date(), _earliest_dau_date()
+        if course_since is None and dau_since is None:
+            return None
+        course_starts = dau_starts = {}
+        if course_since:
+            course_starts = _full_rebuild_starts((PERIOD_WEEK, PERIOD_MONTH), course_since, COURSE_COMPACTED)
+        if dau_since:
+            dau_starts = _full_rebuild_starts((PERIOD_DAY, PERIOD_WEEK, PERIOD_MONTH), dau_since, DAU_COMPACTED)
+    else:
+        since = checkpoint.last_date
+        course_starts = {period: period_start(since, period) for period in (PERIOD_WEEK, PERIOD_MONTH)}
+        dau_starts = {period: period_start(since, period) for period in (PERIOD_DAY, PERIOD_WEEK, PERIOD_MONTH)}
+
+    written = {'course': 0, 'active_users': 0}
+    with transaction.atomic():
+        for period, start in course_starts.items():
+            written['course'] += _rebuild_course_rollups(period, start, until)
+        for period, start in dau_starts.items():
+            written['active_users'] += _rebuild_active_user_rollups(period, start, until)
+        RollupCheckpoint.objects.update_or_create(name=CHECKPOINT_NAME, defaults={'last_date': until})
+    return written
+
+
+def compaction_cutoff(retention_days, today=None):
+    """Daily rows strictly before the returned date may be deleted (None = keep everything)."""
+    if retention_days is None:
+        return None
+    today = today or date.today()
+    checkpoint = RollupCheckpoint.objects.filter(name=CHECKPOINT_NAME).first()
+    if checkpoint is None:
+        # nothing rolled up yet, so nothing is safe to drop
+        return None
+    # The next rollup run rebuilds from the start of the checkpoint's week/month
+    rebuild_from = min(period_start(checkpoint.last_date, p) for p in (PERIOD_WEEK, PERIOD_MONTH))
+    return min(today - timedelta(days=retention_days), rebuild_from)
+
+
+def _mark_compacted(name, cutoff):
+    marker, created = RollupCheckpoint.objects.get_or_create(name=name, defaults={'last_date': cutoff})
+    if not created and marker.last_date < cutoff:
+        marker.last_date = cutoff
+        marker.save(update_fields=['last_date'])
+
+
+def compact_daily_stats(today=None, retention_days=None, dau_retention_days=None):
+    """Delete daily rows already folded into closed rollup periods. Returns deleted counts per table.
+
+    Retention defaults to the STATS_DAILY_RETENTION_DAYS / STATS_DAU_RETENTION_DAYS settings;
+    None keeps the rows forever.
+    """
+    if retention_days is None:
+        retention_days = getattr(settings, 'STATS_DAILY_RETENTION_DAYS', None)
+    if dau_retention_days is None:
+        dau_retention_days = getattr(settings, 'STATS_DAU_RETENTION_DAYS', None)
+
+    deleted = {}
+    with transaction.atomic():
+        cutoff = compaction_cutoff(retention_days, today)
+        if cutoff is not None:
+            for _, model in COURSE_METRICS:
+                deleted[model._meta.db_table] = model.objects.filter(date__lt=cutoff).delete()[0]
+            _mark_compacted(COURSE_COMPACTED, cutoff)
+        cutoff = compaction_cutoff(dau_retention_days, today)
+        if cutoff is not None:
+            deleted[DailyActiveUser._meta.db_table] = DailyActiveUser.objects.filter(date__lt=cutoff).delete()[0]
+            _mark_compacted(DAU_COMPACTED, cutoff)
+    return deleted
@@ -0,0 +1,51 @@
+"""Background job handlers for the stats app (executed by `manage.py runworker`)."""
+from datetime import date
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from jobs.registry import task
+from .models import CourseSearchStat, CourseViewStat, CourseReviewStat
+from . import active_users, rollups, trending
+
+COURSE_STAT_MODELS = {
+    'search': CourseSearchStat,
+    'view': CourseViewStat,
+    'review': CourseReviewStat,
+}
+
+
+def _increment(model, course_id, day, amount):
+    if model.objects.filter(course_id=course_id, date=day).update(count=F('count') + amount):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(course_id=course_id, date=day, count=amount)
+    except IntegrityError:
+        # another worker created today's row first
+        model.objects.filter(course_id=course_id, date=day).update(count=F('count') + amount)
+
+
+@task('stats.increment_course_stat')
+def increment_course_stat(metric, course_ids, day):
+    """Add one to the daily `metric` ('search', 'view' or 'review') counter of each course."""
+    model = COURSE_STAT_MODELS[metric]
+    day = date.fromisoformat(day)
+    for course_id in course_ids:
+        _increment(model, course_id, day, 1)
+
+
+@task('stats.record_active_user')
+def record_active_user(user_id, day):
+    active_users.record_active_user(user_id, date.fromisoformat(day))
+
+
+@task('stats.compute_trending')
+def compute_trending():
+    trending.compute_trending()
+
+
+@task('stats.rollup_stats')
+def rollup_stats():
+    rollups.rollup_stats()
+    rollups.compact_daily_stats()
@@ -0,0 +1,235 @@
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.utils import timezone
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from core.models import Course
+from jobs.worker import run_pending
+from .models import (
+    CourseSearchStat, CourseViewStat, CourseReviewStat, DailyActiveUser, TrendingCourse,
+    CourseStatRollup, ActiveUserRollup, DailyActiveUserSketch, RetentionCell,
+)
+from .rollups import rollup_stats, compact_daily_stats
+from .timeseries import bucket_count, bucket_starts, course_timeseries
+from .hll import HyperLogLog
+from .retention import compute_retention
+from .active_users import estimate_active_users, exact_active_users, record_active_user
+from .trending import compute_trending, get_trending
+
+
+class TrendingCoursesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.today = date.today()
+        self.fresh = Course.objects.create(course_name='Fresh', course_code='FR101', credit=3)
+        self.stale = Course.objects.create(course_name='Stale', course_code='ST101', credit=3)
+        # Same raw volume, but the stale course's activity is ten days old
+        CourseViewStat.objects.create(course=self.fresh, date=self.today, count=10)
+        CourseViewStat.objects.create(course=self.stale, date=self.today - timedelta(days=10), count=10)
+        CourseSearchStat.objects.create(course=self.stale, date=self.today - timedelta(days=10), count=2)
+
+    def test_compute_trending_ranks_by_decayed_score(self):
+        self.assertEqual(compute_trending(self.today), 2)
+        ranking = list(TrendingCourse.objects.values_list('course_id', flat=True))
+        self.assertEqual(ranking, [self.fresh.id, self.stale.id])
+
+    def test_trending_api_serves_stored_ranking(self):
+        self.assertEqual(get_trending(), [])
+        compute_trending(self.today)
+        resp = Client().get(reverse('stats:trending_api'), {'limit': 1})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([r['course_code'] for r in resp.json()['results']], ['FR101'])
+
+    @override_settings(TRENDING_SIZE=1)
+    def test_limit_is_capped_at_stored_size(self):
+        compute_trending(self.today)
+        resp = Client().get(reverse('stats:trending_api'), {'limit': 50})
+        self.assertEqual([r['course_code'] for r in resp.json()['results']], ['FR101'])
+        self.assertEqual(get_trending(limit=50), get_trending(limit=1))
+
+    def test_recompute_replaces_cached_ranking(self):
+        compute_trending(self.today)
+        self.assertEqual(get_trending()[0]['course_code'], 'FR101')
+        CourseViewStat.objects.create(course=self.stale, date=self.today, count=100)
+        compute_trending(self.today)
+        self.assertEqual(get_trending()[0]['course_code'], 'ST101')
+
+    def test_homepage_shows_trending_widget(self):
+        compute_trending(self.today)
+        resp = Client().get(reverse('core:homepage'))
+        self.assertContains(resp, 'Trending Courses')
+        self.assertEqual(resp.context['trending_courses'][0]['course_id'], self.fresh.id)
+
+
+class RollupStatsTest(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(course_name='Rollup', course_code='RU101', credit=3)
+        User = get_user_model()
+        self.users = [User.objects.create_user(username=f'u{i}', email=f'u{i}@example.com', password='x') for i in range(3)]
+        # 2025-01-06 is a Monday: two full weeks of January activity
+        self.start = date(2025, 1, 6)
+        for offset in range(14):
+            day = self.start + timedelta(days=offset)
+            CourseViewStat.objects.create(course=self.course, date=day, count=2)
+            DailyActiveUser.objects.create(user=self.users[offset % 3], date=day)
+        CourseReviewStat.objects.create(course=self.course, date=self.start, count=1)
+
+    def test_rollup_builds_weekly_and_monthly_totals(self):
+        rollup_stats(until=date(2025, 1, 31))
+        weeks = CourseStatRollup.objects.filter(period='week').order_by('period_start')
+        self.assertEqual([(w.period_start, w.views) for w in weeks],
+                         [(self.start, 14), (self.start + timedelta(days=7), 14)])
+        month = CourseStatRollup.objects.get(period='month', period_start=date(2025, 1, 1))
+        self.assertEqual((month.views, month.searches, month.reviews), (28, 0, 1))
+        self.assertEqual(ActiveUserRollup.objects.get(period='month', period_start=date(2025, 1, 1)).active_users, 3)
+        self.assertEqual(ActiveUserRollup.objects.filter(period='day').count(), 14)
+
+    def test_incremental_rollup_and_compaction_keep_totals(self):
+        rollup_stats(until=date(2025, 1, 31))
+        rollup_stats(until=date(2025, 3, 5))
+        deleted = compact_daily_stats(today=date(2025, 3, 5), retention_days=30, dau_retention_days=30)
+        self.assertEqual(deleted['core_courseviewstat'], 14)
+        self.assertFalse(CourseViewStat.objects.exists())
+        # Rolling up again must not lose the compacted January totals
+        rollup_stats(until=date(2025, 3, 6))
+        month = CourseStatRollup.objects.get(period='month', period_start=date(2025, 1, 1))
+        self.assertEqual(month.views, 28)
+
+    def test_full_rebuild_after_compaction_keeps_partly_compacted_periods(self):
+        rollup_stats(until=date(2025, 2, 20))
+        # keeps daily rows from 2025-01-14 on: the week of the 13th and January are only partly retained
+        compact_daily_stats(today=date(2025, 2, 14), retention_days=31, dau_retention_days=31)
+        self.assertEqual(CourseViewStat.objects.count(), 6)
+        rollup_stats(until=date(2025, 2, 20), full=True)
+        month = CourseStatRollup.objects.get(period='month', period_start=date(2025, 1, 1))
+        self.assertEqual((month.views, month.reviews), (28, 1))
+        week = CourseStatRollup.objects.get(period='week', period_start=self.start + timedelta(days=7))
+        self.assertEqual(week.views, 14)
+        self.assertEqual(ActiveUserRollup.objects.get(period='month', period_start=date(2025, 1, 1)).active_users, 3)
+        self.assertEqual(ActiveUserRollup.objects.filter(period='day').count(), 14)
+
+    def test_compaction_requires_rollup(self):
+        self.assertEqual(compact_daily_stats(today=date(2025, 6, 1), retention_days=1, dau_retention_days=1), {})
+        self.assertEqual(CourseViewStat.objects.count(), 14)
+
+
+class CourseTimeseriesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.course = Course.objects.create(course_name='Series', course_code='TS101', credit=3)
+        # Mondays 2025-01-06 .. 2025-01-19, 3 views per day; nothing in the week of the 20th
+        for offset in range(14):
+            CourseViewStat.objects.create(course=self.course, date=date(2025, 1, 6) + timedelta(days=offset), count=3)
+        CourseSearchStat.objects.create(course=self.course, date=date(2025, 1, 27), count=5)
+
+    def test_weekly_buckets_fill_gaps(self):
+        data = course_timeseries([self.course.id], date(2025, 1, 8), date(2025, 1, 30), 'week')
+        self.assertEqual(data['buckets'], ['2025-01-06', '2025-01-13', '2025-01-20', '2025-01-27'])
+        series = data['series'][self.course.id]
+        self.assertEqual(series['views'], [21, 21, 0, 0])
+        self.assertEqual(series['searches'], [0, 0, 0, 5])
+
+    def test_rollups_and_daily_rows_agree(self):
+        expected = course_timeseries([self.course.id], date(2025, 1, 1), date(2025, 2, 28), 'month')
+        rollup_stats(until=date(2025, 2, 10))
+        compact_daily_stats(today=date(2025, 2, 10), retention_days=1, dau_retention_days=1)
+        self.assertFalse(CourseViewStat.objects.exists())
+        self.assertEqual(course_timeseries([self.course.id], date(2025, 1, 1), date(2025, 2, 28), 'month'), expected)
+
+    def test_api_validates_and_returns_columns(self):
+        url = reverse('stats:course_timeseries_api')
+        client = Client()
+        self.assertEqual(client.get(url, {'course_ids': 'x'}).status_code, 400)
+        resp = client.get(url, {'course_ids': str(self.course.id), 'start': '2025-01-06', 'end': '2025-01-07'})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()['series'][str(self.course.id)]['views'], [3, 3])
+
+    def test_bucket_count_matches_bucket_starts(self):
+        for bucket in ('day', 'week', 'month'):
+            for start, end in [(date(2025, 1, 8), date(2025, 3, 2)), (date(2024, 12, 31), date(2025, 1, 1))]:
+                self.assertEqual(bucket_count(start, end, bucket), len(bucket_starts(start, end, bucket)))
+
+    def test_api_rejects_huge_and_overflowing_ranges(self):
+        url = reverse('stats:course_timeseries_api')
+        client = Client()
+        params = {'course_ids': str(self.course.id), 'bucket': 'day', 'start': '0001-01-01', 'end': '9999-12-31'}
+        with mock.patch('stats.timeseries.bucket_starts') as starts:
+            self.assertEqual(client.get(url, params).status_code, 400)
+        starts.assert_not_called()
+        resp = client.get(url, dict(params, bucket='month', start='9999-01-01'))
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.json()['error'], 'end is out of range')
+
+
+class ActiveUserSketchTest(TestCase):
+    def test_hyperloglog_estimate_and_merge(self):
+        a, b = HyperLogLog(), HyperLogLog()
+        for i in range(6000):
+            a.add(i)
+        for i in range(4000, 10000):
+            b.add(i)
+        self.assertAlmostEqual(a.count(), 6000, delta=6000 * 0.05)
+        merged = HyperLogLog.from_bytes(a.to_bytes()).update(b)
+        self.assertAlmostEqual(merged.count(), 10000, delta=10000 * 0.05)
+
+    def test_window_estimate_merges_daily_sketches(self):
+        User = get_user_model()
+        users = [User.objects.create_user(username=f's{i}', email=f's{i}@example.com', password='x') for i in range(5)]
+        start = date(2025, 3, 1)
+        for offset in range(7):
+            day = start + timedelta(days=offset)
+            for user in users[offset % 2:]:
+                DailyActiveUser.objects.create(user=user, date=day)
+                record_active_user(user.pk, day)
+        self.assertEqual(DailyActiveUserSketch.objects.count(), 7)
+        end = start + timedelta(days=6)
+        self.assertEqual(exact_active_users(start, end), 5)
+        self.assertEqual(estimate_active_users(start, end), 5)
+
+    def test_middleware_records_sketch(self):
+        User = get_user_model()
+        User.objects.create_user(username='sketch', email='sketch@example.com', password='pw')
+        client = Client()
+        client.login(username='sketch', password='pw')
+        client.get(reverse('core:homepage'))
+        client.get(reverse('core:homepage'))
+        run_pending()
+        self.assertEqual(estimate_active_users(date.today(), date.today()), 1)
+
+
+class RetentionMatrixTest(TestCase):
+    def test_compute_retention_by_signup_week(self):
+        User = get_user_model()
+        joined = timezone.make_aware(datetime(2025, 1, 6, 12, 0))
+        users = [User.objects.create_user(username=f'r{i}', email=f'r{i}@example.com', password='x', date_joined=joined) for i in range(4)]
+        day0 = date(2025, 1, 6)
+        # two users come back on day 1, one of them also on day 7
+        DailyActiveUser.objects.create(user=users[0], date=day0 + timedelta(days=1))
+        DailyActiveUser.objects.create(user=users[1], date=day0 + timedelta(days=1))
+        DailyActiveUser.objects.create(user=users[1], date=day0 + timedelta(days=7))
+
+        # as of day 10 the day-30 column is not observable yet
+        self.assertEqual(compute_retention(as_of=day0 + timedelta(days=10)), 2)
+        cells = {c.day_offset: (c.cohort_size, c.retained) for c in RetentionCell.objects.filter(cohort_start=day0)}
+        self.assertEqual(cells, {1: (4, 2), 7: (4, 1)})
+
+    def test_compacted_cohorts_keep_their_cells(self):
+        User = get_user_model()
+        old = User.objects.create_user(username='old', email='old@example.com', password='x',
+                                       date_joined=timezone.make_aware(datetime(2025, 1, 6, 12, 0)))
+        new = User.objects.create_user(username='new', email='new@example.com', password='x',
+                                       date_joined=timezone.make_aware(datetime(2025, 3, 3, 12, 0)))
+        DailyActiveUser.objects.create(user=old, date=date(2025, 1, 7))
+        DailyActiveUser.objects.create(user=new, date=date(2025, 3, 4))
+        compute_retention(offsets=(1,), as_of=date(2025, 3, 10))
+        rollup_stats(until=date(2025, 3, 10))
+        compact_daily_stats(today=date(2025, 3, 10), retention_days=None, dau_retention_days=20)
+        self.assertFalse(DailyActiveUser.objects.filter(user=old).exists())
+
+        self.assertEqual(compute_retention(offsets=(1,), as_of=date(2025, 3, 10)), 1)
+        cells = {c.cohort_start: (c.cohort_size, c.retained) for c in RetentionCell.objects.all()}
+        self.assertEqual(cells, {date(2025, 1, 6): (1, 1), date(2025, 3, 3): (1, 1)})
@@ -0,0 +1,122 @@
+"""Per-course views / searches / reviews time series, downsampled on the server.
+
+Closed weeks and months are read from `CourseStatRollup`; anything the rollup
+job has not folded yet (and every day-sized bucket) comes from the daily
+tables with one grouped query per metric. Buckets are calendar-aligned, so the
+requested range is widened to whole days / weeks / months.
+"""
+import hashlib
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from .models import CourseStatRollup, RollupCheckpoint, PERIOD_DAY, PERIOD_MONTH, PERIOD_WEEK
+from .rollups import CHECKPOINT_NAME, COURSE_METRICS, period_start
+
+BUCKETS = (PERIOD_DAY, PERIOD_WEEK, PERIOD_MONTH)
+METRICS = [name for name, _ in COURSE_METRICS]
+MAX_BUCKETS = 1000
+
+# Ranges that include today keep changing; closed ranges only change on compaction
+OPEN_RANGE_TIMEOUT = 60 * 5
+CLOSED_RANGE_TIMEOUT = 60 * 60 * 24
+
+_TRUNC = {PERIOD_WEEK: TruncWeek, PERIOD_MONTH: TruncMonth}
+
+
+def _next_bucket(day, bucket):
+    if bucket == PERIOD_DAY:
+        return day + timedelta(days=1)
+    if bucket == PERIOD_WEEK:
+        return day + timedelta(days=7)
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def bucket_count(start, end, bucket):
+    """Number of buckets `bucket_starts` would return, computed without building them."""
+    first = period_start(start, bucket)
+    if end < first:
+        return 0
+    if bucket == PERIOD_DAY:
+        return (end - first).days + 1
+    if bucket == PERIOD_WEEK:
+        return (end - first).days // 7 + 1
+    return (end.year - first.year) * 12 + end.month - first.month + 1
+
+
+def bucket_starts(start, end, bucket):
+    """Calendar-aligned bucket start dates covering [start, end]."""
+    starts = []
+    current = period_start(start, bucket)
+    while current <= end:
+        starts.append(current)
+        current = _next_bucket(current, bucket)
+    return starts
+
+
+def _daily_totals(course_ids, start, end, bucket):
+    """{(metric, course_id, bucket_start): total} from the daily tables, one query per metric."""
+    totals = {}
+    for name, model in COURSE_METRICS:
+        rows = model.objects.filter(course_id__in=course_ids, date__gte=start, date__lte=end)
+        if bucket == PERIOD_DAY:
+            rows = rows.values_list('course_id', 'date')
+        else:
+            rows = rows.annotate(bucket=_TRUNC[bucket]('date')).values_list('course_id', 'bucket')
+        for course_id, day, total in rows.annotate(total=Sum('count')).order_by():
+            totals[(name, course_id, day)] = total
+    return totals
+
+
+def _rollup_totals(course_ids, start, end, bucket):
+    totals = {}
+    rows = CourseStatRollup.objects.filter(
+        course_id__in=course_ids, period=bucket, period_start__gte=start, period_start__lt=end,
+    ).values_list('course_id', 'period_start', *METRICS)
+    for course_id, day, *values in rows:
+        for name, value in zip(METRICS, values):
+            totals[(name, course_id, day)] = value
+    return totals
+
+
+def course_timeseries(course_ids, start, end, bucket):
+    """Return column-oriented series: {'buckets': [...], 'series': {course_id: {metric: [...]}}}."""
+    course_ids = sorted(set(course_ids))
+    starts = bucket_starts(start, end, bucket)
+    first = starts[0]
+    last = _next_bucket(starts[-1], bucket) - timedelta(days=1)
+
+    totals = {}
+    daily_from = first
+    if bucket != PERIOD_DAY:
+        checkpoint = RollupCheckpoint.objects.filter(name=CHECKPOINT_NAME).first()
+        if checkpoint:
+            # Periods starting before the checkpoint's own period are closed and fully rolled up
+            daily_from = max(first, period_start(checkpoint.last_date, bucket))
+            if daily_from > first:
+                totals.update(_rollup_totals(course_ids, first, daily_from, bucket))
+    if daily_from <= last:
+        totals.update(_daily_totals(course_ids, daily_from, last, bucket))
+
+    return {
+        'bucket': bucket,
+        'buckets': [d.isoformat() for d in starts],
+        'series': {
+            course_id: {name: [totals.get((name, course_id, d), 0) for d in starts] for name in METRICS}
+            for course_id in course_ids
+        },
+    }
+
+
+def cached_course_timeseries(course_ids, start, end, bucket):
+    course_ids = sorted(set(course_ids))
+    ids_digest = hashlib.md5(','.join(map(str, course_ids)).encode()).hexdigest()
+    key = f'timeseries:{bucket}:{start.isoformat()}:{end.isoformat()}:{ids_digest}'
+    result = cache.get(key)
+    if result is None:
+        result = course_timeseries(course_ids, start, end, bucket)
+        timeout = OPEN_RANGE_TIMEOUT if end >= date.today() else CLOSED_RANGE_TIMEOUT
+        cache.set(key, result, timeout)
+    return result
@@ -0,0 +1,84 @@
+"""Trending courses computed from the daily search/view stat tables.
+
+`compute_trending` is run periodically (``manage.py compute_trending``) and
+stores the ranked list in `TrendingCourse`; request handlers only ever call
+`get_trending`, which reads that table through the cache.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from core.versioning import get_version, bump_version, CATALOG
+from .models import CourseSearchStat, CourseViewStat, TrendingCourse
+
+TRENDING = 'trending'
+
+# A search is a stronger signal of intent than a page view
+SEARCH_WEIGHT = 2.0
+VIEW_WEIGHT = 1.0
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def compute_trending(today=None):
+    """Recompute the time-decayed popularity ranking and store it. Returns the number of rows written."""
+    today = today or date.today()
+    window_days = _setting('TRENDING_WINDOW_DAYS', 14)
+    half_life = _setting('TRENDING_HALF_LIFE_DAYS', 3)
+    size = trending_size()
+    since = today - timedelta(days=window_days)
+
+    scores = defaultdict(float)
+    for model, weight in ((CourseSearchStat, SEARCH_WEIGHT), (CourseViewStat, VIEW_WEIGHT)):
+        rows = model.objects.filter(date__gt=since, date__lte=today).values_list('course_id', 'date', 'count')
+        for course_id, day, count in rows.iterator():
+            age = (today - day).days
+            scores[course_id] += weight * count * 0.5 ** (age / half_life)
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:size]
+    now = timezone.now()
+    with transaction.atomic():
+        TrendingCourse.objects.all().delete()
+        TrendingCourse.objects.bulk_create([
+            TrendingCourse(course_id=course_id, rank=rank, score=score, computed_at=now)
+            for rank, (course_id, score) in enumerate(ranked, start=1)
+        ])
+    bump_version(TRENDING)
+    return len(ranked)
+
+
+def trending_size():
+    """Number of courses `compute_trending` stores; no request can ask for more."""
+    return _setting('TRENDING_SIZE', 20)
+
+
+def get_trending(limit=10):
+    """Return the stored ranking as a list of dicts, served from cache.
+
+    Entries are keyed on the trending version, which `compute_trending` bumps
+    in the shared cache, so they never need to expire on their own.
+    """
+    limit = min(limit, trending_size())
+    # course names come from the catalog, so a catalog edit also invalidates the entry
+    key = f'trending:{get_version(TRENDING)}:{get_version(CATALOG)}:{limit}'
+    result = cache.get(key)
+    if result is None:
+        entries = TrendingCourse.objects.select_related('course').order_by('rank')[:limit]
+        result = [
+            {
+                'rank': t.rank,
+                'course_id': t.course_id,
+                'course_code': t.course.course_code,
+                'course_name': t.course.course_name,
+                'score': round(t.score, 2),
+            }
+            for t in entries
+        ]
+        cache.set(key, result, None)
+    return result
@@ -0,0 +1,10 @@
+# stats/urls.py
+from django.urls import path
+from . import views
+
+app_name = 'stats'
+
+urlpatterns = [
+    path('api/trending/', views.trending_api, name='trending_api'),
+    path('api/courses/timeseries/', views.course_timeseries_api, name='course_timeseries_api'),
+]
@@ -0,0 +1,45 @@
+from datetime import date
+
+from django.http import JsonResponse
+
+from .timeseries import BUCKETS, MAX_BUCKETS, bucket_count, cached_course_timeseries
+from .trending import get_trending, trending_size
+
+
+def trending_api(request):
+    """Return the precomputed trending courses. Query params: limit (default 10, max TRENDING_SIZE)."""
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), trending_size())
+    except ValueError:
+        limit = 10
+    return JsonResponse({'results': get_trending(limit)})
+
+
+def course_timeseries_api(request):
+    """Downsampled per-course stats for charts.
+
+    Query params: course_ids (comma separated, max 50), start / end (YYYY-MM-DD),
+    bucket (day, week or month; default day).
+    """
+    try:
+        course_ids = [int(c) for c in request.GET.get('course_ids', '').split(',') if c.strip()]
+        start = date.fromisoformat(request.GET.get('start', ''))
+        end = date.fromisoformat(request.GET.get('end', ''))
+    except ValueError:
+        return JsonResponse({'error': 'course_ids, start and end are required'}, status=400)
+
+    bucket = request.GET.get('bucket', 'day')
+    if bucket not in BUCKETS:
+        return JsonResponse({'error': f"bucket must be one of {', '.join(BUCKETS)}"}, status=400)
+    if not course_ids or len(course_ids) > 50:
+        return JsonResponse({'error': 'Between 1 and 50 course_ids are required'}, status=400)
+    if end < start:
+        return JsonResponse({'error': 'end must not be before start'}, status=400)
+    if bucket_count(start, end, bucket) > MAX_BUCKETS:
+        return JsonResponse({'error': f'Range too large for {bucket} buckets; use a larger bucket'}, status=400)
+
+    try:
+        return JsonResponse(cached_course_timeseries(course_ids, start, end, bucket))
+    except OverflowError:
+        # the last bucket would end after 9999-12-31
+        return JsonResponse({'error': 'end is out of range'}, status=400)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,6 +44,7 @@ INSTALLED_APPS = [
     'stats',
     'users',
     'planner',
+    'jobs',
 ]
 
 MIDDLEWARE = [
@@ -87,6 +89,25 @@ DATABASES = {
 }
 
 
+# Cache
+# Version counters (core/versioning.py) and everything cached against them must be
+# shared by all web and worker processes. The default is a file cache in the project
+# directory; point DJANGO_CACHE_BACKEND / DJANGO_CACHE_LOCATION at a server cache
+# (e.g. django.core.cache.backends.redis.RedisCache, redis://127.0.0.1:6379) in
+# production. The test runner swaps in a memory cache (studyPlan/test_runner.py).
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("DJANGO_CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": os.environ.get("DJANGO_CACHE_LOCATION", str(BASE_DIR / ".django_cache")),
+    }
+}
+if CACHES["default"]["BACKEND"].endswith(".FileBasedCache"):
+    CACHES["default"]["OPTIONS"] = {"MAX_ENTRIES": 20000}
+
+TEST_RUNNER = "studyPlan.test_runner.LocalCacheTestRunner"
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -123,6 +144,19 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# `collectstatic` writes content-hashed copies plus staticfiles.json here (see core/storage.py);
+# `compress_static` then adds .gz siblings that core/static_serving.py serves when accepted.
+STATIC_ROOT = BASE_DIR / "staticfiles"
+# Built Tailwind CSS (`tailwindtheme/static`) is collected when present
+STATICFILES_DIRS = [path for path in [BASE_DIR / "tailwindtheme" / "static"] if path.exists()]
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "core.storage.ManifestStorage"},
+}
+# Cache lifetime for hashed (immutable) static files; unhashed names get STATIC_SHORT_MAX_AGE
+STATIC_MAX_AGE = 60 * 60 * 24 * 365
+STATIC_SHORT_MAX_AGE = 60 * 5
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -132,3 +166,38 @@ AUTH_USER_MODEL = 'users.User'
 
 # Redirect login-required decorators to the users app login view
 LOGIN_URL = '/users/login/'
+
+# Trending courses (see stats/trending.py): days of stats considered, score half-life, list size
+TRENDING_WINDOW_DAYS = 14
+TRENDING_HALF_LIFE_DAYS = 3
+TRENDING_SIZE = 20
+
+# Stats retention (see stats/rollups.py): daily rows older than this many days are
+# deleted by `rollup_stats --compact` once folded into the weekly/monthly rollups.
+# None keeps daily rows forever. DAU rows are kept longer for cohort analysis.
+STATS_DAILY_RETENTION_DAYS = 180
+STATS_DAU_RETENTION_DAYS = 400
+
+# Background jobs (see jobs/worker.py, run with `manage.py runworker`)
+JOBS_BATCH_SIZE = 20
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_BACKOFF_SECONDS = 30
+JOBS_LOCK_TIMEOUT_SECONDS = 600
+# Done / failed jobs are deleted this many days after they finished (None keeps them)
+JOBS_RETENTION_DAYS = 14
+# Recurring jobs: task name -> interval in seconds
+JOBS_PERIODIC = {
+    'stats.compute_trending': 60 * 60,
+    'stats.rollup_stats': 60 * 60 * 24,
+    'core.prune_catalog_changes': 60 * 60 * 24,
+    'jobs.prune_jobs': 60 * 60 * 24,
+}
+
+# Reviews with at least this many reports are hidden from public listings (see review/moderation.py)
+REVIEW_REPORT_HIDE_THRESHOLD = 5
+
+# Catalog change log (see core/catalog_sync.py): clients older than this must reload the snapshot
+CATALOG_CHANGELOG_RETENTION_DAYS = 30
+
+# Personal review timeline (see review/timeline.py): entries kept per user
+REVIEW_TIMELINE_MAX_ENTRIES = 200
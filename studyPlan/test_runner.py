@@ -0,0 +1,27 @@
+"""Test runner that keeps tests off the shared cache configured in settings."""
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+TEST_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+
+class LocalCacheTestRunner(DiscoverRunner):
+    """Run the suite against a per-process memory cache.
+
+    Tests call `cache.clear()` freely; against the shared file or Redis cache
+    that would wipe the development server's cache and let runs leak entries
+    into each other.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._cache_override = override_settings(CACHES=TEST_CACHES)
+        self._cache_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._cache_override.disable()
+        super().teardown_test_environment(**kwargs)
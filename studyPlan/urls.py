@@ -15,8 +15,11 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
+
+from core.static_serving import serve_static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -24,4 +27,10 @@ urlpatterns = [
     path('review/', include('review.urls', namespace='review')), # ตัวอย่างแอปอื่น
     path('users/', include('users.urls', namespace='users')), # ตัวอย่างแอปอื่น
     path('planner/', include('planner.urls', namespace='planner')),
+    path('stats/', include('stats.urls', namespace='stats')),
+]
+
+# Collected, hashed and precompressed static files (runserver's DEBUG handler takes precedence)
+urlpatterns += [
+    re_path(r'^%s(?P<path>.+)$' % settings.STATIC_URL.lstrip('/'), serve_static, name='static'),
 ]
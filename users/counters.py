@@ -0,0 +1,49 @@
+# users/counters.py
+"""Per-user profile counters (reviews written, bookmarks, score received).
+
+The profile header used to count the user's reviews and bookmarks and sum
+every vote on their reviews on each visit. `UserCounters` keeps those totals
+instead: signals apply +/- deltas to existing rows as reviews, bookmarks and votes
+change, and a user without a row gets one built from the source tables the
+first time it is read.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+
+from .models import UserCounters
+
+def recount_user_counters(user_id):
+    """Recompute one user's counters from the review tables and store them."""
+    from review.models import Bookmark, Review
+
+    values = {
+        'review_count': Review.objects.filter(user_id=user_id).count(),
+        'bookmark_count': Bookmark.objects.filter(user_id=user_id).count(),
+        'score_received': Review.objects.filter(user_id=user_id).aggregate(total=Sum('net_votes'))['total'] or 0,
+    }
+    counters, _ = UserCounters.objects.update_or_create(user_id=user_id, defaults=values)
+    return counters
+
+
+def apply_counter_delta(user_id, **deltas):
+    """Add `deltas` (field=amount) to a user's counters.
+
+    Users without a row are skipped: their first `get_user_counters` call
+    recounts from the tables, which already include this change.
+    """
+    deltas = {field: F(field) + amount for field, amount in deltas.items() if amount}
+    if deltas:
+        UserCounters.objects.filter(user_id=user_id).update(**deltas)
+
+
+def get_user_counters(user):
+    """The user's counters, built from the tables on first use."""
+    try:
+        return UserCounters.objects.get(user_id=user.pk)
+    except UserCounters.DoesNotExist:
+        try:
+            with transaction.atomic():
+                return recount_user_counters(user.pk)
+        except IntegrityError:
+            # created by a concurrent request
+            return UserCounters.objects.get(user_id=user.pk)
@@ -78,4 +78,16 @@ class User(AbstractBaseUser, PermissionsMixin):
         verbose_name = "User"
         verbose_name_plural = "Users"
 
+
+class UserCounters(models.Model):
+    """Per-user totals shown on the profile, maintained incrementally (see users/counters.py)."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='counters')
+    review_count = models.PositiveIntegerField(default=0)
+    bookmark_count = models.PositiveIntegerField(default=0)
+    # net votes received on all of the user's reviews
+    score_received = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"Counters of {self.user_id}"
+
 # NOTE: You must set AUTH_USER_MODEL = 'user.User' in your settings.py
\ No newline at end of file
@@ -0,0 +1,37 @@
+# users/signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.versioning import bump_version, VIEWER
+from review.models import Review, Bookmark
+from .counters import apply_counter_delta
+from .models import User
+
+
+@receiver(post_save, sender=User)
+def bump_viewer_version(sender, instance, **kwargs):
+    # name and picture appear on pages served with per-viewer ETags
+    bump_version(VIEWER, instance.pk)
+
+
+@receiver(post_save, sender=Review)
+def count_new_review(sender, instance, created, **kwargs):
+    if created:
+        apply_counter_delta(instance.user_id, review_count=1)
+
+
+@receiver(post_delete, sender=Review)
+def count_removed_review(sender, instance, **kwargs):
+    # votes are deleted (and subtracted from score_received) before the review itself
+    apply_counter_delta(instance.user_id, review_count=-1)
+
+
+@receiver(post_save, sender=Bookmark)
+def count_new_bookmark(sender, instance, created, **kwargs):
+    if created:
+        apply_counter_delta(instance.user_id, bookmark_count=1)
+
+
+@receiver(post_delete, sender=Bookmark)
+def count_removed_bookmark(sender, instance, **kwargs):
+    apply_counter_delta(instance.user_id, bookmark_count=-1)
@@ -1,3 +1,69 @@
 from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
 
-# Create your tests here.
+from core.models import Course
+from jobs.models import Job
+from review.models import Review, Bookmark, ReviewUpvote
+from review.signals import reviews_bulk_created
+from .counters import get_user_counters
+from .models import UserCounters
+
+
+class UserCountersTest(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.author = User.objects.create_user(username='writer', email='writer@example.com', password='pw')
+        self.reader = User.objects.create_user(username='reader', email='reader@example.com', password='pw')
+        self.course = Course.objects.create(course_name='Security', course_code='CN370', description='', credit=3)
+
+    def review(self, head='h'):
+        return Review.objects.create(user=self.author, course=self.course, head=head, body='b', rating=4)
+
+    def test_counters_are_built_lazily_then_maintained(self):
+        first = self.review()
+        self.assertFalse(UserCounters.objects.exists())
+        counters = get_user_counters(self.author)
+        self.assertEqual((counters.review_count, counters.score_received), (1, 0))
+
+        second = self.review()
+        vote = ReviewUpvote.objects.create(user=self.reader, review=second, vote_type=1)
+        ReviewUpvote.objects.create(user=self.author, review=first, vote_type=-1)
+        Bookmark.objects.create(user=self.author, course=self.course)
+        counters.refresh_from_db()
+        self.assertEqual((counters.review_count, counters.bookmark_count, counters.score_received), (2, 1, 0))
+
+        vote.vote_type = -1
+        vote.save()
+        first.delete()
+        counters.refresh_from_db()
+        self.assertEqual((counters.review_count, counters.score_received), (1, -1))
+
+    def test_bulk_created_reviews_refresh_counters(self):
+        counters = get_user_counters(self.author)
+        reviews = Review.objects.bulk_create([
+            Review(user=self.author, course=self.course, head=f'B{i}', body='b', rating=3) for i in range(3)
+        ])
+        reviews_bulk_created(reviews)
+        counters.refresh_from_db()
+        self.assertEqual(counters.review_count, 3)
+        self.assertEqual(Job.objects.filter(task='review.fan_out_review').count(), 3)
+
+    def test_profile_pages_sections(self):
+        reviews = [self.review(f'R{i}') for i in range(12)]
+        for review in reviews:
+            Bookmark.objects.create(user=self.reader, review=review, course=self.course)
+        ReviewUpvote.objects.create(user=self.author, review=reviews[-1], vote_type=1)
+        self.client.login(username='reader', password='pw')
+
+        resp = self.client.get(reverse('users:profile'))
+        bookmarked = resp.context['bookmarked_reviews']
+        self.assertEqual(len(bookmarked), 10)
+        self.assertTrue(resp.context['bookmarks_has_next'])
+        # bookmarked reviews carry the same annotations as every other listing
+        self.assertEqual((bookmarked[0].id, bookmarked[0].score, bookmarked[0].is_bookmarked), (reviews[-1].id, 1, True))
+        self.assertEqual(resp.context['counters'].bookmark_count, 12)
+
+        resp = self.client.get(reverse('users:profile'), {'bookmarks_page': 2})
+        self.assertEqual([r.id for r in resp.context['bookmarked_reviews']], [reviews[1].id, reviews[0].id])
+        self.assertFalse(resp.context['bookmarks_has_next'])
@@ -5,8 +5,8 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from .forms import LoginForm, ChangeImageForm
 from review.models import Review, Bookmark
-from django.db.models import Q, Exists, OuterRef, Sum
-from django.db.models.functions import Coalesce
+from review import feeds
+from .counters import get_user_counters
 
 def login_view(request):
     if request.method == 'POST':
@@ -36,43 +36,63 @@ def logout_view(request):
     messages.info(request, "You have been logged out.")
     return redirect('users:login')
 
+PROFILE_PAGE_SIZE = 10
+
+
+def _page_number(request, name):
+    try:
+        return max(int(request.GET.get(name, 1)), 1)
+    except ValueError:
+        return 1
+
+
+def _slice_page(queryset, page, page_size=PROFILE_PAGE_SIZE):
+    """One page of `queryset` and whether another follows (no COUNT query)."""
+    start = (page - 1) * page_size
+    rows = list(queryset[start:start + page_size + 1])
+    return rows[:page_size], len(rows) > page_size
+
+
 @login_required
 def profile_view(request):
     """
     แสดงหน้าโปรไฟล์ของผู้ใช้ พร้อมกับรีวิวที่เขียนและรีวิว/คอร์สที่บุ๊คมาร์คไว้
+    แต่ละส่วนแบ่งหน้า (reviews_page / bookmarks_page / courses_page) และตัวเลขสรุปอ่านจาก UserCounters
     """
     user = request.user
+    reviews_page = _page_number(request, 'reviews_page')
+    bookmarks_page = _page_number(request, 'bookmarks_page')
+    courses_page = _page_number(request, 'courses_page')
 
-    # ดึงข้อมูลรีวิวทั้งหมดที่ผู้ใช้คนนี้เขียน
-    # ใช้ select_related เพื่อลดจำนวน query ไปยัง database ทำให้เร็วขึ้น
-    # Annotate whether the current session user has bookmarked each review
-    user_bookmark_subquery = Bookmark.objects.none()
-    if request.user.is_authenticated:
-        user_bookmark_subquery = Bookmark.objects.filter(user=request.user, review=OuterRef('pk'))
-    user_reviews = Review.objects.filter(user=user).select_related('course', 'prof').annotate(
-        is_bookmarked=Exists(user_bookmark_subquery),
-        score=Coalesce(Sum('votes__vote_type'), 0),
-        user_vote=Coalesce(Sum('votes__vote_type', filter=Q(votes__user_id=request.user.id)), 0)
-    ).order_by('-date_created')
+    # รีวิวที่ผู้ใช้เขียน (score / user_vote / is_bookmarked มาจาก subquery ไม่ต้อง join ตาราง vote)
+    own_reviews = Review.objects.filter(user=user).select_related('user', 'course', 'prof', 'section')
+    own_reviews = feeds.with_viewer_state(own_reviews, user).order_by('-date_created', '-id')
+    user_reviews, reviews_has_next = _slice_page(own_reviews, reviews_page)
 
-    # ดึงข้อมูลบุ๊คมาร์คที่เป็นรีวิว (review is not null)
-    bookmarked_reviews = Bookmark.objects.filter(user=user, review__isnull=False).select_related(
-        'review__course', 'review__user', 'review__prof'
-    ).order_by('-id')
-    # Ensure each bookmarked review shows as bookmarked when rendered
-    for bk in bookmarked_reviews:
-        if bk.review:
-            setattr(bk.review, 'is_bookmarked', True)
-    
-    # ดึงข้อมูลบุ๊คมาร์คที่เป็นคอร์ส (review is null)
-    bookmarked_courses = Bookmark.objects.filter(user=user, review__isnull=True).select_related(
-        'course'
-    ).order_by('-id')
+    # รีวิวที่บุ๊คมาร์คไว้: เลือก id ตามลำดับบุ๊คมาร์ค แล้วโหลดรีวิวพร้อม annotation ชุดเดียวกัน
+    bookmark_rows = Bookmark.objects.filter(user=user, review__isnull=False).order_by('-id').values_list('review_id', flat=True)
+    review_ids, bookmarks_has_next = _slice_page(bookmark_rows, bookmarks_page)
+    reviews = Review.objects.select_related('user', 'course', 'prof', 'section')
+    by_id = feeds.with_viewer_state(reviews, user).in_bulk(review_ids)
+    bookmarked_reviews = [by_id[pk] for pk in review_ids if pk in by_id]
+
+    # คอร์สที่บุ๊คมาร์คไว้ (review is null)
+    bookmarked_courses, courses_has_next = _slice_page(
+        Bookmark.objects.filter(user=user, review__isnull=True).select_related('course').order_by('-id'),
+        courses_page,
+    )
 
     context = {
+        'counters': get_user_counters(user),
         'user_reviews': user_reviews,
         'bookmarked_reviews': bookmarked_reviews,
         'bookmarked_courses': bookmarked_courses,
+        'reviews_page': reviews_page,
+        'reviews_has_next': reviews_has_next,
+        'bookmarks_page': bookmarks_page,
+        'bookmarks_has_next': bookmarks_has_next,
+        'courses_page': courses_page,
+        'courses_has_next': courses_has_next,
     }
     
     return render(request, 'users/profile.html', context)